@@ -1,288 +1,565 @@
-import streamlit as st
-import numpy as np
-import random
-import time
-
-def initialize_game():
-    """Initialize or reset the game state"""
-    if 'board' not in st.session_state:
-        st.session_state.board = np.full((3, 3), '', dtype=str)
-    if 'current_player' not in st.session_state:
-        st.session_state.current_player = 'X'
-    if 'game_over' not in st.session_state:
-        st.session_state.game_over = False
-    if 'winner' not in st.session_state:
-        st.session_state.winner = None
-    if 'scores' not in st.session_state:
-        st.session_state.scores = {'X': 0, 'O': 0, 'Draws': 0}
-    if 'celebrate' not in st.session_state:
-        st.session_state.celebrate = False
-
-def check_winner(board):
-    """Check if there's a winner"""
-    # Check rows
-    for i in range(3):
-        if board[i][0] == board[i][1] == board[i][2] != '':
-            return board[i][0]
-    
-    # Check columns
-    for i in range(3):
-        if board[0][i] == board[1][i] == board[2][i] != '':
-            return board[0][i]
-    
-    # Check diagonals
-    if board[0][0] == board[1][1] == board[2][2] != '':
-        return board[0][0]
-    if board[0][2] == board[1][1] == board[2][0] != '':
-        return board[0][2]
-    
-    # Check for draw
-    if '' not in board:
-        return 'Draw'
-    
-    return None
-
-def make_move(row, col):
-    """Handle a player's move"""
-    if st.session_state.board[row][col] == '' and not st.session_state.game_over:
-        st.session_state.board[row][col] = st.session_state.current_player
-        
-        # Check for winner
-        winner = check_winner(st.session_state.board)
-        if winner:
-            st.session_state.game_over = True
-            st.session_state.winner = winner
-            if winner != 'Draw':
-                st.session_state.scores[winner] += 1
-                st.session_state.celebrate = True
-            else:
-                st.session_state.scores['Draws'] += 1
-        else:
-            # Switch player
-            st.session_state.current_player = 'O' if st.session_state.current_player == 'X' else 'X'
-
-def reset_game():
-    """Reset the game state"""
-    st.session_state.board = np.full((3, 3), '', dtype=str)
-    st.session_state.current_player = 'X'
-    st.session_state.game_over = False
-    st.session_state.winner = None
-    st.session_state.celebrate = False
-
-def get_rainbow_color(index):
-    """Generate rainbow colors"""
-    colors = [
-        '#FF6B6B', '#FF9E6B', '#FFD56B', '#C5FF6B', 
-        '#6BFF8E', '#6BFFD5', '#6BC5FF', '#6B8EFF', 
-        '#8E6BFF', '#D56BFF', '#FF6BD5', '#FF6B8E'
-    ]
-    return colors[index % len(colors)]
-
-def main():
-    st.set_page_config(
-        page_title="🌈 Tic-Tac-Toe Game",
-        page_icon="🎮",
-        layout="centered"
-    )
-    
-    # Add custom CSS for rainbow background and animations
-    st.markdown("""
-    <style>
-    .main {
-        background: linear-gradient(45deg, #FF6B6B, #FF9E6B, #FFD56B, #C5FF6B, #6BFF8E, #6BFFD5, #6BC5FF, #6B8EFF, #8E6BFF, #D56BFF, #FF6BD5, #FF6B8E);
-        background-size: 400% 400%;
-        animation: gradient 15s ease infinite;
-    }
-    
-    @keyframes gradient {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    .stApp {
-        background: rgba(255, 255, 255, 0.95);
-        border-radius: 20px;
-        padding: 20px;
-        margin: 20px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-    }
-    
-    .celebrate {
-        animation: celebrate 2s ease-in-out;
-    }
-    
-    @keyframes celebrate {
-        0% { transform: scale(1); }
-        25% { transform: scale(1.2); }
-        50% { transform: scale(0.9); }
-        75% { transform: scale(1.1); }
-        100% { transform: scale(1); }
-    }
-    
-    .rainbow-text {
-        background: linear-gradient(45deg, #FF6B6B, #FF9E6B, #FFD56B, #C5FF6B, #6BFF8E, #6BFFD5, #6BC5FF, #6B8EFF, #8E6BFF, #D56BFF, #FF6BD5, #FF6B8E);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        animation: gradient 3s ease infinite;
-    }
-    
-    .cell-x {
-        background: linear-gradient(45deg, #ff6b6b, #ff4757);
-        color: white !important;
-        font-weight: bold;
-        border-radius: 15px;
-        box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4);
-    }
-    
-    .cell-o {
-        background: linear-gradient(45deg, #48dbfb, #0abde3);
-        color: white !important;
-        font-weight: bold;
-        border-radius: 15px;
-        box-shadow: 0 4px 15px rgba(72, 219, 251, 0.4);
-    }
-    
-    .empty-cell {
-        background: rgba(255, 255, 255, 0.9);
-        border-radius: 15px;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        transition: all 0.3s ease;
-    }
-    
-    .empty-cell:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 8px 25px rgba(0, 0, 0, 0.2);
-        background: rgba(255, 255, 255, 1);
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Initialize game state
-    initialize_game()
-    
-    # Title with rainbow effect
-    st.markdown("<h1 class='rainbow-text' style='text-align: center;'>🌈🎮 Tic-Tac-Toe Game 🎮🌈</h1>", unsafe_allow_html=True)
-    st.markdown("---")
-    
-    # Score display
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("❌ Player X", st.session_state.scores['X'])
-    with col2:
-        st.metric("🤝 Draws", st.session_state.scores['Draws'])
-    with col3:
-        st.metric("⭕ Player O", st.session_state.scores['O'])
-    
-    st.markdown("---")
-    
-    # Display current player or winner with emojis
-    if st.session_state.game_over:
-        if st.session_state.winner == 'Draw':
-            st.markdown(f"<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>🤝 It's a Draw! 🎉</h2>", unsafe_allow_html=True)
-            st.balloons()
-        else:
-            winner_emoji = "❌" if st.session_state.winner == 'X' else "⭕"
-            st.markdown(f"<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>🎊 {winner_emoji} Player {st.session_state.winner} wins! 🎊</h2>", unsafe_allow_html=True)
-            st.balloons()
-            if st.session_state.celebrate:
-                st.snow()
-                st.session_state.celebrate = False
-    else:
-        player_emoji = "❌" if st.session_state.current_player == 'X' else "⭕"
-        st.markdown(f"<h3 style='text-align: center;'>Current Player: {player_emoji} <strong>{st.session_state.current_player}</strong></h3>", unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    # Create the game board
-    st.markdown("<h3 style='text-align: center;'>🎯 Game Board 🎯</h3>", unsafe_allow_html=True)
-    
-    # Display the board with buttons
-    for i in range(3):
-        cols = st.columns([1, 1, 1], gap="medium")
-        for j in range(3):
-            with cols[j]:
-                cell_value = st.session_state.board[i][j]
-                cell_emoji = "❌" if cell_value == 'X' else "⭕" if cell_value == 'O' else "🎯"
-                
-                if cell_value != '':
-                    cell_class = "cell-x" if cell_value == 'X' else "cell-o"
-                    st.markdown(
-                        f"<div class='{cell_class}' style='height: 100px; display: flex; "
-                        f"justify-content: center; align-items: center; border-radius: 15px;'>"
-                        f"<h1 style='margin: 0;'>{cell_emoji}</h1></div>",
-                        unsafe_allow_html=True
-                    )
-                else:
-                    if st.button(
-                        f"🎯", 
-                        key=f"btn_{i}_{j}", 
-                        use_container_width=True,
-                        disabled=st.session_state.game_over
-                    ):
-                        make_move(i, j)
-                        st.rerun()
-    
-    st.markdown("---")
-    
-    # Action buttons
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        if st.button("🔄 Restart Game", use_container_width=True, type="primary"):
-            reset_game()
-            st.rerun()
-        
-        if st.button("🎲 Random Move", use_container_width=True, disabled=st.session_state.game_over):
-            empty_cells = [(i, j) for i in range(3) for j in range(3) if st.session_state.board[i][j] == '']
-            if empty_cells:
-                row, col = random.choice(empty_cells)
-                make_move(row, col)
-                st.rerun()
-    
-    # Fun emoji section
-    st.markdown("---")
-    st.markdown("<h3 style='text-align: center;'>🎪 Game Fun Zone 🎪</h3>", unsafe_allow_html=True)
-    
-    emoji_cols = st.columns(5)
-    fun_emojis = ["🎮", "🎯", "🎨", "🤹", "🎪"]
-    for i, col in enumerate(emoji_cols):
-        with col:
-            st.markdown(f"<h2 style='text-align: center;'>{fun_emojis[i]}</h2>", unsafe_allow_html=True)
-    
-    # Instructions with emojis
-    with st.expander("📖 How to Play & Rules"):
-        st.markdown("""
-        ## 🎯 How to Play:
-        
-        1. **Players take turns** placing their marks (❌ for X, ⭕ for O)
-        2. **Click on an empty spot** to place your mark
-        3. **Get 3 in a row** (horizontal, vertical, or diagonal) to win!
-        4. **Fill all spots** without a winner = Draw! 🤝
-        
-        ## 🏆 Winning Patterns:
-        - Horizontal: 🎯🎯🎯
-        - Vertical:   🎯  
-                     🎯  
-                     🎯  
-        - Diagonal:  🎯    
-                       🎯  
-                         🎯
-        
-        ## 🎮 Features:
-        - **Rainbow background** 🌈
-        - **Animated celebrations** 🎊
-        - **Score tracking** 📊
-        - **Random move generator** 🎲
-        - **Fun emojis everywhere!** 😄
-        
-        ## 💡 Pro Tip:
-        The center spot is the most powerful position! 🎯
-        """)
-    
-    # Footer
-    st.markdown("---")
-    st.markdown("<p style='text-align: center; color: #666;'>Made with ❤️ using Streamlit | 🌈 Enjoy the game! 🎮</p>", unsafe_allow_html=True)
-
-if __name__ == "__main__":
-    main()
+import streamlit as st
+import numpy as np
+import pandas as pd
+import random
+import time
+import uuid
+
+from tictactoe_ai import LEVELS, PerfectPlayer
+from tictactoe_engine import DRAW, SIZE, Position, cell_index
+from tictactoe_nxn import MAX_SIZE, AlphaBeta, Board
+from tictactoe_rooms import CODE_LENGTH, RoomRegistry
+
+HUMAN = "👥 Human (same browser)"
+SEARCH = "🤖 Alpha-beta search"
+CLASSIC = "🎯 Classic 3×3"
+BIG_BOARD = "🧩 Big board (N×N, K in a row)"
+ONLINE = "🌐 Online (two browsers)"
+POLL_SECONDS = 1
+
+@st.cache_resource
+def get_opponent():
+    """The solved game, built once per server process and shared by every session"""
+    return PerfectPlayer()
+
+@st.cache_resource
+def get_rooms():
+    """Every online room on this server, shared by all sessions"""
+    return RoomRegistry()
+
+def initialize_game():
+    """Initialize or reset the game state"""
+    if 'position' not in st.session_state:
+        st.session_state.position = Position()
+    if 'game_over' not in st.session_state:
+        st.session_state.game_over = False
+    if 'winner' not in st.session_state:
+        st.session_state.winner = None
+    if 'scores' not in st.session_state:
+        st.session_state.scores = {'X': 0, 'O': 0, 'Draws': 0}
+    if 'celebrate' not in st.session_state:
+        st.session_state.celebrate = False
+    if 'opponent' not in st.session_state:
+        st.session_state.opponent = HUMAN
+    if 'computer_side' not in st.session_state:
+        st.session_state.computer_side = 'O'
+    if 'reply_us' not in st.session_state:
+        st.session_state.reply_us = None
+    if 'player_id' not in st.session_state:
+        st.session_state.player_id = uuid.uuid4().hex[:12]
+    if 'room_code' not in st.session_state:
+        st.session_state.room_code = None
+
+def make_move(row, col):
+    """Handle a player's move"""
+    position = st.session_state.position
+    cell = cell_index(row, col)
+    if position.free >> cell & 1 and not st.session_state.game_over:
+        position = st.session_state.position = position.play(cell)
+        
+        # Check for winner
+        winner = position.winner()
+        if winner:
+            st.session_state.game_over = True
+            st.session_state.winner = winner
+            if winner != DRAW:
+                st.session_state.scores[winner] += 1
+                st.session_state.celebrate = True
+            else:
+                st.session_state.scores['Draws'] += 1
+
+def computer_turn():
+    """Let the computer move if it is playing and it is its turn"""
+    position = st.session_state.position
+    if (st.session_state.opponent == HUMAN or st.session_state.game_over
+            or position.to_move != st.session_state.computer_side):
+        return
+    t0 = time.perf_counter()
+    cell = get_opponent().choose(position, st.session_state.opponent)
+    st.session_state.reply_us = (time.perf_counter() - t0) * 1e6
+    make_move(*divmod(cell, SIZE))
+
+def reset_game():
+    """Reset the game state"""
+    st.session_state.position = Position()
+    st.session_state.game_over = False
+    st.session_state.winner = None
+    st.session_state.celebrate = False
+
+def board_buttons(position, key, disabled):
+    """Draw a 3×3 position as a button per free cell; returns the (row, col) clicked, if any"""
+    clicked = None
+    for i in range(SIZE):
+        cols = st.columns([1] * SIZE, gap="medium")
+        for j in range(SIZE):
+            with cols[j]:
+                cell_value = position.mark(i, j)
+                cell_emoji = "❌" if cell_value == 'X' else "⭕" if cell_value == 'O' else "🎯"
+                
+                if cell_value != '':
+                    cell_class = "cell-x" if cell_value == 'X' else "cell-o"
+                    st.markdown(
+                        f"<div class='{cell_class}' style='height: 100px; display: flex; "
+                        f"justify-content: center; align-items: center; border-radius: 15px;'>"
+                        f"<h1 style='margin: 0;'>{cell_emoji}</h1></div>",
+                        unsafe_allow_html=True
+                    )
+                else:
+                    if st.button(
+                        f"🎯", 
+                        key=f"{key}_{i}_{j}", 
+                        use_container_width=True,
+                        disabled=disabled
+                    ):
+                        clicked = (i, j)
+    return clicked
+
+def show_scores():
+    """Score display, shared by both modes"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("❌ Player X", st.session_state.scores['X'])
+    with col2:
+        st.metric("🤝 Draws", st.session_state.scores['Draws'])
+    with col3:
+        st.metric("⭕ Player O", st.session_state.scores['O'])
+
+def big_play(cell):
+    """Play a cell on the big board and book the result"""
+    board = st.session_state.big_board
+    if board.winner is None and not board.cells[cell]:
+        winner = board.play(cell)
+        if winner == DRAW:
+            st.session_state.scores['Draws'] += 1
+        elif winner:
+            st.session_state.scores[winner] += 1
+            st.session_state.celebrate = True
+
+def big_computer_turn():
+    """Let the search move on the big board if it is playing and it is its turn"""
+    board = st.session_state.big_board
+    if (st.session_state.big_opponent == HUMAN or board.winner is not None
+            or board.to_move != st.session_state.big_computer_side):
+        return
+    search = AlphaBeta(budget_s=st.session_state.big_budget)
+    t0 = time.perf_counter()
+    cell = search.best_move(board)
+    st.session_state.big_search = (f"🤖 searched depth {search.depth}, {search.nodes:,} nodes "
+                                   f"in {time.perf_counter() - t0:.2f} s")
+    big_play(cell)
+
+def board_frame(board):
+    """The big board as one styled table: far lighter than a button per cell"""
+    labels = [chr(ord('A') + c) for c in range(board.size)]
+    marks = np.array(['', '❌', '⭕'])[np.frombuffer(board.cells, dtype=np.uint8)].reshape(board.size, board.size)
+    frame = pd.DataFrame(marks, columns=labels, index=range(1, board.size + 1))
+    last = board.last_move
+    
+    def colors(df):
+        css = np.where(marks == '❌', 'background-color: #ffe3e3', np.where(marks == '⭕', 'background-color: #def6fd', ''))
+        if last is not None:
+            css[divmod(last, board.size)] = 'background-color: #ffd56b'
+        return pd.DataFrame(css, index=df.index, columns=df.columns)
+    
+    return frame.style.apply(colors, axis=None), labels
+
+def big_board_game():
+    """N×N board, K in a row to win, against a friend or the alpha-beta search"""
+    if 'big_k' not in st.session_state:
+        st.session_state.big_k = 5
+    col1, col2 = st.columns(2)
+    with col1:
+        size = st.slider("📐 Board size", 3, MAX_SIZE, 15, key="big_size")
+    st.session_state.big_k = min(st.session_state.big_k, size)
+    with col2:
+        k = st.number_input("🔗 In a row to win", 3, size, key="big_k")
+    board = st.session_state.get('big_board')
+    if board is None or (board.size, board.k) != (size, k):
+        board = st.session_state.big_board = Board(size, k)
+        st.session_state.big_search = None
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.selectbox("🤖 Opponent", [HUMAN, SEARCH], key="big_opponent")
+    with col2:
+        st.radio("Computer plays", ['X', 'O'], index=1, key="big_computer_side", horizontal=True,
+                 disabled=st.session_state.big_opponent == HUMAN)
+    with col3:
+        st.slider("⏱️ Seconds per move", 0.2, 5.0, 1.0, 0.1, key="big_budget",
+                  disabled=st.session_state.big_opponent == HUMAN)
+    big_computer_turn()
+    
+    st.markdown("---")
+    show_scores()
+    st.markdown("---")
+    
+    if board.winner == DRAW:
+        st.markdown("<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>🤝 It's a Draw! 🎉</h2>", unsafe_allow_html=True)
+    elif board.winner:
+        winner_emoji = "❌" if board.winner == 'X' else "⭕"
+        st.markdown(f"<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>🎊 {winner_emoji} Player {board.winner} wins! 🎊</h2>", unsafe_allow_html=True)
+        if st.session_state.celebrate:
+            st.balloons()
+            st.session_state.celebrate = False
+    else:
+        player_emoji = "❌" if board.to_move == 'X' else "⭕"
+        st.markdown(f"<h3 style='text-align: center;'>Current Player: {player_emoji} <strong>{board.to_move}</strong> · {k} in a row wins</h3>", unsafe_allow_html=True)
+    if st.session_state.big_search:
+        st.caption(st.session_state.big_search)
+    
+    # One table for the whole board; selecting a cell plays it. The key changes with every
+    # move so the selection starts empty again.
+    styled, labels = board_frame(board)
+    event = st.dataframe(
+        styled,
+        key=f"big_grid_{len(board.history)}",
+        on_select="rerun",
+        selection_mode="single-cell",
+        height=35 * (size + 1) + 3,
+        column_config={label: st.column_config.TextColumn(width=36) for label in labels},
+    )
+    if event.selection.cells and board.winner is None:
+        row, label = event.selection.cells[0]
+        cell = row * size + labels.index(label)
+        if not board.cells[cell]:
+            big_play(cell)
+            st.rerun()
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        if st.button("🔄 Restart Game", key="big_restart", use_container_width=True, type="primary"):
+            st.session_state.big_board = Board(size, k)
+            st.session_state.big_search = None
+            st.rerun()
+
+def watch_room(code, version):
+    """Polled while waiting: one version check per tick, and a full rerun only when the room changed"""
+    room = get_rooms().get(code)
+    if room is None or room.version != version:
+        st.rerun()
+    st.caption("⏳ Waiting for the other player…")
+
+def room_lobby():
+    """Create a room or join one by its code"""
+    rooms = get_rooms()
+    st.text_input("😀 Your name", key="online_name", max_chars=20)
+    name = st.session_state.online_name.strip() or "Player"
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🆕 Create room", use_container_width=True, type="primary"):
+            try:
+                room = rooms.create(st.session_state.player_id, name)
+            except RuntimeError as e:
+                st.error(f"😕 {e}")
+            else:
+                st.session_state.room_code = room.code
+                st.query_params["room"] = room.code
+                st.rerun()
+    with col2:
+        code = st.text_input("🔑 Room code", value=st.query_params.get("room", ""), max_chars=CODE_LENGTH)
+        if st.button("🚪 Join room", use_container_width=True):
+            room = rooms.get(code.strip().upper())
+            if room is None:
+                st.error("😕 No open room with that code")
+            else:
+                try:
+                    room.join(st.session_state.player_id, name)
+                except ValueError as e:
+                    st.error(f"😕 {e}")
+                else:
+                    st.session_state.room_code = room.code
+                    st.query_params["room"] = room.code
+                    st.rerun()
+    st.caption(f"🌐 {len(rooms)} rooms open on this server")
+
+def online_game():
+    """Two browsers, one room: the board lives in the shared registry, not in session state"""
+    if 'online_name' not in st.session_state:
+        st.session_state.online_name = ""
+    rooms = get_rooms()
+    room = rooms.get(st.session_state.room_code) if st.session_state.room_code else None
+    if room is None:
+        if st.session_state.room_code:
+            st.warning("⌛ That room was closed after sitting idle.")
+            st.session_state.room_code = None
+        room_lobby()
+        return
+    
+    me = st.session_state.player_id
+    view = room.snapshot()
+    seat = view.seat_of(me)
+    st.markdown(f"<h3 style='text-align: center;'>🔑 Room <code>{view.code}</code> · share the code with a friend</h3>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(f"❌ {view.name('X')}", view.wins.get(view.seats[0], 0))
+    with col2:
+        st.metric("🤝 Draws", view.draws)
+    with col3:
+        st.metric(f"⭕ {view.name('O')}", view.wins.get(view.seats[1], 0))
+    st.markdown("---")
+    
+    my_turn = False
+    if seat is None:
+        st.info("👀 You are watching this room.")
+    elif None in view.seats:
+        st.markdown("<h3 style='text-align: center;'>⏳ Waiting for a friend to join…</h3>", unsafe_allow_html=True)
+    elif view.winner == DRAW:
+        st.markdown("<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>🤝 It's a Draw! 🎉</h2>", unsafe_allow_html=True)
+    elif view.winner:
+        text = "🎊 You win! 🎊" if view.winner == seat else f"😢 {view.name(view.winner)} wins"
+        st.markdown(f"<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>{text}</h2>", unsafe_allow_html=True)
+    else:
+        my_turn = view.position.to_move == seat
+        emoji = "❌" if seat == 'X' else "⭕"
+        turn = "Your turn!" if my_turn else f"{view.name(view.position.to_move)} is thinking…"
+        st.markdown(f"<h3 style='text-align: center;'>You are {emoji} · {turn}</h3>", unsafe_allow_html=True)
+    
+    clicked = board_buttons(view.position, f"room_{view.version}", not my_turn)
+    if clicked is not None:
+        try:
+            room.move(me, cell_index(*clicked))
+        except ValueError as e:
+            st.toast(f"😕 {e}")
+        st.rerun()
+    
+    if not my_turn:
+        # only the other player can change anything now: poll cheaply instead of rerunning the page
+        st.fragment(watch_room, run_every=POLL_SECONDS)(view.code, view.version)
+    
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔄 Rematch", use_container_width=True, type="primary",
+                     disabled=view.winner is None or seat is None):
+            try:
+                room.rematch(me)
+            except ValueError:
+                pass  # the other player got there first
+            st.rerun()
+    with col2:
+        if st.button("🚪 Leave room", use_container_width=True):
+            rooms.leave(view.code, me)
+            st.session_state.room_code = None
+            st.query_params.pop("room", None)
+            st.rerun()
+
+def get_rainbow_color(index):
+    """Generate rainbow colors"""
+    colors = [
+        '#FF6B6B', '#FF9E6B', '#FFD56B', '#C5FF6B', 
+        '#6BFF8E', '#6BFFD5', '#6BC5FF', '#6B8EFF', 
+        '#8E6BFF', '#D56BFF', '#FF6BD5', '#FF6B8E'
+    ]
+    return colors[index % len(colors)]
+
+def main():
+    st.set_page_config(
+        page_title="🌈 Tic-Tac-Toe Game",
+        page_icon="🎮",
+        layout="centered"
+    )
+    
+    # Add custom CSS for rainbow background and animations
+    st.markdown("""
+    <style>
+    .main {
+        background: linear-gradient(45deg, #FF6B6B, #FF9E6B, #FFD56B, #C5FF6B, #6BFF8E, #6BFFD5, #6BC5FF, #6B8EFF, #8E6BFF, #D56BFF, #FF6BD5, #FF6B8E);
+        background-size: 400% 400%;
+        animation: gradient 15s ease infinite;
+    }
+    
+    @keyframes gradient {
+        0% { background-position: 0% 50%; }
+        50% { background-position: 100% 50%; }
+        100% { background-position: 0% 50%; }
+    }
+    
+    .stApp {
+        background: rgba(255, 255, 255, 0.95);
+        border-radius: 20px;
+        padding: 20px;
+        margin: 20px;
+        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
+    }
+    
+    .celebrate {
+        animation: celebrate 2s ease-in-out;
+    }
+    
+    @keyframes celebrate {
+        0% { transform: scale(1); }
+        25% { transform: scale(1.2); }
+        50% { transform: scale(0.9); }
+        75% { transform: scale(1.1); }
+        100% { transform: scale(1); }
+    }
+    
+    .rainbow-text {
+        background: linear-gradient(45deg, #FF6B6B, #FF9E6B, #FFD56B, #C5FF6B, #6BFF8E, #6BFFD5, #6BC5FF, #6B8EFF, #8E6BFF, #D56BFF, #FF6BD5, #FF6B8E);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        background-clip: text;
+        animation: gradient 3s ease infinite;
+    }
+    
+    .cell-x {
+        background: linear-gradient(45deg, #ff6b6b, #ff4757);
+        color: white !important;
+        font-weight: bold;
+        border-radius: 15px;
+        box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4);
+    }
+    
+    .cell-o {
+        background: linear-gradient(45deg, #48dbfb, #0abde3);
+        color: white !important;
+        font-weight: bold;
+        border-radius: 15px;
+        box-shadow: 0 4px 15px rgba(72, 219, 251, 0.4);
+    }
+    
+    .empty-cell {
+        background: rgba(255, 255, 255, 0.9);
+        border-radius: 15px;
+        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
+        transition: all 0.3s ease;
+    }
+    
+    .empty-cell:hover {
+        transform: translateY(-5px);
+        box-shadow: 0 8px 25px rgba(0, 0, 0, 0.2);
+        background: rgba(255, 255, 255, 1);
+    }
+    </style>
+    """, unsafe_allow_html=True)
+    
+    # Initialize game state
+    initialize_game()
+    
+    # Title with rainbow effect
+    st.markdown("<h1 class='rainbow-text' style='text-align: center;'>🌈🎮 Tic-Tac-Toe Game 🎮🌈</h1>", unsafe_allow_html=True)
+    st.markdown("---")
+    
+    # Game mode
+    st.radio("🧩 Mode", [CLASSIC, BIG_BOARD, ONLINE], key="mode", horizontal=True)
+    
+    if st.session_state.mode == BIG_BOARD:
+        big_board_game()
+    elif st.session_state.mode == ONLINE:
+        online_game()
+    else:
+        # Opponent selection
+        col1, col2 = st.columns(2)
+        with col1:
+            st.selectbox("🤖 Opponent", [HUMAN] + list(LEVELS), key="opponent")
+        with col2:
+            st.radio("Computer plays", ['X', 'O'], key="computer_side", horizontal=True,
+                     disabled=st.session_state.opponent == HUMAN)
+        if st.session_state.opponent != HUMAN:
+            opponent = get_opponent()
+            reply = f", last reply {st.session_state.reply_us:.0f} µs" if st.session_state.reply_us else ""
+            st.caption(f"🧠 Perfect-play table: {len(opponent)} positions (up to symmetry), "
+                       f"~{opponent.size_bytes / 1024:.0f} KB, built in {opponent.build_seconds * 1000:.0f} ms{reply}")
+        computer_turn()
+    
+        st.markdown("---")
+    
+        # Score display
+        show_scores()
+    
+        st.markdown("---")
+    
+        # Display current player or winner with emojis
+        if st.session_state.game_over:
+            if st.session_state.winner == 'Draw':
+                st.markdown(f"<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>🤝 It's a Draw! 🎉</h2>", unsafe_allow_html=True)
+                st.balloons()
+            else:
+                winner_emoji = "❌" if st.session_state.winner == 'X' else "⭕"
+                st.markdown(f"<h2 class='celebrate' style='text-align: center; color: #ff9f43;'>🎊 {winner_emoji} Player {st.session_state.winner} wins! 🎊</h2>", unsafe_allow_html=True)
+                st.balloons()
+                if st.session_state.celebrate:
+                    st.snow()
+                    st.session_state.celebrate = False
+        else:
+            current_player = st.session_state.position.to_move
+            player_emoji = "❌" if current_player == 'X' else "⭕"
+            st.markdown(f"<h3 style='text-align: center;'>Current Player: {player_emoji} <strong>{current_player}</strong></h3>", unsafe_allow_html=True)
+    
+        st.markdown("---")
+    
+        # Create the game board
+        st.markdown("<h3 style='text-align: center;'>🎯 Game Board 🎯</h3>", unsafe_allow_html=True)
+    
+        # Display the board with buttons
+        clicked = board_buttons(st.session_state.position, "btn", st.session_state.game_over)
+        if clicked is not None:
+            make_move(*clicked)
+            st.rerun()
+    
+        st.markdown("---")
+    
+        # Action buttons
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button("🔄 Restart Game", use_container_width=True, type="primary"):
+                reset_game()
+                st.rerun()
+        
+            if st.button("🎲 Random Move", use_container_width=True, disabled=st.session_state.game_over):
+                empty_cells = st.session_state.position.legal_moves()
+                if empty_cells:
+                    row, col = divmod(random.choice(empty_cells), SIZE)
+                    make_move(row, col)
+                    st.rerun()
+    
+    # Fun emoji section
+    st.markdown("---")
+    st.markdown("<h3 style='text-align: center;'>🎪 Game Fun Zone 🎪</h3>", unsafe_allow_html=True)
+    
+    emoji_cols = st.columns(5)
+    fun_emojis = ["🎮", "🎯", "🎨", "🤹", "🎪"]
+    for i, col in enumerate(emoji_cols):
+        with col:
+            st.markdown(f"<h2 style='text-align: center;'>{fun_emojis[i]}</h2>", unsafe_allow_html=True)
+    
+    # Instructions with emojis
+    with st.expander("📖 How to Play & Rules"):
+        st.markdown("""
+        ## 🎯 How to Play:
+        
+        1. **Players take turns** placing their marks (❌ for X, ⭕ for O)
+        2. **Click on an empty spot** to place your mark
+        3. **Get 3 in a row** (horizontal, vertical, or diagonal) to win!
+        4. **Fill all spots** without a winner = Draw! 🤝
+        
+        ## 🏆 Winning Patterns:
+        - Horizontal: 🎯🎯🎯
+        - Vertical:   🎯  
+                     🎯  
+                     🎯  
+        - Diagonal:  🎯    
+                       🎯  
+                         🎯
+        
+        ## 🎮 Features:
+        - **Rainbow background** 🌈
+        - **Animated celebrations** 🎊
+        - **Score tracking** 📊
+        - **Random move generator** 🎲
+        - **Computer opponent** 🤖 from Easy to Unbeatable
+        - **Big board mode** 🧩 up to 19×19 with K in a row (Gomoku-style)
+        - **Online rooms** 🌐 to play a friend from another browser
+        - **Fun emojis everywhere!** 😄
+        
+        ## 💡 Pro Tip:
+        The center spot is the most powerful position! 🎯
+        """)
+    
+    # Footer
+    st.markdown("---")
+    st.markdown("<p style='text-align: center; color: #666;'>Made with ❤️ using Streamlit | 🌈 Enjoy the game! 🎮</p>", unsafe_allow_html=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,202 +1,748 @@
-# gym_workout.py
-import os
-import uuid
-from datetime import datetime, date, timedelta
-from pathlib import Path
-
-import pandas as pd
-import streamlit as st
-
-# ---------- Config ----------
-DATA_DIR = Path("data")
-DATA_FILE = DATA_DIR / "workouts.csv"
-DEFAULT_WEEKS = 12
-UNITS = ["kg", "lb"]
-
-# ---------- Helpers ----------
-def ensure_data_file():
-    DATA_DIR.mkdir(exist_ok=True)
-    if not DATA_FILE.exists():
-        df = pd.DataFrame(columns=[
-            "id", "timestamp", "date", "exercise", "set_num",
-            "reps", "weight", "unit", "notes", "volume"
-        ])
-        df.to_csv(DATA_FILE, index=False)
-
-@st.cache_data
-def load_data() -> pd.DataFrame:
-    ensure_data_file()
-    df = pd.read_csv(DATA_FILE)
-    if not df.empty:
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        df["reps"] = pd.to_numeric(df["reps"], errors="coerce").fillna(0).astype(int)
-        df["weight"] = pd.to_numeric(df["weight"], errors="coerce").fillna(0.0)
-        df["volume"] = pd.to_numeric(df["volume"], errors="coerce").fillna(0.0)
-    return df
-
-def save_data(df: pd.DataFrame):
-    df.to_csv(DATA_FILE, index=False)
-    load_data.clear()
-
-def add_workout_entry(entry_date: date, exercise: str, sets: list, unit: str, notes: str):
-    df = load_data()
-    ts = datetime.now().isoformat()
-    rows = []
-    for s in sets:
-        volume = s["reps"] * float(s["weight"])
-        rows.append({
-            "id": str(uuid.uuid4()),
-            "timestamp": ts,
-            "date": entry_date.isoformat(),
-            "exercise": exercise.strip(),
-            "set_num": int(s["set_num"]),
-            "reps": int(s["reps"]),
-            "weight": float(s["weight"]),
-            "unit": unit,
-            "notes": notes.strip(),
-            "volume": volume
-        })
-    if rows:
-        df = pd.concat([df, pd.DataFrame(rows)], ignore_index=True)
-        save_data(df)
-
-def delete_rows_by_ids(ids: list):
-    df = load_data()
-    if df.empty:
-        return
-    df = df[~df["id"].isin(ids)]
-    save_data(df)
-
-def get_weekly_summary(df: pd.DataFrame, weeks:int=DEFAULT_WEEKS, exercise_filter: str=None):
-    if df.empty:
-        return pd.DataFrame()
-    df2 = df.copy()
-    df2["date"] = pd.to_datetime(df2["date"])
-    df2["year_week"] = df2["date"].dt.strftime("%Y-W%V")
-    if exercise_filter and exercise_filter != "All":
-        df2 = df2[df2["exercise"] == exercise_filter]
-    grouped = df2.groupby("year_week")["volume"].sum().reset_index()
-    today = date.today()
-    wk_list = [(today - timedelta(weeks=i)).strftime("%Y-W%V") for i in range(weeks-1, -1, -1)]
-    df_weeks = pd.DataFrame({"year_week": wk_list})
-    merged = df_weeks.merge(grouped, on="year_week", how="left").fillna(0)
-    merged["volume"] = merged["volume"].astype(float)
-    return merged
-
-# ---------- Streamlit UI ----------
-st.set_page_config(page_title="Gym Workout Logger 🏋️", layout="wide")
-
-# --- Custom Green Background ---
-st.markdown(
-    """
-    <style>
-    .stApp {
-        background-color: #d4f7d4;  /* light green */
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
-
-# --- Title ---
-st.title("🏋️ Gym Workout Logger 💪🔥")
-
-st.markdown(
-    "Track your exercises (sets, reps, weight). "
-    "Stay strong and motivated! 🏃‍♂️🥊🧘‍♀️"
-)
-
-# Sidebar
-st.sidebar.header("⚙️ Settings")
-unit = st.sidebar.selectbox("🏋️ Weight unit", UNITS, index=0)
-weeks_to_show = st.sidebar.slider("📊 Weeks to show on chart", 4, 24, DEFAULT_WEEKS, 1)
-
-df = load_data()
-
-# --- Log workout ---
-st.subheader("📝 Log a workout")
-with st.form("log_form"):
-    col1, col2 = st.columns([2,1])
-    with col1:
-        exercise = st.text_input("💪 Exercise name", placeholder="e.g., Bench Press 🏋️")
-        entry_date = st.date_input("📅 Date", value=date.today())
-        notes = st.text_input("🗒️ Notes (optional)", placeholder="e.g., felt strong, focus on form 💯")
-    with col2:
-        num_sets = st.number_input("🔢 Number of sets", 1, 12, 3, 1)
-        st.markdown("**Enter reps & weights for each set 🏋️**")
-        sets = []
-        for i in range(1, int(num_sets)+1):
-            c1, c2 = st.columns([1,1])
-            reps = c1.number_input(f"Set {i} 🔄 reps", 0, 100, 8, 1, key=f"reps_{i}")
-            weight = c2.number_input(f"Set {i} 🏋️ weight ({unit})", 0.0, 1000.0, 50.0, 0.5, key=f"weight_{i}")
-            sets.append({"set_num": i, "reps": reps, "weight": weight})
-    submitted = st.form_submit_button("➕ Add workout ✅")
-    if submitted:
-        if not exercise.strip():
-            st.warning("⚠️ Please enter an exercise name.")
-        else:
-            add_workout_entry(entry_date, exercise, sets, unit, notes)
-            st.success(f"🎉 Added {len(sets)} sets for {exercise} on {entry_date}. Keep pushing! 💪🔥")
-            df = load_data()
-
-# --- Today's summary ---
-st.markdown("---")
-st.subheader("📌 Today's summary 🗓️")
-today = date.today()
-today_df = df[df["date"] == today]
-if today_df.empty:
-    st.info("No entries for today yet. 💤")
-else:
-    agg = today_df.groupby("exercise").agg(
-        sets=("set_num","count"),
-        total_reps=("reps","sum"),
-        total_volume=("volume","sum")
-    ).reset_index()
-    agg["total_volume"] = agg["total_volume"].round(2)
-    st.table(agg)
-
-# --- Full history ---
-st.markdown("---")
-st.subheader("📜 Full history 📊")
-if df.empty:
-    st.info("No workout history yet. Start logging today! 🏋️")
-else:
-    show_df = df.sort_values(by=["date","exercise","set_num"], ascending=[False,True,True])
-    options = show_df.apply(
-        lambda r: f"{r['date']} | {r['exercise']} | set {r['set_num']} | "
-                  f"{r['reps']} reps x {r['weight']}{r['unit']} (vol {r['volume']}) | id:{r['id']}",
-        axis=1
-    ).tolist()
-    selected = st.multiselect("❌ Select entries to delete 🗑️", options)
-    if st.button("🗑️ Delete selected"):
-        ids_to_del = [s.split("id:")[-1] for s in selected]
-        delete_rows_by_ids(ids_to_del)
-        st.success(f"✅ Deleted {len(ids_to_del)} rows.")
-        df = load_data()
-    st.dataframe(show_df.drop(columns=["id"]).rename(columns={
-        "date":"Date","exercise":"Exercise","set_num":"Set#",
-        "reps":"Reps","weight":"Weight","unit":"Unit","volume":"Volume","notes":"Notes"
-    }))
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Download history (CSV)", csv_bytes, "workout_history.csv","text/csv")
-
-# --- Weekly progress chart ---
-st.markdown("---")
-st.subheader("📈 Weekly progress (total volume = reps × weight) 📊")
-exercise_list = ["All"] + sorted(df["exercise"].dropna().unique().tolist()) if not df.empty else ["All"]
-selected_exercise = st.selectbox("🏋️ Select exercise", exercise_list)
-weeks = st.number_input("🗓️ Weeks to include", 4, 52, weeks_to_show, 1)
-
-summary_df = get_weekly_summary(df, weeks=weeks, exercise_filter=selected_exercise)
-if summary_df.empty:
-    st.info("No data to show in chart yet. Log some workouts first! 🏃‍♂️")
-else:
-    chart_df = summary_df.copy()
-    chart_df = chart_df.set_index("year_week")
-    chart_df.index.name = "Week"
-    st.bar_chart(chart_df["volume"])
-    display_table = chart_df.rename(columns={"volume":"Total Volume"})
-    st.table(display_table.assign(**{"Total Volume": display_table["Total Volume"].round(2)}))
-
-st.markdown("---")
-st.caption("Made with ❤️🏋️ by Your Gym Logger — stay strong every week 💪🔥")
+# gym_workout.py
+import argparse
+import bisect
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+# ---------- Config ----------
+DATA_DIR = Path("data")
+DATA_FILE = DATA_DIR / "workouts.csv"
+ROLLUP_FILE = DATA_DIR / "rollups.csv"
+DEFAULT_WEEKS = 12
+UNITS = ["kg", "lb"]
+KG_PER_LB = 0.45359237
+TO_KG = {"kg": 1.0, "lb": KG_PER_LB}
+COLUMNS = [
+    "id", "timestamp", "date", "iso_week", "exercise", "set_num",
+    "reps", "weight", "unit", "notes", "volume", "volume_kg"
+]
+CATEGORY_COLUMNS = ["exercise", "unit", "notes", "iso_week"]
+HISTORY_COLUMNS = ["date", "exercise", "set_num", "reps", "weight", "unit", "volume", "notes", "timestamp"]
+HISTORY_ORDER = (["date", "exercise", "set_num"], [False, True, True])
+ROLLUP_KEYS = ["exercise", "iso_week"]
+ROLLUP_COLUMNS = ROLLUP_KEYS + [
+    "sets", "volume", "best_weight", "best_reps", "e1rm_epley", "e1rm_brzycki"
+]
+
+# ---------- Helpers ----------
+def ensure_data_file():
+    DATA_DIR.mkdir(exist_ok=True)
+    if not DATA_FILE.exists():
+        df = pd.DataFrame(columns=COLUMNS)
+        df.to_csv(DATA_FILE, index=False)
+
+def iso_week_key(d: date) -> str:
+    """ISO week label used for weekly grouping, e.g. '2024-W07'."""
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def iso_week_series(dates: pd.Series) -> pd.Series:
+    """Vectorized iso_week_key for a column of dates."""
+    iso = pd.to_datetime(dates).dt.isocalendar()
+    return iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
+
+def kg_factor(units: pd.Series) -> np.ndarray:
+    """Per-row multiplier taking a weight in its logged unit to kg (unknown units count as kg)."""
+    # a categorical maps to a categorical of factors, which has no 1.0 category to fill with
+    return units.map(TO_KG).astype(float).fillna(1.0).to_numpy(dtype=float)
+
+def display_factor(unit: str) -> float:
+    """Multiplier taking kg to the display unit."""
+    return 1.0 / TO_KG.get(unit, 1.0)
+
+_HEX = np.frombuffer(b"0123456789abcdef", dtype="S1")
+_UUID_DIGITS = [i for i in range(36) if i not in (8, 13, 18, 23)]
+
+def uuid_to_bytes(ids: pd.Series) -> pd.Series:
+    """UUID strings -> 16-byte fixed-width binary column (vectorized, no per-row objects)."""
+    hex_digits = "".join(ids.astype(str).str.replace("-", "", regex=False))
+    data = pa.py_buffer(bytes.fromhex(hex_digits))
+    arr = pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), len(ids), [None, data])
+    return pd.Series(pd.arrays.ArrowExtensionArray(arr), index=ids.index, name=ids.name)
+
+def uuid_strings(ids: pd.Series) -> np.ndarray:
+    """Inverse of uuid_to_bytes, for writing the CSV back out."""
+    arr = ids.array.__arrow_array__().combine_chunks()
+    raw = np.frombuffer(arr.buffers()[1], dtype=np.uint8)[arr.offset * 16:(arr.offset + len(arr)) * 16]
+    raw = raw.reshape(-1, 16)
+    chars = np.full((len(raw), 36), b"-", dtype="S1")
+    chars[:, _UUID_DIGITS] = _HEX[np.stack([raw >> 4, raw & 15], axis=-1).reshape(-1, 32)]
+    return chars.view("S36").ravel().astype(str)
+
+def compact_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Typed in-memory layout: categoricals, downcast numbers, 16-byte ids, datetime64 dates.
+
+    Group by the categorical columns with observed=True, or every category shows up as an empty group.
+    """
+    if not isinstance(df["id"].dtype, pd.ArrowDtype):
+        df["id"] = uuid_to_bytes(df["id"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+    df["date"] = pd.to_datetime(df["date"])
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].fillna("").astype("category")
+    for col in ["set_num", "reps"]:
+        df[col] = pd.to_numeric(pd.to_numeric(df[col], errors="coerce").fillna(0), downcast="integer")
+    for col in ["weight", "volume", "volume_kg"]:
+        df[col] = pd.to_numeric(pd.to_numeric(df[col], errors="coerce").fillna(0.0), downcast="float")
+    return df
+
+def to_storage(df: pd.DataFrame) -> pd.DataFrame:
+    """The CSV layout: plain UUID strings and ISO dates."""
+    if not isinstance(df["id"].dtype, pd.ArrowDtype):
+        return df
+    return df.assign(
+        id=uuid_strings(df["id"]),
+        timestamp=df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+        date=df["date"].dt.strftime("%Y-%m-%d"),
+    )
+
+def read_history(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    # rows written before the iso_week column existed get it filled in once here
+    if "iso_week" not in df.columns:
+        df["iso_week"] = None
+    missing = df["iso_week"].isna()
+    if missing.any():
+        df.loc[missing, "iso_week"] = iso_week_series(df.loc[missing, "date"])
+    # same for volume_kg; `--migrate-units` writes it back to the file
+    df["volume"] = pd.to_numeric(df["volume"], errors="coerce").fillna(0.0)
+    if "volume_kg" not in df.columns:
+        df["volume_kg"] = np.nan
+    missing = df["volume_kg"].isna()
+    if missing.any():
+        df.loc[missing, "volume_kg"] = df.loc[missing, "volume"] * kg_factor(df.loc[missing, "unit"])
+    df = compact_types(df)
+    # sorted once per data version so the history table never has to
+    return df.sort_values(HISTORY_ORDER[0], ascending=HISTORY_ORDER[1], ignore_index=True)
+
+@st.cache_resource
+def load_data() -> pd.DataFrame:
+    # cache_resource hands every rerun the same frame instead of a pickled copy: treat it as read-only
+    ensure_data_file()
+    return read_history(DATA_FILE)
+
+def build_exercise_index(df: pd.DataFrame) -> dict:
+    """Partition the history by exercise: {exercise: rows of that exercise}, sorted by name."""
+    if df.empty:
+        return {}
+    return {name: part for name, part in df.groupby("exercise", sort=True, observed=True)}
+
+@st.cache_resource
+def load_exercise_index() -> dict:
+    # built once per data version (cleared in save_data), shared read-only by reruns
+    return build_exercise_index(load_data())
+
+def save_data(df: pd.DataFrame):
+    to_storage(df).to_csv(DATA_FILE, index=False)
+    load_data.clear()
+    load_exercise_index.clear()
+
+def add_workout_entry(entry_date: date, exercise: str, sets: list, unit: str, notes: str):
+    df = load_data()
+    exercise = load_name_index().add(exercise)
+    ts = datetime.now().isoformat()
+    rows = []
+    for s in sets:
+        volume = s["reps"] * float(s["weight"])
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "timestamp": ts,
+            "date": entry_date.isoformat(),
+            "iso_week": iso_week_key(entry_date),
+            "exercise": exercise,
+            "set_num": int(s["set_num"]),
+            "reps": int(s["reps"]),
+            "weight": float(s["weight"]),
+            "unit": unit,
+            "notes": notes.strip(),
+            "volume": volume
+        })
+    if rows:
+        new_rows = pd.DataFrame(rows)
+        new_rows["volume_kg"] = new_rows["volume"] * kg_factor(new_rows["unit"])
+        new_rows = compact_types(new_rows)
+        df = pd.concat([df, new_rows], ignore_index=True) if not df.empty else new_rows
+        save_data(df)
+        update_rollups(rollup_keys(new_rows), load_exercise_index())
+
+def delete_rows_by_ids(ids):
+    df = load_data()
+    if df.empty:
+        return
+    removed = df["id"].isin(ids)
+    keys = rollup_keys(df[removed])
+    df = df[~removed]
+    save_data(df)
+    update_rollups(keys, load_exercise_index())
+    load_name_index.clear()  # a name whose last set was deleted leaves the suggestions
+
+# ---------- Exercise names ----------
+def clean_exercise_name(name: str) -> str:
+    """Trim and collapse inner whitespace: '  Bench   Press ' -> 'Bench Press'."""
+    return " ".join(str(name).split())
+
+def exercise_key(name: str) -> str:
+    """Spelling-insensitive identity of an exercise: 'Bench press' and 'bench  PRESS' share one key."""
+    return clean_exercise_name(name).casefold()
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class ExerciseNameIndex:
+    """Known exercises: sorted keys for prefix lookups plus a trigram index for fuzzy matches."""
+
+    def __init__(self, names=()):
+        self.keys = []                      # sorted exercise keys
+        self.display = {}                   # key -> canonical spelling
+        self.grams = defaultdict(list)      # trigram -> keys containing it
+        for name in names:
+            self._register(name)
+        self.keys = sorted(self.display)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _register(self, name: str):
+        key = exercise_key(name)
+        if not key or key in self.display:
+            return key, False
+        self.display[key] = clean_exercise_name(name)
+        for gram in _trigrams(key):
+            self.grams[gram].append(key)
+        return key, True
+
+    def add(self, name: str) -> str:
+        """Register a name (first spelling of a key wins) and return its canonical spelling."""
+        key, new = self._register(name)
+        if new:
+            bisect.insort(self.keys, key)
+        return self.display.get(key, "")
+
+    def resolve(self, name: str) -> str:
+        """Canonical spelling of an already-known exercise, else the cleaned-up name."""
+        return self.display.get(exercise_key(name), clean_exercise_name(name))
+
+    def complete(self, prefix: str, limit: int = 8) -> list:
+        key = exercise_key(prefix)
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_left(self.keys, key + "\uffff", lo)
+        return [self.display[k] for k in self.keys[lo:min(hi, lo + limit)]]
+
+    def fuzzy(self, text: str, limit: int = 8, max_postings: int = 2000) -> list:
+        key = exercise_key(text)
+        if not key:
+            return []
+        grams = _trigrams(key)
+        # vote with the rarest trigrams first; common ones ("ess", " pr") add little signal
+        postings = sorted((self.grams[g] for g in grams if g in self.grams), key=len)
+        votes = Counter()
+        budget = max_postings
+        for keys in postings:
+            if budget <= 0:
+                break
+            votes.update(keys[:budget])
+            budget -= len(keys)
+        # rank the best-voted candidates by trigram similarity (Dice coefficient)
+        shortlist = [k for k, _ in votes.most_common(limit * 4)]
+        shortlist.sort(key=lambda k: 2 * len(grams & _trigrams(k)) / (len(grams) + len(k) + 1), reverse=True)
+        return [self.display[k] for k in shortlist[:limit]]
+
+    def suggest(self, text: str, limit: int = 8) -> list:
+        """Prefix completions first, topped up with fuzzy matches for typos."""
+        out = self.complete(text, limit)
+        if len(out) < limit:
+            out += [n for n in self.fuzzy(text, limit) if n not in out][:limit - len(out)]
+        return out
+
+def canonical_spellings(names: pd.Series) -> dict:
+    """Spelling -> canonical spelling, the most used spelling of each key winning."""
+    counts = names.astype(str).value_counts()
+    best = {}
+    for spelling in counts.index:  # most frequent first
+        best.setdefault(exercise_key(spelling), clean_exercise_name(spelling))
+    return {spelling: best[exercise_key(spelling)] for spelling in counts.index}
+
+def build_name_index(df: pd.DataFrame) -> ExerciseNameIndex:
+    if df.empty:
+        return ExerciseNameIndex()
+    mapping = canonical_spellings(df["exercise"])
+    return ExerciseNameIndex(sorted(set(mapping.values())))
+
+@st.cache_resource
+def load_name_index() -> ExerciseNameIndex:
+    # built from history, kept current by add_workout_entry and rebuilt after deletes and renames
+    return build_name_index(load_data())
+
+def canonicalize_exercises() -> dict:
+    """Merge spelling variants in the saved history into one name each; returns the renames."""
+    df = load_data()
+    if df.empty:
+        return {}
+    mapping = canonical_spellings(df["exercise"])
+    renames = {old: new for old, new in mapping.items() if old != new}
+    if renames:
+        exercise = df["exercise"].astype(str)
+        save_data(df.assign(exercise=exercise.map(mapping).fillna(exercise)))
+        rebuild_rollups()
+        load_rollups.clear()
+        load_name_index.clear()
+    return renames
+
+# ---------- Rollups & personal records ----------
+def e1rm_epley(weight, reps):
+    """Estimated one-rep max (Epley); a single rep is the lift itself."""
+    weight = np.asarray(weight, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    return np.where(reps > 1, weight * (1 + reps / 30), np.where(reps == 1, weight, 0.0))
+
+def e1rm_brzycki(weight, reps):
+    """Estimated one-rep max (Brzycki); the formula breaks down from 37 reps, those count as 0."""
+    weight = np.asarray(weight, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    valid = (reps >= 1) & (reps < 37)
+    return np.where(valid, weight * 36 / np.where(valid, 37 - reps, 1), 0.0)
+
+def rollup_keys(rows: pd.DataFrame) -> set:
+    """The (exercise, iso_week) groups touched by some rows."""
+    return set(zip(rows["exercise"].tolist(), rows["iso_week"].tolist()))
+
+def compute_rollups(rows: pd.DataFrame) -> pd.DataFrame:
+    """Per exercise and ISO week: set count, volume, best set and best estimated 1RM, all in kg."""
+    if rows.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    weight_kg = rows["weight"].to_numpy(dtype=float) * kg_factor(rows["unit"])
+    work = rows[ROLLUP_KEYS + ["reps", "volume_kg"]].assign(
+        weight=weight_kg,
+        e1rm_epley=e1rm_epley(weight_kg, rows["reps"]),
+        e1rm_brzycki=e1rm_brzycki(weight_kg, rows["reps"]),
+    )
+    out = work.groupby(ROLLUP_KEYS, sort=True, observed=True).agg(
+        sets=("reps", "size"),
+        volume=("volume_kg", "sum"),
+        e1rm_epley=("e1rm_epley", "max"),
+        e1rm_brzycki=("e1rm_brzycki", "max"),
+    )
+    # best set = heaviest weight, more reps breaking ties
+    best = (work.sort_values(["weight", "reps"]).groupby(ROLLUP_KEYS, observed=True).tail(1)
+            .set_index(ROLLUP_KEYS)[["weight", "reps"]]
+            .rename(columns={"weight": "best_weight", "reps": "best_reps"}))
+    return out.join(best).reset_index()[ROLLUP_COLUMNS]
+
+def apply_rollup_update(rollups: pd.DataFrame, index: dict, keys: set) -> pd.DataFrame:
+    """Recompute only the groups in `keys`, reading just those exercises' partitions."""
+    if not keys:
+        return rollups
+    parts = [index[e] for e in sorted({e for e, _ in keys}) if e in index]
+    if parts:
+        rows = pd.concat(parts)
+        rows = rows[rows["iso_week"].isin({w for _, w in keys})]
+    else:
+        rows = pd.DataFrame(columns=COLUMNS)
+    key_list = list(keys)
+    fresh = compute_rollups(rows)
+    fresh = fresh[pd.MultiIndex.from_frame(fresh[ROLLUP_KEYS]).isin(key_list)]
+    stale = pd.MultiIndex.from_frame(rollups[ROLLUP_KEYS]).isin(key_list)
+    merged = pd.concat([rollups[~stale], fresh], ignore_index=True)
+    return merged.sort_values(ROLLUP_KEYS, ignore_index=True)
+
+def rebuild_rollups() -> pd.DataFrame:
+    """Recompute every rollup from the full history and write them out."""
+    rollups = compute_rollups(load_data())
+    rollups.to_csv(ROLLUP_FILE, index=False)
+    return rollups
+
+def migrate_units() -> int:
+    """Backfill volume_kg for rows logged before it existed, then rebuild the (now kg) rollups."""
+    ensure_data_file()
+    raw = pd.read_csv(DATA_FILE)
+    missing = int(raw["volume_kg"].isna().sum()) if "volume_kg" in raw.columns else len(raw)
+    save_data(load_data())
+    rebuild_rollups()
+    return missing
+
+@st.cache_data
+def load_rollups() -> pd.DataFrame:
+    ensure_data_file()
+    if not ROLLUP_FILE.exists():
+        return rebuild_rollups()
+    return pd.read_csv(ROLLUP_FILE)
+
+def update_rollups(keys: set, index: dict):
+    rollups = apply_rollup_update(load_rollups(), index, keys)
+    rollups.to_csv(ROLLUP_FILE, index=False)
+    load_rollups.clear()
+
+def get_personal_records(rollups: pd.DataFrame) -> pd.DataFrame:
+    """Per exercise: heaviest set (and the week it happened), best e1RM and best weekly volume."""
+    if rollups.empty:
+        return pd.DataFrame()
+    best_set = (rollups.sort_values(["best_weight", "best_reps"]).groupby("exercise", observed=True).tail(1)
+                .set_index("exercise")[["best_weight", "best_reps", "iso_week"]])
+    bests = rollups.groupby("exercise", observed=True).agg(
+        e1rm_epley=("e1rm_epley", "max"),
+        e1rm_brzycki=("e1rm_brzycki", "max"),
+        best_week_volume=("volume", "max"),
+    )
+    return best_set.join(bests).sort_index().reset_index()
+
+def get_weekly_summary(rollups: pd.DataFrame, weeks:int=DEFAULT_WEEKS, exercise_filter: str=None):
+    if rollups.empty:
+        return pd.DataFrame()
+    rows = rollups
+    if exercise_filter and exercise_filter != "All":
+        rows = rollups[rollups["exercise"] == exercise_filter]
+    grouped = rows.groupby("iso_week", observed=True)["volume"].sum()
+    today = date.today()
+    wk_list = [iso_week_key(today - timedelta(weeks=i)) for i in range(weeks-1, -1, -1)]
+    volume = grouped.reindex(wk_list, fill_value=0.0).astype(float)
+    return pd.DataFrame({"year_week": wk_list, "volume": volume.to_numpy()})
+
+# ---------- Benchmarks ----------
+def make_synthetic_history(n_exercises: int = 50, years: int = 5, sessions_per_week: int = 2,
+                           sets_per_session: int = 4, seed: int = 0) -> pd.DataFrame:
+    """Random history in the CSV layout; compact_types() turns it into load_data() shape."""
+    rng = np.random.default_rng(seed)
+    start = date.today() - timedelta(weeks=52 * years)
+    n_days = 7 * 52 * years
+    n_sessions = n_exercises * sessions_per_week * 52 * years
+    day_offsets = rng.integers(0, n_days, n_sessions)
+    exercise_ids = np.repeat(np.arange(n_exercises), sessions_per_week * 52 * years)
+    n = n_sessions * sets_per_session
+    dates = pd.to_datetime(start) + pd.to_timedelta(np.repeat(day_offsets, sets_per_session), unit="D")
+    reps = rng.integers(3, 13, n)
+    weight = rng.integers(20, 200, n).astype(float)
+    df = pd.DataFrame({
+        "id": [str(uuid.uuid4()) for _ in range(n)],
+        "timestamp": dates.strftime("%Y-%m-%dT%H:%M:%S"),
+        "date": dates.strftime("%Y-%m-%d"),
+        "iso_week": iso_week_series(pd.Series(dates)),
+        "exercise": [f"Exercise {i:02d}" for i in np.repeat(exercise_ids, sets_per_session)],
+        "set_num": np.tile(np.arange(1, sets_per_session + 1), n_sessions),
+        "reps": reps,
+        "weight": weight,
+        "unit": rng.choice(UNITS, n),
+        "notes": "",
+        "volume": reps * weight,
+    })
+    df["volume_kg"] = df["volume"] * kg_factor(df["unit"])
+    return df
+
+def _time_it(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+def bench_weekly_summary(n_exercises: int = 50, years: int = 5):
+    df = compact_types(make_synthetic_history(n_exercises, years))
+    exercise = "Exercise 07"
+    print(f"history: {len(df):,} sets, {n_exercises} exercises, {years} years")
+
+    def full_scan():
+        # the pre-index implementation: copy, strftime every row, then filter
+        df2 = df.copy()
+        df2["date"] = pd.to_datetime(df2["date"])
+        df2["year_week"] = df2["date"].dt.strftime("%Y-W%V")
+        df2 = df2[df2["exercise"] == exercise]
+        return df2.groupby("year_week")["volume"].sum()
+
+    t0 = time.perf_counter()
+    index = build_exercise_index(df)
+    build_ms = (time.perf_counter() - t0) * 1000
+    rollups = compute_rollups(df)
+    new_rows = index[exercise].tail(4)
+    print(f"index build (once per write): {build_ms:8.2f} ms")
+    print(f"rollup full rebuild:          {_time_it(lambda: compute_rollups(df)):8.2f} ms")
+    print(f"rollup incremental update:    {_time_it(lambda: apply_rollup_update(rollups, index, rollup_keys(new_rows))):8.2f} ms")
+    print(f"full scan summary:            {_time_it(full_scan):8.2f} ms")
+    print(f"rollup summary:               {_time_it(lambda: get_weekly_summary(rollups, 52, exercise)):8.2f} ms")
+    print(f"dropdown unique():            {_time_it(lambda: sorted(df['exercise'].dropna().unique().tolist())):8.2f} ms")
+    print(f"dropdown from index:          {_time_it(lambda: list(index)):8.2f} ms")
+
+def check_rollups(n_ops: int = 200, seed: int = 0):
+    """Random adds/deletes; after each, incremental rollups must equal a from-scratch recomputation."""
+    rng = random.Random(seed)
+    df = compact_types(make_synthetic_history(n_exercises=5, years=1, seed=seed))
+    rollups = compute_rollups(df)
+    for op in range(n_ops):
+        if rng.random() < 0.6 or df.empty:
+            new_rows = df.sample(rng.randint(1, 4), random_state=rng.randint(0, 2**31)).copy() if not df.empty \
+                else make_synthetic_history(n_exercises=1, years=1, seed=op).head(3)
+            new_rows["id"] = [str(uuid.uuid4()) for _ in range(len(new_rows))]
+            if rng.random() < 0.1:
+                new_rows["exercise"] = f"New exercise {op}"
+            new_rows["reps"] = [rng.randint(0, 40) for _ in range(len(new_rows))]
+            new_rows["weight"] = [rng.choice([0.0, 20.0, 42.5, 100.0, 140.0]) for _ in range(len(new_rows))]
+            new_rows["unit"] = [rng.choice(UNITS) for _ in range(len(new_rows))]
+            new_rows["volume"] = new_rows["reps"] * new_rows["weight"]
+            new_rows["volume_kg"] = new_rows["volume"] * kg_factor(new_rows["unit"])
+            keys = rollup_keys(new_rows)
+            df = pd.concat([df, new_rows], ignore_index=True)
+        else:
+            removed = df["id"].isin(df["id"].sample(rng.randint(1, 30), random_state=rng.randint(0, 2**31)))
+            keys = rollup_keys(df[removed])
+            df = df[~removed]
+        rollups = apply_rollup_update(rollups, build_exercise_index(df), keys)
+        expected = compute_rollups(df)
+        pd.testing.assert_frame_equal(rollups.reset_index(drop=True), expected.reset_index(drop=True),
+                                      check_dtype=False)
+    print(f"rollups OK after {n_ops} random adds/deletes ({len(df):,} sets, {len(rollups):,} groups)")
+
+def bench_name_index(n_names: int = 50_000, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["bench", "press", "incline", "decline", "dumbbell", "barbell", "cable", "machine", "row",
+             "squat", "front", "back", "split", "curl", "hammer", "lateral", "raise", "fly", "pull",
+             "push", "deadlift", "romanian", "sumo", "close", "grip", "wide", "seated", "standing",
+             "single", "arm", "leg", "extension", "kickback", "shrug", "lunge", "walking", "paused"]
+    names = set()
+    while len(names) < n_names:
+        names.add(" ".join(rng.sample(words, rng.randint(2, 4))).title() + f" {rng.randint(1, 99)}")
+    t0 = time.perf_counter()
+    index = ExerciseNameIndex(names)
+    print(f"name index: {len(index):,} names built in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    samples = rng.sample(sorted(names), 200)
+    prefixes = [n[:rng.randint(2, 8)] for n in samples]
+    typos = []
+    for n in samples:
+        i = rng.randrange(len(n))
+        typos.append(n[:i] + n[i + 1:])
+    for label, queries in [("prefix", prefixes), ("typo", typos)]:
+        t0 = time.perf_counter()
+        for q in queries:
+            index.suggest(q)
+        print(f"suggest ({label}): {(time.perf_counter() - t0) / len(queries) * 1e6:8.1f} us/lookup")
+
+# the CSV layout the legacy loader read: no iso_week or volume_kg yet
+_LEGACY_COLUMNS = ["id", "timestamp", "date", "exercise", "set_num", "reps", "weight", "unit", "notes", "volume"]
+
+def _legacy_load(path: Path) -> pd.DataFrame:
+    # load_data() before the typed layout, kept for the memory report
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["reps"] = pd.to_numeric(df["reps"], errors="coerce").fillna(0).astype(int)
+    df["weight"] = pd.to_numeric(df["weight"], errors="coerce").fillna(0.0)
+    df["volume"] = pd.to_numeric(df["volume"], errors="coerce").fillna(0.0)
+    return df
+
+def memory_report(n_sets: int = 1_000_000):
+    """Resident size of the loaded history, old loader vs typed loader, per column and per 1M sets."""
+    sets_per_session = 4
+    sessions_per_week = max(1, round(n_sets / (50 * 5 * 52 * sets_per_session)))
+    raw = make_synthetic_history(50, 5, sessions_per_week, sets_per_session)
+    n = len(raw)
+    with tempfile.TemporaryDirectory() as tmp:
+        path, legacy_path = Path(tmp) / "workouts.csv", Path(tmp) / "legacy.csv"
+        raw.to_csv(path, index=False)
+        raw[_LEGACY_COLUMNS].to_csv(legacy_path, index=False)
+        del raw
+        before = _legacy_load(legacy_path).memory_usage(deep=True, index=False)
+        after = read_history(path).memory_usage(deep=True, index=False)
+    report = pd.DataFrame({"before_MB": before, "after_MB": after}).fillna(0.0) / 1e6 * (1_000_000 / n)
+    report.loc["TOTAL"] = report.sum()
+    print(f"{n:,} sets loaded, figures scaled to 1M sets")
+    print(report.round(2).to_string())
+
+# ---------- Command line ----------
+def run_cli(argv: list):
+    parser = argparse.ArgumentParser(description="Gym workout logger maintenance commands")
+    parser.add_argument("--bench", action="store_true", help="benchmark weekly summaries on synthetic history")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="recompute data/rollups.csv from the full history")
+    parser.add_argument("--canonicalize", action="store_true", help="merge spelling variants of exercise names")
+    parser.add_argument("--bench-names", action="store_true", help="benchmark exercise autocomplete lookups")
+    parser.add_argument("--migrate-units", action="store_true", help="backfill volume_kg for existing rows")
+    parser.add_argument("--check-rollups", action="store_true", help="check incremental rollups against full recomputation")
+    parser.add_argument("--memory-report", action="store_true", help="memory per 1M sets, old vs typed loader")
+    parser.add_argument("--exercises", type=int, default=50)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args(argv)
+    if args.migrate_units:
+        print(f"backfilled volume_kg for {migrate_units():,} rows")
+    if args.canonicalize:
+        renames = canonicalize_exercises()
+        for old, new in sorted(renames.items()):
+            print(f"{old!r} -> {new!r}")
+        print(f"merged {len(renames)} spelling variants")
+    if args.rebuild_rollups:
+        rollups = rebuild_rollups()
+        print(f"rebuilt {len(rollups):,} rollup rows into {ROLLUP_FILE}")
+    if args.check_rollups:
+        check_rollups()
+    if args.bench:
+        bench_weekly_summary(args.exercises, args.years)
+    if args.memory_report:
+        memory_report()
+    if args.bench_names:
+        bench_name_index()
+
+# python "Day-07 Gym_workout.py" --bench   (plain `streamlit run` passes no arguments)
+if __name__ == "__main__" and len(sys.argv) > 1:
+    run_cli(sys.argv[1:])
+    sys.exit(0)
+
+# ---------- Streamlit UI ----------
+st.set_page_config(page_title="Gym Workout Logger 🏋️", layout="wide")
+
+# --- Custom Green Background ---
+st.markdown(
+    """
+    <style>
+    .stApp {
+        background-color: #d4f7d4;  /* light green */
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+# --- Title ---
+st.title("🏋️ Gym Workout Logger 💪🔥")
+
+st.markdown(
+    "Track your exercises (sets, reps, weight). "
+    "Stay strong and motivated! 🏃‍♂️🥊🧘‍♀️"
+)
+
+# Sidebar
+st.sidebar.header("⚙️ Settings")
+unit = st.sidebar.selectbox("🏋️ Weight unit", UNITS, index=0)
+weeks_to_show = st.sidebar.slider("📊 Weeks to show on chart", 4, 24, DEFAULT_WEEKS, 1)
+
+df = load_data()
+name_index = load_name_index()
+to_unit = display_factor(unit)  # stored aggregates are kg; this is the only conversion
+
+# --- Log workout ---
+st.subheader("📝 Log a workout")
+# outside the form so suggestions refresh as the name is typed
+exercise = st.text_input("💪 Exercise name", placeholder="e.g., Bench Press 🏋️")
+if exercise.strip():
+    canonical = name_index.resolve(exercise)
+    if exercise_key(exercise) in name_index.display and canonical != exercise:
+        st.caption(f"Will be logged as **{canonical}** ✅")
+    else:
+        suggestions = name_index.suggest(exercise, limit=5)
+        if suggestions:
+            st.caption("💡 Known exercises: " + " · ".join(suggestions))
+with st.form("log_form"):
+    col1, col2 = st.columns([2,1])
+    with col1:
+        entry_date = st.date_input("📅 Date", value=date.today())
+        notes = st.text_input("🗒️ Notes (optional)", placeholder="e.g., felt strong, focus on form 💯")
+    with col2:
+        num_sets = st.number_input("🔢 Number of sets", 1, 12, 3, 1)
+        st.markdown("**Enter reps & weights for each set 🏋️**")
+        sets = []
+        for i in range(1, int(num_sets)+1):
+            c1, c2 = st.columns([1,1])
+            reps = c1.number_input(f"Set {i} 🔄 reps", 0, 100, 8, 1, key=f"reps_{i}")
+            weight = c2.number_input(f"Set {i} 🏋️ weight ({unit})", 0.0, 1000.0, 50.0, 0.5, key=f"weight_{i}")
+            sets.append({"set_num": i, "reps": reps, "weight": weight})
+    submitted = st.form_submit_button("➕ Add workout ✅")
+    if submitted:
+        if not exercise.strip():
+            st.warning("⚠️ Please enter an exercise name.")
+        else:
+            add_workout_entry(entry_date, exercise, sets, unit, notes)
+            st.success(f"🎉 Added {len(sets)} sets for {exercise} on {entry_date}. Keep pushing! 💪🔥")
+            df = load_data()
+
+# --- Today's summary ---
+st.markdown("---")
+st.subheader("📌 Today's summary 🗓️")
+today = date.today()
+today_df = df[df["date"] == pd.Timestamp(today)] if not df.empty else df
+if today_df.empty:
+    st.info("No entries for today yet. 💤")
+else:
+    agg = today_df.groupby("exercise", observed=True).agg(
+        sets=("set_num","count"),
+        total_reps=("reps","sum"),
+        total_volume=("volume_kg","sum")
+    ).reset_index()
+    agg["total_volume"] = (agg["total_volume"] * to_unit).round(2)
+    agg = agg.rename(columns={"total_volume": f"total_volume ({unit})"})
+    st.table(agg)
+
+# --- Full history ---
+st.markdown("---")
+st.subheader("📜 Full history 📊")
+if df.empty:
+    st.info("No workout history yet. Start logging today! 🏋️")
+else:
+    # df is already in history order (see read_history) and labels come from column_config; the
+    # column subset is a lazy copy under copy-on-write (pandas 3), a real copy of those columns before
+    st.markdown("❌ Select entries to delete 🗑️ (tick rows in the table)")
+    history = st.dataframe(
+        df[HISTORY_COLUMNS],
+        key="history_table",
+        on_select="rerun",
+        selection_mode="multi-row",
+        hide_index=True,
+        column_config={
+            "date": st.column_config.DateColumn("Date"),
+            "exercise": "Exercise", "set_num": "Set#", "reps": "Reps", "weight": "Weight",
+            "unit": "Unit", "volume": "Volume", "notes": "Notes",
+            "timestamp": st.column_config.DatetimeColumn("Logged at"),
+        },
+    )
+    selected_rows = history.selection.rows
+    if st.button("🗑️ Delete selected", disabled=not selected_rows):
+        delete_rows_by_ids(df["id"].iloc[selected_rows])
+        st.success(f"✅ Deleted {len(selected_rows)} rows.")
+        df = load_data()
+    # the CSV on disk already is the export; no re-encoding per rerun
+    st.download_button("⬇️ Download history (CSV)", DATA_FILE.read_bytes(), "workout_history.csv","text/csv")
+
+# --- Weekly progress chart ---
+st.markdown("---")
+st.subheader(f"📈 Weekly progress (total volume = reps × weight, in {unit}) 📊")
+exercise_index = load_exercise_index()
+exercise_list = ["All"] + list(exercise_index)
+selected_exercise = st.selectbox("🏋️ Select exercise", exercise_list)
+weeks = st.number_input("🗓️ Weeks to include", 4, 52, weeks_to_show, 1)
+
+rollups = load_rollups()
+summary_df = get_weekly_summary(rollups, weeks=weeks, exercise_filter=selected_exercise)
+if summary_df.empty:
+    st.info("No data to show in chart yet. Log some workouts first! 🏃‍♂️")
+else:
+    chart_df = summary_df.set_index("year_week")
+    chart_df["volume"] *= to_unit
+    chart_df.index.name = "Week"
+    st.bar_chart(chart_df["volume"])
+    display_table = chart_df.rename(columns={"volume":"Total Volume"})
+    st.table(display_table.assign(**{"Total Volume": display_table["Total Volume"].round(2)}))
+
+# --- Personal records ---
+st.markdown("---")
+st.subheader("🏆 Personal records 🥇")
+pr_df = get_personal_records(rollups)
+if pr_df.empty:
+    st.info("No personal records yet. Go set some! 💪")
+else:
+    weight_cols = ["best_weight", "e1rm_epley", "e1rm_brzycki", "best_week_volume"]
+    pr_df[weight_cols] *= to_unit
+    st.caption(f"Weights and volumes in {unit}.")
+    st.table(pr_df.rename(columns={
+        "exercise": "Exercise", "best_weight": "Heaviest set", "best_reps": "Reps",
+        "iso_week": "Week", "e1rm_epley": "e1RM (Epley)", "e1rm_brzycki": "e1RM (Brzycki)",
+        "best_week_volume": "Best week volume"
+    }).round(2))
+
+st.markdown("---")
+st.caption("Made with ❤️🏋️ by Your Gym Logger — stay strong every week 💪🔥")
@@ -1,210 +1,344 @@
-# app.py
-import requests
-import streamlit as st
-import pandas as pd
-from datetime import date, timedelta
-from dotenv import load_dotenv
-
-load_dotenv()
-
-API_BASE = "https://api.exchangerate.host"
-FALLBACK_PROVIDER = "https://api.frankfurter.app"
-DEFAULT_FROM = "USD"
-DEFAULT_TO = "EUR"
-
-# ---------------------------
-# Streamlit Page Config
-# ---------------------------
-st.set_page_config(page_title="Universal Currency Converter", layout="centered")
-
-# ---------------------------
-# Custom Styling
-# ---------------------------
-st.markdown(
-    """
-    <style>
-    .stApp {
-        background-color: #32CD32;   /* bright green */
-        color: black;
-    }
-    h1, h2, h3, h4, h5, h6, p, div, span, label {
-        color: black !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
-
-# ---------------------------
-# Title + Fun Emojis + GIF
-# ---------------------------
-st.markdown("## 💱💹💵 Universal Currency Converter 💶💴💷")
-st.image(
-    "https://media.giphy.com/media/v1.Y2lkPTc5MGI3NjExNDM4b3VhdHZvYnpkdzRyOGoybnBkbWF6YTVkNzVxaDRrYTVvb2k1biZlcD12MV9naWZzX3NlYXJjaCZjdD1n/NFA61GS9qKZ68/giphy.gif",
-    caption="💸 Real-time exchange rates in action!",
-    use_column_width=True
-)
-
-st.markdown(
-    "Easily convert between currencies, view 📈 historical charts, and download results. "
-    "Powered by exchangerate.host (fallback: Frankfurter)."
-)
-
-# ---------------------------
-# Debug toggle
-# ---------------------------
-show_debug = st.checkbox("Show debug output", value=False)
-
-# ---------------------------
-# API Helpers
-# ---------------------------
-@st.cache_data(ttl=3600)
-def get_symbols():
-    try:
-        r = requests.get(f"{API_BASE}/symbols", timeout=8)
-        r.raise_for_status()
-        data = r.json()
-        if data.get("symbols"):
-            return data["symbols"]
-    except Exception:
-        pass
-    # fallback
-    return {
-        "USD": {"description": "United States Dollar"},
-        "EUR": {"description": "Euro"},
-        "GBP": {"description": "British Pound"},
-        "INR": {"description": "Indian Rupee"},
-        "JPY": {"description": "Japanese Yen"},
-        "AUD": {"description": "Australian Dollar"},
-        "CAD": {"description": "Canadian Dollar"},
-        "CNY": {"description": "Chinese Yuan"}
-    }
-
-def convert_amount(amount: float, from_curr: str, to_curr: str, conv_date: str = None):
-    from_curr = (from_curr or "").upper()
-    to_curr = (to_curr or "").upper()
-
-    # same currency quick return
-    if from_curr == to_curr:
-        used_date = conv_date if conv_date else date.today().isoformat()
-        return {"success": True, "provider": "same-currency",
-                "query": {"from": from_curr, "to": to_curr, "amount": amount},
-                "info": {"rate": 1.0}, "date": used_date, "result": float(amount)}
-
-    # exchangerate.host
-    try:
-        params = {"from": from_curr, "to": to_curr, "amount": amount}
-        if conv_date:
-            params["date"] = conv_date
-        r = requests.get(f"{API_BASE}/convert", params=params, timeout=10)
-        r.raise_for_status()
-        j = r.json()
-        rate = j.get("info", {}).get("rate")
-        result = j.get("result")
-        if show_debug:
-            st.write("DEBUG exchangerate.host response:", j)
-        if rate is not None and result is not None:
-            j["provider"] = "exchangerate.host"
-            j["success"] = True
-            return j
-    except Exception as e:
-        if show_debug:
-            st.write("DEBUG exchangerate.host error:", repr(e))
-
-    # fallback frankfurter
-    try:
-        if conv_date:
-            url = f"{FALLBACK_PROVIDER}/{conv_date}"
-        else:
-            url = f"{FALLBACK_PROVIDER}/latest"
-        params_f = {"amount": amount, "from": from_curr, "to": to_curr}
-        r2 = requests.get(url, params=params_f, timeout=10)
-        r2.raise_for_status()
-        j2 = r2.json()
-        if show_debug:
-            st.write("DEBUG frankfurter response:", j2)
-        rates = j2.get("rates", {})
-        rate_val = rates.get(to_curr)
-        if rate_val is not None:
-            result_val = float(amount) * float(rate_val)
-            return {"success": True, "provider": "frankfurter",
-                    "query": {"from": from_curr, "to": to_curr, "amount": amount},
-                    "info": {"rate": float(rate_val)}, "date": j2.get("date"), "result": result_val}
-    except Exception as e:
-        if show_debug:
-            st.write("DEBUG frankfurter error:", repr(e))
-
-    return {"success": False, "provider": None}
-
-@st.cache_data(ttl=600)
-def fetch_timeseries(from_curr: str, to_curr: str, start_date: str, end_date: str):
-    params = {"start_date": start_date, "end_date": end_date, "base": from_curr, "symbols": to_curr}
-    r = requests.get(f"{API_BASE}/timeseries", params=params, timeout=15)
-    r.raise_for_status()
-    data = r.json()
-    if not data.get("rates"):
-        raise RuntimeError("No rates in response")
-    items = []
-    for d, entry in sorted(data["rates"].items()):
-        rate = entry.get(to_curr)
-        items.append((d, rate))
-    df = pd.DataFrame(items, columns=["date", "rate"])
-    df["date"] = pd.to_datetime(df["date"])
-    df.set_index("date", inplace=True)
-    return df["rate"]
-
-# ---------------------------
-# UI
-# ---------------------------
-symbols = get_symbols()
-codes = sorted(symbols.keys())
-
-col1, col2 = st.columns([1,1])
-with col1:
-    amount = st.number_input("💵 Amount", value=1.0, format="%.2f")
-    from_curr = st.selectbox("From Currency 💲", codes, index=codes.index(DEFAULT_FROM) if DEFAULT_FROM in codes else 0)
-with col2:
-    to_curr = st.selectbox("To Currency 💱", codes, index=codes.index(DEFAULT_TO) if DEFAULT_TO in codes else 1)
-    if st.button("🔄 Swap"):
-        from_curr, to_curr = to_curr, from_curr
-        st.experimental_rerun()
-
-conv_date = None
-if st.checkbox("📅 Use specific date for conversion (historical)?", value=False):
-    conv_date = st.date_input("Conversion date", value=date.today() - timedelta(days=1)).isoformat()
-
-if st.button("🚀 Convert"):
-    resp = convert_amount(amount, from_curr, to_curr, conv_date)
-    if not resp.get("success"):
-        st.error("❌ Could not fetch a valid exchange rate. Try again later or with different currencies.")
-    else:
-        rate = resp.get("info", {}).get("rate")
-        result = resp.get("result")
-        used_date = resp.get("date")
-        provider = resp.get("provider")
-        st.metric(label=f"{amount} {from_curr} → {to_curr} ({provider})", value=f"{result:,.2f}")
-        st.write(f"💹 Exchange rate: 1 {from_curr} = {rate:,.6f} {to_curr}  (date: {used_date})")
-        if rate:
-            st.write(f"📊 Inverse: 1 {to_curr} = {1/rate:,.6f} {from_curr}")
-
-        # download
-        summary = f"Conversion result\nProvider: {provider}\nDate: {used_date}\n{amount} {from_curr} = {result:,.2f} {to_curr}\nRate: {rate}"
-        st.download_button("⬇️ Download result (TXT)", data=summary, file_name="conversion.txt", mime="text/plain")
-
-st.markdown("---")
-st.subheader("📈 Historical rates (time series)")
-
-days = st.slider("Days back to show", 7, 365, 90)
-end_dt = date.today()
-start_dt = end_dt - timedelta(days=days)
-if st.button("📊 Show historical chart"):
-    try:
-        series = fetch_timeseries(from_curr, to_curr, start_dt.isoformat(), end_dt.isoformat())
-        st.line_chart(series)
-        csv = series.reset_index().to_csv(index=False).encode("utf-8")
-        st.download_button("⬇️ Download rates CSV", data=csv, file_name="rates.csv", mime="text/csv")
-    except Exception as e:
-        st.error(f"⚠️ Could not fetch timeseries: {e}")
-
-st.markdown("---")
-st.caption("💼 Powered by exchangerate.host (fallback: Frankfurter).")
+# app.py
+import os
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+from dotenv import load_dotenv
+
+from fx_rates import (BackgroundRefresher, Provider, ProviderPool, RateStore, StaleWhileRevalidate,
+                      convert_ledger_csv, downsample_series, http_client, load_rate_matrix, load_timeseries,
+                      prefetch_hot_pairs)
+
+load_dotenv()
+
+# overridable from the environment or .env, e.g. to point at fx_simulator.py
+API_BASE = os.getenv("FX_API_BASE", "https://api.exchangerate.host").rstrip("/")
+FALLBACK_PROVIDER = os.getenv("FX_FALLBACK_BASE", "https://api.frankfurter.app").rstrip("/")
+DEFAULT_FROM = "USD"
+DEFAULT_TO = "EUR"
+FALLBACK_SYMBOLS = {
+    "USD": {"description": "United States Dollar"},
+    "EUR": {"description": "Euro"},
+    "GBP": {"description": "British Pound"},
+    "INR": {"description": "Indian Rupee"},
+    "JPY": {"description": "Japanese Yen"},
+    "AUD": {"description": "Australian Dollar"},
+    "CAD": {"description": "Canadian Dollar"},
+    "CNY": {"description": "Chinese Yuan"}
+}
+
+# ---------------------------
+# Streamlit Page Config
+# ---------------------------
+st.set_page_config(page_title="Universal Currency Converter", layout="centered")
+
+# ---------------------------
+# Custom Styling
+# ---------------------------
+st.markdown(
+    """
+    <style>
+    .stApp {
+        background-color: #32CD32;   /* bright green */
+        color: black;
+    }
+    h1, h2, h3, h4, h5, h6, p, div, span, label {
+        color: black !important;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+# ---------------------------
+# Title + Fun Emojis + GIF
+# ---------------------------
+st.markdown("## 💱💹💵 Universal Currency Converter 💶💴💷")
+st.image(
+    "https://media.giphy.com/media/v1.Y2lkPTc5MGI3NjExNDM4b3VhdHZvYnpkdzRyOGoybnBkbWF6YTVkNzVxaDRrYTVvb2k1biZlcD12MV9naWZzX3NlYXJjaCZjdD1n/NFA61GS9qKZ68/giphy.gif",
+    caption="💸 Real-time exchange rates in action!",
+    use_column_width=True
+)
+
+st.markdown(
+    "Easily convert between currencies, view 📈 historical charts, and download results. "
+    "Powered by exchangerate.host (fallback: Frankfurter)."
+)
+
+# ---------------------------
+# Debug toggle
+# ---------------------------
+show_debug = st.checkbox("Show debug output", value=False)
+
+# ---------------------------
+# API Helpers
+# ---------------------------
+@st.cache_resource
+def get_rate_store():
+    # one SQLite-backed store per server process, shared by all sessions
+    return RateStore()
+
+@st.cache_resource
+def get_provider_pool():
+    # shared across sessions so circuit breakers and latency stats see all traffic
+    return ProviderPool([
+        Provider("exchangerate.host", API_BASE, base_param="base"),
+        Provider("frankfurter", FALLBACK_PROVIDER, base_param="from"),
+    ])
+
+@st.cache_resource
+def get_refresher():
+    # one background thread per server process keeps symbols, the latest table and hot pairs warm,
+    # so no visitor waits on a provider once the app has served its first page
+    store, pool = get_rate_store(), get_provider_pool()
+    refresher = BackgroundRefresher(
+        {
+            # the first page render waits for this load, so it gets one short attempt; retries are
+            # left to the background reloads, and the built-in list covers the gap
+            "symbols": StaleWhileRevalidate(_load_symbols, ttl=3600,
+                                            first_loader=lambda: _load_symbols(timeout=2, retries=0)),
+            "latest": StaleWhileRevalidate(lambda: load_rate_matrix(store, pool), ttl=600),
+        },
+        tasks=[lambda: prefetch_hot_pairs(store, _fetch_timeseries_remote)],
+        interval=60,
+    )
+    refresher.start()
+    return refresher
+
+def _load_symbols(timeout=8, retries=None):
+    # runs on the refresher thread: no st.* calls in here
+    data = http_client().get_json(f"{API_BASE}/symbols", timeout=timeout, retries=retries)
+    return data.get("symbols") or None  # None keeps the previous list
+
+def get_symbols():
+    # stale-while-revalidate: the built-in list is only used until a provider has answered once
+    return get_refresher().values["symbols"].get() or FALLBACK_SYMBOLS
+
+def convert_amount(amount: float, from_curr: str, to_curr: str, conv_date: str = None):
+    from_curr = (from_curr or "").upper()
+    to_curr = (to_curr or "").upper()
+
+    # same currency quick return
+    if from_curr == to_curr:
+        used_date = conv_date if conv_date else date.today().isoformat()
+        return {"success": True, "provider": "same-currency",
+                "query": {"from": from_curr, "to": to_curr, "amount": amount},
+                "info": {"rate": 1.0}, "date": used_date, "result": float(amount)}
+
+    # every pair is triangulated from one base-currency table per day
+    try:
+        matrix = get_rate_matrix(conv_date)
+        if from_curr in matrix and to_curr in matrix:
+            rate = matrix.rate(from_curr, to_curr)
+            get_rate_store().record_pair(from_curr, to_curr)
+            return {"success": True, "provider": matrix.provider,
+                    "query": {"from": from_curr, "to": to_curr, "amount": amount},
+                    "info": {"rate": rate, "inverse": matrix.rate(to_curr, from_curr)},
+                    "date": matrix.day, "result": float(amount) * rate}
+        if show_debug:
+            st.write(f"DEBUG rate table for {matrix.day} has no {from_curr}/{to_curr}, asking for the pair")
+    except Exception as e:
+        if show_debug:
+            st.write("DEBUG rate table error:", repr(e))
+
+    return convert_pair_remote(amount, from_curr, to_curr, conv_date)
+
+def get_rate_matrix(conv_date: str = None):
+    if conv_date is None:
+        # the latest table is served from memory and refreshed in the background
+        matrix = get_refresher().values["latest"].get()
+        if matrix is None:
+            raise RuntimeError("No rate table from any provider")
+        return matrix
+    return get_dated_rate_matrix(conv_date)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_dated_rate_matrix(conv_date: str):
+    # past days come back from the rate store
+    matrix = load_rate_matrix(get_rate_store(), get_provider_pool(), conv_date)
+    if matrix is None:
+        raise RuntimeError("No rate table from any provider")  # raised, so the failure isn't cached
+    return matrix
+
+def convert_pair_remote(amount: float, from_curr: str, to_curr: str, conv_date: str = None):
+    """Single-pair provider conversion, for currencies missing from the base table."""
+    def request(provider):
+        # runs on a provider-pool thread: no st.* calls in here
+        if provider.name == "exchangerate.host":
+            params = {"from": from_curr, "to": to_curr, "amount": amount}
+            if conv_date:
+                params["date"] = conv_date
+            j = http_client().get_json(f"{provider.base_url}/convert", params=params, timeout=10)
+            rate = j.get("info", {}).get("rate")
+            if rate is None or j.get("result") is None:
+                return None
+            return j, float(rate), j.get("date")
+        url = f"{provider.base_url}/{conv_date}" if conv_date else f"{provider.base_url}/latest"
+        j = http_client().get_json(url, params={"amount": amount, "from": from_curr, "to": to_curr}, timeout=10)
+        rate_val = j.get("rates", {}).get(to_curr)
+        if rate_val is None:
+            return None
+        # frankfurter returns the converted amount; the unit rate is that over the amount
+        rate = float(rate_val) / float(amount) if amount else float(rate_val)
+        return j, rate, j.get("date")
+
+    value, provider = get_provider_pool().race(request, timeout=10)
+    if show_debug:
+        st.write(f"DEBUG {provider or 'no provider'} response:", value[0] if value else None)
+    if value is None:
+        return {"success": False, "provider": None}
+    _, rate, used_date = value
+    get_rate_store().put(conv_date or used_date, from_curr, to_curr, rate, provider)
+    get_rate_store().record_pair(from_curr, to_curr)
+    return {"success": True, "provider": provider,
+            "query": {"from": from_curr, "to": to_curr, "amount": amount},
+            "info": {"rate": rate}, "date": used_date, "result": float(amount) * rate}
+
+@st.cache_data(ttl=600)
+def fetch_timeseries(from_curr: str, to_curr: str, start_date: str, end_date: str):
+    # days already in the rate store are reused; only the gaps go to the provider
+    items, _ = load_timeseries(get_rate_store(), _fetch_timeseries_remote, from_curr, to_curr, start_date, end_date)
+    if not items:
+        raise RuntimeError("No rates in response")
+    df = pd.DataFrame(items, columns=["date", "rate"])
+    df["date"] = pd.to_datetime(df["date"])
+    df.set_index("date", inplace=True)
+    return df["rate"]
+
+@st.cache_data(ttl=600, show_spinner=False)
+def timeseries_csv(from_curr: str, to_curr: str, start_date: str, end_date: str) -> bytes:
+    # encoded once per range, and only when someone actually downloads it
+    return fetch_timeseries(from_curr, to_curr, start_date, end_date).reset_index().to_csv(index=False).encode("utf-8")
+
+def _fetch_timeseries_remote(from_curr: str, to_curr: str, start_date: str, end_date: str):
+    # runs on range-fetch threads: no st.* calls in here
+    params = {"start_date": start_date, "end_date": end_date, "base": from_curr, "symbols": to_curr}
+    data = http_client().get_json(f"{API_BASE}/timeseries", params=params, timeout=15)
+    items = []
+    for d, entry in sorted((data.get("rates") or {}).items()):
+        rate = entry.get(to_curr)
+        items.append((d, rate))
+    return items
+
+# ---------------------------
+# UI
+# ---------------------------
+symbols = get_symbols()
+codes = sorted(symbols.keys())
+
+col1, col2 = st.columns([1,1])
+with col1:
+    amount = st.number_input("💵 Amount", value=1.0, format="%.2f")
+    from_curr = st.selectbox("From Currency 💲", codes, index=codes.index(DEFAULT_FROM) if DEFAULT_FROM in codes else 0)
+with col2:
+    to_curr = st.selectbox("To Currency 💱", codes, index=codes.index(DEFAULT_TO) if DEFAULT_TO in codes else 1)
+    if st.button("🔄 Swap"):
+        from_curr, to_curr = to_curr, from_curr
+        st.experimental_rerun()
+
+conv_date = None
+if st.checkbox("📅 Use specific date for conversion (historical)?", value=False):
+    conv_date = st.date_input("Conversion date", value=date.today() - timedelta(days=1)).isoformat()
+
+if st.button("🚀 Convert"):
+    resp = convert_amount(amount, from_curr, to_curr, conv_date)
+    if not resp.get("success"):
+        st.error("❌ Could not fetch a valid exchange rate. Try again later or with different currencies.")
+    else:
+        rate = resp.get("info", {}).get("rate")
+        result = resp.get("result")
+        used_date = resp.get("date")
+        provider = resp.get("provider")
+        st.metric(label=f"{amount} {from_curr} → {to_curr} ({provider})", value=f"{result:,.2f}")
+        st.write(f"💹 Exchange rate: 1 {from_curr} = {rate:,.6f} {to_curr}  (date: {used_date})")
+        if rate:
+            inverse = resp.get("info", {}).get("inverse") or 1 / rate
+            st.write(f"📊 Inverse: 1 {to_curr} = {inverse:,.6f} {from_curr}")
+
+        # download
+        summary = f"Conversion result\nProvider: {provider}\nDate: {used_date}\n{amount} {from_curr} = {result:,.2f} {to_curr}\nRate: {rate}"
+        st.download_button("⬇️ Download result (TXT)", data=summary, file_name="conversion.txt", mime="text/plain")
+
+st.markdown("---")
+st.subheader("📈 Historical rates (time series)")
+
+days = st.slider("Days back to show", 7, 5 * 365, 90)
+end_dt = date.today()
+start_dt = end_dt - timedelta(days=days)
+if st.button("📊 Show historical chart"):
+    st.session_state.chart_query = (from_curr, to_curr, start_dt, end_dt)
+if st.session_state.get("chart_query"):
+    c_from, c_to, c_start, c_end = st.session_state.chart_query
+    try:
+        # zooming re-reads the window at full resolution (from the rate store) before downsampling,
+        # so the chart always gets about one point per pixel whatever the range
+        if (c_end - c_start).days > 30:
+            z_start, z_end = st.slider("🔍 Zoom", min_value=c_start, max_value=c_end, value=(c_start, c_end),
+                                       format="YYYY-MM-DD", key=f"zoom_{c_from}_{c_to}_{c_start}")
+        else:
+            z_start, z_end = c_start, c_end
+        series = fetch_timeseries(c_from, c_to, z_start.isoformat(), z_end.isoformat())
+        shown = downsample_series(series)
+        st.line_chart(shown.rename(f"{c_from}/{c_to}"))
+        st.caption(f"{c_from}/{c_to} · {z_start} → {z_end} · showing {len(shown):,} of {len(series):,} daily rates")
+        st.download_button("⬇️ Download rates CSV",
+                           data=lambda: timeseries_csv(c_from, c_to, z_start.isoformat(), z_end.isoformat()),
+                           file_name=f"rates_{c_from}_{c_to}_{z_start}_{z_end}.csv", mime="text/csv",
+                           on_click="ignore")
+    except Exception as e:
+        st.error(f"⚠️ Could not fetch timeseries: {e}")
+
+st.markdown("---")
+st.subheader("📒 Batch convert a ledger (CSV)")
+st.write("Upload rows of amount, currency and date; every row is converted to one reporting currency. "
+         "Each distinct date costs one rate lookup, however many rows share it.")
+ledger = st.file_uploader("Ledger CSV", type=["csv"])
+if ledger is not None:
+    header = pd.read_csv(ledger, nrows=0).columns.tolist()
+    ledger.seek(0)
+    c1, c2, c3, c4 = st.columns(4)
+    amount_col = c1.selectbox("Amount column", header, index=header.index("amount") if "amount" in header else 0)
+    currency_col = c2.selectbox("Currency column", header, index=header.index("currency") if "currency" in header else 0)
+    date_col = c3.selectbox("Date column", header, index=header.index("date") if "date" in header else 0)
+    report_curr = c4.selectbox("Reporting currency", codes, index=codes.index(to_curr))
+    if st.button("🧾 Convert ledger"):
+        with st.spinner("Converting ledger..."):
+            data, summary = convert_ledger_csv(ledger, get_rate_store(), get_provider_pool(), report_curr,
+                                               amount_col, currency_col, date_col)
+        st.session_state.ledger_result = (data, summary, report_curr)
+if st.session_state.get("ledger_result"):
+    data, summary, report_curr = st.session_state.ledger_result
+    st.success(f"✅ Converted {summary['rows']:,} rows to {report_curr} using {summary['distinct_dates']:,} "
+               f"daily rate tables in {summary['total_s']:.2f} s (rates: {summary['fetch_s']:.2f} s).")
+    if summary["unconverted_rows"]:
+        st.warning(f"⚠️ {summary['unconverted_rows']:,} rows had an unknown currency, bad date or no rate table.")
+    st.download_button("⬇️ Download converted ledger (CSV)", data=data,
+                       file_name=f"ledger_{report_curr}.csv", mime="text/csv")
+
+st.markdown("---")
+with st.expander("🩺 Provider health"):
+    st.dataframe(pd.DataFrame(get_provider_pool().stats()), hide_index=True)
+with st.expander("🔌 HTTP connection stats"):
+    http_stats = http_client().stats()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Requests", http_stats["requests"], f"{http_stats['retries']} retries", delta_color="off")
+    c2.metric("Reused connections", http_stats["reused_connections"], f"{http_stats['new_connections']} new", delta_color="off")
+    c3.metric("Time saved", f"{http_stats['saved_ms']:,.0f} ms", f"{http_stats['not_modified']} not modified", delta_color="off")
+    st.caption(f"Avg request: {http_stats['avg_new_ms']} ms on a new connection, "
+               f"{http_stats['avg_reused_ms']} ms on a reused one.")
+latest = get_refresher().values["latest"]
+if latest.loaded_at is None:
+    st.caption("⚪ Latest rates not loaded yet.")
+elif latest.last_error is not None and latest.stale:
+    st.caption(f"🔴 Latest rates are {latest.age / 60:.0f} min old; the last refresh failed, retrying in the background.")
+elif latest.stale:
+    st.caption(f"🟠 Latest rates are {latest.age / 60:.0f} min old, refreshing in the background…")
+else:
+    st.caption(f"🟢 Latest rates refreshed {latest.age / 60:.0f} min ago.")
+hot = get_rate_store().hot_pairs(5)
+if hot:
+    st.caption("🔥 Popular pairs (history prefetched): " + ", ".join(f"{b}/{q}" for b, q, _ in hot))
+store_stats = get_rate_store().stats()
+st.caption(f"🗄️ Rate store: {store_stats['rows']:,} historical rates saved · "
+           f"hit rate {store_stats['hit_rate']:.0%} ({store_stats['hits']} hits / {store_stats['misses']} misses)")
+st.caption("💼 Powered by exchangerate.host (fallback: Frankfurter).")
@@ -1,253 +1,401 @@
-# app.py
-import streamlit as st
-import random
-import csv
-from pathlib import Path
-from datetime import datetime
-import pandas as pd
-import time
-
-# ---------------------
-# Config
-# ---------------------
-DATA_DIR = Path("data")
-SCORES_FILE = DATA_DIR / "scores.csv"
-NUM_QUESTIONS_DEFAULT = 8
-
-# Ensure data directory
-DATA_DIR.mkdir(exist_ok=True)
-
-# ---------------------
-# Quiz questions (Nature & Curiosity)
-# Add / edit questions here: 'question','choices'(list),'answer' (exact text), 'explain'
-# ---------------------
-QUESTIONS = [
-    {
-        "question": "🌲 What process do plants use to convert sunlight into chemical energy?",
-        "choices": ["Respiration", "Photosynthesis", "Transpiration", "Fermentation"],
-        "answer": "Photosynthesis",
-        "explain": "Photosynthesis converts sunlight, CO₂ and water into glucose and oxygen in plant chloroplasts."
-    },
-    {
-        "question": "🦋 Which stage is NOT part of a butterfly's life cycle?",
-        "choices": ["Egg", "Pupa", "Nymph", "Adult"],
-        "answer": "Nymph",
-        "explain": "Butterflies undergo complete metamorphosis: egg → larva (caterpillar) → pupa → adult."
-    },
-    {
-        "question": "🌍 Which layer of Earth is liquid and lies beneath the crust?",
-        "choices": ["Inner core", "Mantle", "Outer core", "Lithosphere"],
-        "answer": "Outer core",
-        "explain": "The outer core is liquid iron and nickel; the inner core is solid."
-    },
-    {
-        "question": "🔬 What is the smallest unit of life that can function independently?",
-        "choices": ["Atom", "Molecule", "Cell", "Tissue"],
-        "answer": "Cell",
-        "explain": "The cell is the basic structural and functional unit of all living organisms."
-    },
-    {
-        "question": "🌊 What causes ocean tides on Earth?",
-        "choices": ["Wind patterns", "Earthquakes", "Gravitational pull of Moon and Sun", "Ocean currents"],
-        "answer": "Gravitational pull of Moon and Sun",
-        "explain": "Tides are primarily caused by the gravitational forces of the Moon and the Sun acting on Earth's oceans."
-    },
-    {
-        "question": "🍄 Fungi get their nutrients by:",
-        "choices": ["Photosynthesis", "Absorbing organic matter", "Ingesting bacteria", "Filtering water"],
-        "answer": "Absorbing organic matter",
-        "explain": "Fungi secrete enzymes to break down organic material and absorb nutrients."
-    },
-    {
-        "question": "🦈 Sharks are classified as:",
-        "choices": ["Bony fish", "Mammals", "Cartilaginous fish", "Birds"],
-        "answer": "Cartilaginous fish",
-        "explain": "Sharks have skeletons made of cartilage (not bone), so they are cartilaginous fishes."
-    },
-    {
-        "question": "🌱 Which phenomenon is responsible for seeds being carried away by wind?",
-        "choices": ["Pollination", "Seed dispersal", "Germination", "Photosynthesis"],
-        "answer": "Seed dispersal",
-        "explain": "Seed dispersal helps plants spread offspring; wind dispersal is a common method."
-    },
-    {
-        "question": "☀️ The tilt of Earth's axis is responsible for:",
-        "choices": ["Day and night", "Seasons", "Tides", "Volcanoes"],
-        "answer": "Seasons",
-        "explain": "Earth's axial tilt (≈23.5°) leads to varying sunlight angles across the year → seasons."
-    },
-    {
-        "question": "🐝 Bees communicate primarily by:",
-        "choices": ["Vocal sounds", "Dance language and pheromones", "Electrical signals", "Color flashes"],
-        "answer": "Dance language and pheromones",
-        "explain": "Bees use dance moves and chemical signals (pheromones) to convey location of food and other info."
-    }
-]
-
-# ---------------------
-# Helpers
-# ---------------------
-def init_session():
-    if "shuffled_questions" not in st.session_state:
-        st.session_state.shuffled_questions = []
-    if "current_index" not in st.session_state:
-        st.session_state.current_index = 0
-    if "score" not in st.session_state:
-        st.session_state.score = 0
-    if "answers" not in st.session_state:
-        st.session_state.answers = []
-    if "start_time" not in st.session_state:
-        st.session_state.start_time = None
-    if "timed_mode" not in st.session_state:
-        st.session_state.timed_mode = False
-    if "time_per_question" not in st.session_state:
-        st.session_state.time_per_question = 20  # seconds
-
-def load_high_scores():
-    if not SCORES_FILE.exists():
-        return pd.DataFrame(columns=["name","score","total","date","time_taken_s"])
-    try:
-        return pd.read_csv(SCORES_FILE)
-    except Exception:
-        return pd.DataFrame(columns=["name","score","total","date","time_taken_s"])
-
-def save_high_score(name, score, total, time_taken_s):
-    df = load_high_scores()
-    df = df.append({"name": name, "score": score, "total": total, "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "time_taken_s": time_taken_s}, ignore_index=True)
-    df.to_csv(SCORES_FILE, index=False)
-
-def start_quiz(num_questions: int, timed: bool, time_per_q: int):
-    # choose questions randomly
-    pool = QUESTIONS.copy()
-    random.shuffle(pool)
-    selected = pool[:num_questions]
-    # shuffle choices for each
-    for q in selected:
-        choices = q["choices"].copy()
-        random.shuffle(choices)
-        q["_shuffled_choices"] = choices
-    st.session_state.shuffled_questions = selected
-    st.session_state.current_index = 0
-    st.session_state.score = 0
-    st.session_state.answers = []
-    st.session_state.start_time = time.time()
-    st.session_state.timed_mode = timed
-    st.session_state.time_per_question = time_per_q
-
-def answer_current(selected_choice):
-    idx = st.session_state.current_index
-    q = st.session_state.shuffled_questions[idx]
-    correct = selected_choice == q["answer"]
-    explain = q.get("explain","")
-    st.session_state.answers.append({
-        "question": q["question"],
-        "selected": selected_choice,
-        "correct": correct,
-        "correct_answer": q["answer"],
-        "explain": explain
-    })
-    if correct:
-        st.session_state.score += 1
-    st.session_state.current_index += 1
-
-# ---------------------
-# UI layout
-# ---------------------
-st.set_page_config(page_title="Nature & Curiosity Quiz 🌿", layout="centered")
-st.title("Nature & Curiosity Quiz 🌿🧠")
-st.write("Test your nature knowledge and satisfy your curiosity! ✅ Select mode and press Start.")
-
-init_session()
-
-# Sidebar / Settings
-with st.sidebar:
-    st.header("Quiz Settings")
-    num_q = st.slider("Number of questions", min_value=3, max_value=min( len(QUESTIONS), 15), value=NUM_QUESTIONS_DEFAULT)
-    timed = st.checkbox("Timed mode (per question)", value=False)
-    time_per_q = st.slider("Seconds per question", min_value=5, max_value=60, value=20) if timed else 20
-    if st.button("🔁 Start New Quiz"):
-        start_quiz(num_q, timed, time_per_q)
-
-    st.markdown("---")
-    st.write("🏆 High Scores")
-    hs = load_high_scores()
-    if not hs.empty:
-        st.dataframe(hs.sort_values(by=["score","date"], ascending=[False,False]).head(10))
-    else:
-        st.write("No scores yet. Be the first! 🎉")
-
-# If no quiz started, show intro / start button
-if not st.session_state.shuffled_questions:
-    st.markdown("### How to play")
-    st.write(
-        "- Choose number of questions and whether you want Timed mode (each question will auto-submit when time runs out).\n"
-        "- Click **Start New Quiz** in the left panel.\n"
-        "- You will get instant feedback after each question and a final score at the end. Good luck! 🍀"
-    )
-    st.stop()
-
-# Quiz in progress
-total_q = len(st.session_state.shuffled_questions)
-idx = st.session_state.current_index
-
-# If finished
-if idx >= total_q:
-    total_time = int(time.time() - st.session_state.start_time) if st.session_state.start_time else 0
-    st.success(f"Quiz completed! 🎉 Your score: {st.session_state.score} / {total_q}")
-    name = st.text_input("Enter your name to save score (optional):")
-    if st.button("💾 Save Score"):
-        save_high_score(name if name else "Anonymous", st.session_state.score, total_q, total_time)
-        st.success("Saved! Check High Scores in the left panel.")
-    st.markdown("### Review")
-    for a in st.session_state.answers:
-        color = "✅" if a["correct"] else "❌"
-        st.write(f"{color} **Q:** {a['question']}")
-        st.write(f"Your answer: **{a['selected']}** — Correct answer: **{a['correct_answer']}**")
-        if a["explain"]:
-            st.info(a["explain"])
-    if st.button("↻ Play Again"):
-        start_quiz(num_q, timed, time_per_q)
-    st.stop()
-
-# Show current question
-q = st.session_state.shuffled_questions[idx]
-st.markdown(f"**Question {idx+1} / {total_q}**")
-st.write(q["question"])
-
-# Timer (if timed_mode)
-if st.session_state.timed_mode:
-    remaining = st.session_state.time_per_question
-    # Compute how many seconds have passed for this question (naive)
-    # We store question start in session_state ideally, but simple countdown per render:
-    if f"start_q_{idx}" not in st.session_state:
-        st.session_state[f"start_q_{idx}"] = time.time()
-    elapsed = int(time.time() - st.session_state[f"start_q_{idx}"])
-    remaining = max(0, st.session_state.time_per_question - elapsed)
-    st.progress((idx + (st.session_state.time_per_question - remaining)/st.session_state.time_per_question) / total_q)
-    st.write(f"⏱️ Time left for this question: **{remaining}** seconds")
-    if remaining == 0:
-        # auto-submit with no selection => treat as wrong (or could pick None)
-        answer_current(selected_choice="(No answer)")
-        st.experimental_rerun()
-else:
-    st.progress(idx / total_q)
-
-# Show choices
-choices = q["_shuffled_choices"]
-selected = st.radio("Choose one option:", choices, key=f"choice_{idx}")
-
-col1, col2 = st.columns([1,1])
-with col1:
-    if st.button("✅ Submit Answer"):
-        answer_current(selected_choice=selected)
-        st.experimental_rerun()
-with col2:
-    if st.button("💡 Show Hint / Explanation"):
-        if q.get("explain"):
-            st.info(q["explain"])
-        else:
-            st.info("No hint available for this question.")
-
-# Small footer & score
-st.markdown("---")
-st.write(f"Score: **{st.session_state.score}** / {total_q}  —  Question {idx+1}/{total_q}")
+# app.py
+import streamlit as st
+import csv
+from pathlib import Path
+import pandas as pd
+import math
+import threading
+import time
+
+from quiz_bank import DIFFICULTIES, QuestionBank, displayed_choices, new_quiz, quiz_review, record_pick
+from quiz_scores import PERIODS, SCORE_COLUMNS, Leaderboard
+from quiz_analytics import AnswerAnalytics, new_session_id, pick_by_success_rate
+
+# ---------------------
+# Config
+# ---------------------
+DATA_DIR = Path("data")
+SCORES_FILE = DATA_DIR / "scores.csv"
+NUM_QUESTIONS_DEFAULT = 8
+ANSWER_GRACE_S = 1.0  # network slack allowed after a timed question's deadline
+BUILTIN_TOPIC = "Nature & Curiosity"
+
+# Ensure data directory
+DATA_DIR.mkdir(exist_ok=True)
+
+# ---------------------
+# Quiz questions (Nature & Curiosity)
+# Add / edit questions here: 'question','choices'(list),'answer' (exact text), 'explain', 'difficulty' (1-3)
+# They are synced into the question bank at startup; bigger banks are imported with quiz_bank.py.
+# ---------------------
+QUESTIONS = [
+    {
+        "question": "🌲 What process do plants use to convert sunlight into chemical energy?",
+        "choices": ["Respiration", "Photosynthesis", "Transpiration", "Fermentation"],
+        "answer": "Photosynthesis",
+        "explain": "Photosynthesis converts sunlight, CO₂ and water into glucose and oxygen in plant chloroplasts.",
+        "difficulty": 1
+    },
+    {
+        "question": "🦋 Which stage is NOT part of a butterfly's life cycle?",
+        "choices": ["Egg", "Pupa", "Nymph", "Adult"],
+        "answer": "Nymph",
+        "explain": "Butterflies undergo complete metamorphosis: egg → larva (caterpillar) → pupa → adult.",
+        "difficulty": 2
+    },
+    {
+        "question": "🌍 Which layer of Earth is liquid and lies beneath the crust?",
+        "choices": ["Inner core", "Mantle", "Outer core", "Lithosphere"],
+        "answer": "Outer core",
+        "explain": "The outer core is liquid iron and nickel; the inner core is solid.",
+        "difficulty": 2
+    },
+    {
+        "question": "🔬 What is the smallest unit of life that can function independently?",
+        "choices": ["Atom", "Molecule", "Cell", "Tissue"],
+        "answer": "Cell",
+        "explain": "The cell is the basic structural and functional unit of all living organisms.",
+        "difficulty": 1
+    },
+    {
+        "question": "🌊 What causes ocean tides on Earth?",
+        "choices": ["Wind patterns", "Earthquakes", "Gravitational pull of Moon and Sun", "Ocean currents"],
+        "answer": "Gravitational pull of Moon and Sun",
+        "explain": "Tides are primarily caused by the gravitational forces of the Moon and the Sun acting on Earth's oceans.",
+        "difficulty": 1
+    },
+    {
+        "question": "🍄 Fungi get their nutrients by:",
+        "choices": ["Photosynthesis", "Absorbing organic matter", "Ingesting bacteria", "Filtering water"],
+        "answer": "Absorbing organic matter",
+        "explain": "Fungi secrete enzymes to break down organic material and absorb nutrients.",
+        "difficulty": 2
+    },
+    {
+        "question": "🦈 Sharks are classified as:",
+        "choices": ["Bony fish", "Mammals", "Cartilaginous fish", "Birds"],
+        "answer": "Cartilaginous fish",
+        "explain": "Sharks have skeletons made of cartilage (not bone), so they are cartilaginous fishes.",
+        "difficulty": 2
+    },
+    {
+        "question": "🌱 Which phenomenon is responsible for seeds being carried away by wind?",
+        "choices": ["Pollination", "Seed dispersal", "Germination", "Photosynthesis"],
+        "answer": "Seed dispersal",
+        "explain": "Seed dispersal helps plants spread offspring; wind dispersal is a common method.",
+        "difficulty": 1
+    },
+    {
+        "question": "☀️ The tilt of Earth's axis is responsible for:",
+        "choices": ["Day and night", "Seasons", "Tides", "Volcanoes"],
+        "answer": "Seasons",
+        "explain": "Earth's axial tilt (≈23.5°) leads to varying sunlight angles across the year → seasons.",
+        "difficulty": 1
+    },
+    {
+        "question": "🐝 Bees communicate primarily by:",
+        "choices": ["Vocal sounds", "Dance language and pheromones", "Electrical signals", "Color flashes"],
+        "answer": "Dance language and pheromones",
+        "explain": "Bees use dance moves and chemical signals (pheromones) to convey location of food and other info.",
+        "difficulty": 3
+    }
+]
+
+# ---------------------
+# Helpers
+# ---------------------
+def init_session():
+    # a quiz is three small arrays (see quiz_bank.new_quiz); question text stays in the shared bank
+    if "quiz_ids" not in st.session_state:
+        st.session_state.quiz_ids = None
+        st.session_state.choice_perms = None
+        st.session_state.picks = None
+    if "current_index" not in st.session_state:
+        st.session_state.current_index = 0
+    if "score" not in st.session_state:
+        st.session_state.score = 0
+    if "start_time" not in st.session_state:
+        st.session_state.start_time = None
+    if "timed_mode" not in st.session_state:
+        st.session_state.timed_mode = False
+    if "time_per_question" not in st.session_state:
+        st.session_state.time_per_question = 20  # seconds
+    if "deadline" not in st.session_state:
+        st.session_state.deadline = None  # time.monotonic() by which the current question must be answered
+        st.session_state.shown_at = None  # time.monotonic() when the current question appeared
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = new_session_id()  # tags this player's answers in the analytics log
+
+class CpuMeter:
+    """Server CPU spent on full page runs and on timer ticks (fragment reruns), per run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {"page": [0.0, 0], "tick": [0.0, 0]}
+
+    def add(self, kind: str, seconds: float):
+        with self._lock:
+            self.totals[kind][0] += seconds
+            self.totals[kind][1] += 1
+
+    def avg_ms(self, kind: str):
+        with self._lock:
+            total, n = self.totals[kind]
+        return total / n * 1000 if n else None
+
+@st.cache_resource
+def get_cpu_meter():
+    return CpuMeter()
+
+def record_page_cpu():
+    # thread_time: only this session's script thread, not the other sessions running alongside
+    get_cpu_meter().add("page", time.thread_time() - PAGE_CPU_START)
+
+@st.cache_resource
+def get_leaderboard():
+    # built from scores.csv once per server process, then updated in place by every save
+    return Leaderboard(SCORES_FILE)
+
+def load_high_scores(period: str = "all"):
+    return pd.DataFrame(get_leaderboard().top(period), columns=SCORE_COLUMNS)
+
+def save_high_score(name, score, total, time_taken_s):
+    get_leaderboard().add(name, score, total, time_taken_s)
+
+@st.cache_resource
+def get_analytics():
+    # folded from answers.csv once per server process, then updated by every answer
+    return AnswerAnalytics()
+
+@st.cache_resource
+def get_bank():
+    # one bank per server process, shared by all sessions
+    bank = QuestionBank()
+    bank.sync_topic(BUILTIN_TOPIC, QUESTIONS)
+    return bank
+
+def start_quiz(num_questions: int, timed: bool, time_per_q: int, topics=None, difficulties=None,
+               target_rate: float = None):
+    # sample ids from the bank and a choice order per question; nothing shared is modified
+    choose = None
+    if target_rate is not None:
+        # prefer questions that players currently get right about target_rate of the time
+        choose = lambda ids, k, rng: pick_by_success_rate(get_analytics(), ids, k, target_rate, rng=rng)
+    ids, perms, picks = new_quiz(get_bank(), num_questions, topics, difficulties, choose=choose)
+    st.session_state.quiz_ids = ids
+    st.session_state.choice_perms = perms
+    st.session_state.picks = picks
+    st.session_state.current_index = 0
+    st.session_state.score = 0
+    st.session_state.start_time = time.time()
+    st.session_state.timed_mode = timed
+    st.session_state.time_per_question = time_per_q
+    st.session_state.shown_at = time.monotonic()
+    st.session_state.deadline = st.session_state.shown_at + time_per_q
+
+def current_question():
+    return get_bank().get([st.session_state.quiz_ids[st.session_state.current_index]])[0]
+
+def drop_changed_quiz():
+    # the bank removed or edited a question of this quiz (quiz_bank raises KeyError); the intro says so
+    st.session_state.quiz_ids = None
+    st.session_state.bank_changed = True
+
+def answer_current(selected_choice):
+    # selected_choice is the chosen text, or None when time ran out
+    idx = st.session_state.current_index
+    if st.session_state.timed_mode and time.monotonic() > st.session_state.deadline + ANSWER_GRACE_S:
+        selected_choice = None  # the deadline is kept on the server, whatever the browser showed
+    try:
+        q = current_question()
+        correct = record_pick(q, st.session_state.picks, idx, selected_choice)
+    except KeyError:
+        drop_changed_quiz()
+        return
+    if correct:
+        st.session_state.score += 1
+    get_analytics().record(st.session_state.session_id, q.id, st.session_state.picks[idx], correct,
+                           time.monotonic() - st.session_state.shown_at)
+    st.session_state.current_index += 1
+    st.session_state.shown_at = time.monotonic()
+    st.session_state.deadline = st.session_state.shown_at + st.session_state.time_per_question
+
+def submit_current(idx):
+    # a click still in flight when the tick auto-submitted belongs to a question that is gone
+    if idx != st.session_state.current_index:
+        return
+    answer_current(st.session_state.get(f"choice_{idx}"))
+
+def question_block():
+    # runs as a fragment: submitting, hints and timer ticks rerun only this block, not the page
+    tick_start = time.thread_time()
+    if st.session_state.quiz_ids is None:
+        st.rerun()  # the Submit callback found the quiz out of date
+    total_q = len(st.session_state.quiz_ids)
+    if (st.session_state.timed_mode and st.session_state.current_index < total_q
+            and time.monotonic() >= st.session_state.deadline + ANSWER_GRACE_S):
+        answer_current(selected_choice=None)  # time is up, grace included: auto-submit
+        if st.session_state.quiz_ids is None:
+            st.rerun()
+    idx = st.session_state.current_index
+    if idx >= total_q:
+        st.rerun()  # the whole page switches to the results
+    try:
+        q = current_question()
+        choices = displayed_choices(q, st.session_state.choice_perms[idx])
+    except KeyError:
+        drop_changed_quiz()
+        st.rerun()
+
+    st.markdown(f"**Question {idx+1} / {total_q}**")
+    st.write(q.question)
+    if st.session_state.timed_mode:
+        remaining = max(0.0, st.session_state.deadline - time.monotonic())
+        st.progress(min(1.0, (idx + 1 - remaining / st.session_state.time_per_question) / total_q))
+        st.write(f"⏱️ Time left for this question: **{math.ceil(remaining)}** seconds")
+    else:
+        st.progress(idx / total_q)
+
+    st.radio("Choose one option:", choices, key=f"choice_{idx}")
+    col1, col2 = st.columns([1,1])
+    with col1:
+        st.button("✅ Submit Answer", on_click=submit_current, args=(idx,))
+    with col2:
+        if st.button("💡 Show Hint / Explanation"):
+            if q.explain:
+                st.info(q.explain)
+            else:
+                st.info("No hint available for this question.")
+
+    # Small footer & score
+    st.markdown("---")
+    st.write(f"Score: **{st.session_state.score}** / {total_q}  —  Question {idx+1}/{total_q}")
+    if st.session_state.timed_mode:
+        get_cpu_meter().add("tick", time.thread_time() - tick_start)
+
+# ---------------------
+# UI layout
+# ---------------------
+st.set_page_config(page_title="Nature & Curiosity Quiz 🌿", layout="centered")
+PAGE_CPU_START = time.thread_time()
+st.title("Nature & Curiosity Quiz 🌿🧠")
+st.write("Test your nature knowledge and satisfy your curiosity! ✅ Select mode and press Start.")
+
+init_session()
+
+# Sidebar / Settings
+with st.sidebar:
+    view = st.radio("View", ["🎮 Quiz", "📊 Question analytics"], horizontal=True, label_visibility="collapsed")
+    st.header("Quiz Settings")
+    bank_topics = get_bank().topics()
+    topics = st.multiselect("Topics", list(bank_topics),
+                            default=[BUILTIN_TOPIC] if BUILTIN_TOPIC in bank_topics else None,
+                            format_func=lambda t: f"{t} ({bank_topics[t]:,})", placeholder="All topics")
+    difficulties = st.multiselect("Difficulty", list(DIFFICULTIES), format_func=DIFFICULTIES.get,
+                                  placeholder="Any difficulty")
+    available = min(get_bank().count(topics, difficulties), 15)
+    if available > 3:
+        num_q = st.slider("Number of questions", min_value=3, max_value=available,
+                          value=min(NUM_QUESTIONS_DEFAULT, available))
+    elif available:
+        num_q = available
+        st.caption(f"Only {available} question(s) match these filters.")
+    else:
+        num_q = 0
+        st.warning("No questions match these filters.")
+    adaptive = st.checkbox("🎯 Pick by live difficulty", value=False,
+                           help="Prefer questions other players answer correctly about as often as the target.")
+    target_rate = st.slider("Target success rate", 0.3, 0.9, 0.7, 0.05) if adaptive else None
+    timed = st.checkbox("Timed mode (per question)", value=False)
+    time_per_q = st.slider("Seconds per question", min_value=5, max_value=60, value=20) if timed else 20
+    if st.button("🔁 Start New Quiz", disabled=not available):
+        start_quiz(num_q, timed, time_per_q, topics, difficulties, target_rate)
+
+    st.markdown("---")
+    st.write("🏆 High Scores")
+    period = st.radio("Period", list(PERIODS), index=2, format_func=PERIODS.get, horizontal=True,
+                      label_visibility="collapsed")
+    hs = load_high_scores(period)
+    if not hs.empty:
+        st.dataframe(hs, hide_index=True)
+    else:
+        st.write("No scores yet. Be the first! 🎉")
+
+    with st.expander("⏱️ Server CPU per run"):
+        page_ms, tick_ms = get_cpu_meter().avg_ms("page"), get_cpu_meter().avg_ms("tick")
+        st.write(f"Full page: **{page_ms:.1f} ms**" if page_ms is not None else "Full page: no runs yet")
+        if tick_ms is not None:
+            st.write(f"Timer tick: **{tick_ms:.1f} ms**, i.e. {tick_ms / 10:.2f}% of a core "
+                     f"per active timed player (one tick per second)")
+
+# Question analytics
+if view == "📊 Question analytics":
+    st.markdown("### 📊 Question analytics")
+    analytics = get_analytics()
+    rows = analytics.table(get_bank())
+    if not rows:
+        st.write("No answers recorded yet. Play a quiz first! 🎲")
+    else:
+        st.caption(f"{analytics.events:,} answers to {len(analytics.stats):,} questions. "
+                   "Hardest first; the most answered 500 questions are listed.")
+        table = pd.DataFrame(rows).sort_values("correct_rate")
+        table["difficulty"] = table["difficulty"].map(DIFFICULTIES)
+        st.dataframe(table, hide_index=True, column_config={
+            "correct_rate": st.column_config.ProgressColumn("Correct", format="percent", min_value=0, max_value=1),
+            "median_time_s": st.column_config.NumberColumn("Median time", format="%.1f s"),
+            "top_distractor": "Most picked wrong answer",
+            "distractor_share": st.column_config.NumberColumn("Picked by", format="percent"),
+            "no_answer_share": st.column_config.NumberColumn("Timed out", format="percent"),
+        })
+    record_page_cpu()
+    st.stop()
+
+# If no quiz started, show intro / start button
+if st.session_state.quiz_ids is None or not len(st.session_state.quiz_ids):
+    if st.session_state.pop("bank_changed", False):
+        st.warning("The question bank changed while you were playing. Please start a new quiz.")
+    st.markdown("### How to play")
+    st.write(
+        "- Choose number of questions and whether you want Timed mode (each question will auto-submit when time runs out).\n"
+        "- Click **Start New Quiz** in the left panel.\n"
+        "- You will get instant feedback after each question and a final score at the end. Good luck! 🍀"
+    )
+    record_page_cpu()
+    st.stop()
+
+# Quiz in progress
+total_q = len(st.session_state.quiz_ids)
+idx = st.session_state.current_index
+try:
+    review = quiz_review(get_bank(), st.session_state.quiz_ids, st.session_state.picks) if idx >= total_q else None
+except KeyError:
+    drop_changed_quiz()
+    st.rerun()
+
+# If finished
+if idx >= total_q:
+    total_time = int(time.time() - st.session_state.start_time) if st.session_state.start_time else 0
+    st.success(f"Quiz completed! 🎉 Your score: {st.session_state.score} / {total_q}")
+    name = st.text_input("Enter your name to save score (optional):")
+    if st.button("💾 Save Score"):
+        save_high_score(name if name else "Anonymous", st.session_state.score, total_q, total_time)
+        st.success("Saved! Check High Scores in the left panel.")
+    st.markdown("### Review")
+    for a in review:
+        color = "✅" if a["correct"] else "❌"
+        st.write(f"{color} **Q:** {a['question']}")
+        st.write(f"Your answer: **{a['selected']}** — Correct answer: **{a['correct_answer']}**")
+        if a["explain"]:
+            st.info(a["explain"])
+    if st.button("↻ Play Again", disabled=not available):
+        start_quiz(num_q, timed, time_per_q, topics, difficulties, target_rate)
+        st.rerun()
+    record_page_cpu()
+    st.stop()
+
+# Show current question; in timed mode the block reruns every second on its own
+if st.session_state.timed_mode:
+    st.fragment(question_block, run_every=1)()
+else:
+    st.fragment(question_block)()
+record_page_cpu()
@@ -0,0 +1,194 @@
+# fx_bench.py
+# End-to-end latency benchmark for "Day-08 Currrency_conversation.py" against fx_simulator.py.
+# Drives the real page script with Streamlit's AppTest, so timings are server-side script runs
+# (what a visitor waits for before the browser starts drawing).
+#
+#   python fx_bench.py [--latency-ms 80] [--repeat 20] [--json report.json]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import fx_rates
+from fx_simulator import FxSimulator
+
+APP = Path(__file__).resolve().parent / "Day-08 Currrency_conversation.py"
+
+
+def fresh_process_state():
+    """Forget every cache, the HTTP pool and the refresher, as if the server had just started."""
+    for t in threading.enumerate():
+        if isinstance(t, fx_rates.BackgroundRefresher):
+            t.stop()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    fx_rates._http_client = None
+    os.chdir(tempfile.mkdtemp(prefix="fx-bench-"))  # empty rate store
+
+
+def timings(samples: list) -> dict:
+    ms = np.array(samples) * 1000
+    return {"n": len(ms), "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1), "max_ms": round(float(ms.max()), 1)}
+
+
+class Session:
+    """One visitor's page, with helpers that time each interaction and count upstream requests."""
+
+    def __init__(self, sims):
+        self.sims = sims
+        self.at = AppTest.from_file(str(APP), default_timeout=120)
+        self.actions = 0
+        self.served_locally = 0  # actions that needed no provider request
+
+    def _timed(self, fn):
+        before = sum(s.total_requests() for s in self.sims)
+        t0 = time.perf_counter()
+        fn()
+        took = time.perf_counter() - t0
+        if self.at.exception:
+            raise RuntimeError(f"page raised: {self.at.exception}")
+        self.actions += 1
+        self.served_locally += sum(s.total_requests() for s in self.sims) == before
+        return took
+
+    def load(self):
+        return self._timed(self.at.run)
+
+    def convert(self, day: date = None):
+        checkbox = next(c for c in self.at.checkbox if "specific date" in c.label)
+        if day is None:
+            checkbox.uncheck().run()
+        else:
+            checkbox.check().run()
+            next(d for d in self.at.date_input if d.label == "Conversion date").set_value(day)
+        button = next(b for b in self.at.button if "Convert" in b.label and "ledger" not in b.label)
+        return self._timed(lambda: button.click().run())
+
+    def chart(self, days: int):
+        next(s for s in self.at.slider if "Days back" in s.label).set_value(days)
+        button = next(b for b in self.at.button if "historical chart" in b.label)
+        return self._timed(lambda: button.click().run())
+
+    def answered_by(self):
+        metrics = [m.label for m in self.at.metric if "→" in m.label]
+        if metrics:
+            return metrics[-1].rsplit("(", 1)[-1].rstrip(")")
+        return "error shown" if self.at.error else None
+
+    def hit_rate(self):
+        return round(self.served_locally / self.actions, 3) if self.actions else None
+
+
+def scenario_healthy(primary, fallback, repeat: int) -> dict:
+    fresh_process_state()
+    s = Session([primary, fallback])
+    out = {"first_page_load": timings([s.load()])}
+    out["convert_latest_cold"] = timings([s.convert()])
+    out["convert_latest_warm"] = timings([s.convert() for _ in range(repeat)])
+    past = [date.today() - timedelta(days=30 + i) for i in range(repeat)]
+    out["convert_past_day_cold"] = timings([s.convert(d) for d in past])
+    out["convert_past_day_warm"] = timings([s.convert(d) for d in past])
+    for days in (90, 365, 5 * 365):
+        out[f"chart_{days}d_cold"] = timings([s.chart(days)])
+        out[f"chart_{days}d_warm"] = timings([s.chart(days) for _ in range(max(3, repeat // 4))])
+    out["cache_hit_rate"] = s.hit_rate()
+    out["upstream_requests"] = {"primary": dict(primary.requests), "fallback": dict(fallback.requests)}
+    out["http"] = fx_rates.http_client().stats()
+    return out
+
+
+def scenario_primary_down(primary, fallback, repeat: int) -> dict:
+    fresh_process_state()
+    primary.error_rate = 1.0
+    s = Session([primary, fallback])
+    s.load()
+    past = [date.today() - timedelta(days=60 + i) for i in range(repeat)]
+    samples, answered = [], {}
+    for d in past:
+        samples.append(s.convert(d))
+        who = s.answered_by()
+        answered[who] = answered.get(who, 0) + 1
+    primary.error_rate = 0.0
+    return {"convert_past_day": timings(samples), "answered_by": answered,
+            "primary_requests_after_breaker": primary.total_requests()}
+
+
+def scenario_slow_primary(primary, fallback, repeat: int) -> dict:
+    fresh_process_state()
+    primary.latency_ms, fallback_latency = 600, fallback.latency_ms
+    s = Session([primary, fallback])
+    s.load()
+    samples, answered = [], {}
+    for d in (date.today() - timedelta(days=90 + i) for i in range(repeat)):
+        samples.append(s.convert(d))
+        who = s.answered_by()
+        answered[who] = answered.get(who, 0) + 1
+    primary.latency_ms = fallback_latency
+    return {"convert_past_day": timings(samples), "answered_by": answered}
+
+
+def scenario_outage(primary, fallback, repeat: int) -> dict:
+    # warm up, take both providers down, then bring them back
+    fresh_process_state()
+    s = Session([primary, fallback])
+    s.load()
+    s.convert()
+    primary.error_rate = fallback.error_rate = 1.0
+    during = [s.convert() for _ in range(3)]
+    served_during = s.answered_by()
+    cold_day = s.convert(date.today() - timedelta(days=400))
+    cold_result = s.answered_by()
+    primary.error_rate = fallback.error_rate = 0.0
+    time.sleep(1)
+    after = s.convert(date.today() - timedelta(days=401))
+    return {"convert_latest_during_outage": timings(during), "latest_served_by": served_during,
+            "uncached_day_during_outage_ms": round(cold_day * 1000, 1), "uncached_day_result": cold_result,
+            "after_recovery_ms": round(after * 1000, 1), "after_recovery_served_by": s.answered_by()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the currency app against the local provider simulator.")
+    parser.add_argument("--latency-ms", type=float, default=80, help="simulated provider latency")
+    parser.add_argument("--jitter-ms", type=float, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    primary = FxSimulator(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=1).start()
+    fallback = FxSimulator(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=2).start()
+    os.environ["FX_API_BASE"], os.environ["FX_FALLBACK_BASE"] = primary.url, fallback.url
+    sys.path.insert(0, str(APP.parent))
+    cwd = os.getcwd()
+
+    report = {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "repeat": args.repeat}
+    try:
+        for name, scenario in (("healthy", scenario_healthy), ("primary_down", scenario_primary_down),
+                               ("slow_primary", scenario_slow_primary), ("outage", scenario_outage)):
+            primary.reset_counts()
+            fallback.reset_counts()
+            report[name] = scenario(primary, fallback, args.repeat)
+            print(f"== {name}")
+            for key, value in report[name].items():
+                print(f"  {key}: {value}")
+    finally:
+        fresh_process_state()
+        os.chdir(cwd)
+        primary.stop()
+        fallback.stop()
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
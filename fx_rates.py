@@ -0,0 +1,1044 @@
+# fx_rates.py
+# Rate storage and provider plumbing for "Day-08 Currrency_conversation.py".
+# Kept free of Streamlit so it can be driven from scripts against a stub provider.
+import io
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+DATA_DIR = Path("data")
+RATE_DB = DATA_DIR / "fx_rates.sqlite"
+MATRIX_BASE = "EUR"
+MAX_TIMESERIES_DAYS = 365  # longest range the providers answer in one timeseries request
+HOT_PAIR_CAPACITY = 200    # rows kept in the pair-popularity (LFU) table
+CHART_POINTS = 700         # about the pixel width of a chart in the centered layout
+
+
+class HttpClient:
+    """Process-wide HTTP client: keep-alive pooling, bounded jittered retries, ETag/Last-Modified revalidation."""
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, pool_size: int = 20, retries: int = 2, backoff: float = 0.2, max_backoff: float = 2.0,
+                 max_validators: int = 256):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._validators = OrderedDict()  # request key -> (etag, last_modified, payload)
+        self._max_validators = max_validators
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "retries": 0, "not_modified": 0, "errors": 0,
+                       "new_connections": 0, "reused_connections": 0}
+        self._time = {"new": [0.0, 0], "reused": [0.0, 0]}
+
+    def _connections_opened(self, url: str) -> int:
+        # urllib3 counts the connections each host pool has opened
+        pools = self.session.get_adapter(url).poolmanager.pools
+        total = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            total += pool.num_connections if pool is not None else 0
+        return total
+
+    def _send(self, url: str, params, headers, timeout):
+        before = self._connections_opened(url)
+        t0 = time.perf_counter()
+        r = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        elapsed = time.perf_counter() - t0
+        # under concurrent requests a new connection may be credited to a neighbour; totals stay right
+        kind = "new" if self._connections_opened(url) > before else "reused"
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts[f"{kind}_connections"] += 1
+            self._time[kind][0] += elapsed
+            self._time[kind][1] += 1
+        return r
+
+    def get_json(self, url: str, params: dict = None, timeout: float = 10, retries: int = None):
+        """GET and decode JSON; retries connection errors and 429/5xx, raises once retries run out.
+
+        `retries` overrides the client's default for this call (0 for a single attempt).
+        """
+        retries = self.retries if retries is None else retries
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            cached = self._validators.get(key)
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        for attempt in range(retries + 1):
+            try:
+                r = self._send(url, params, headers, timeout)
+                if r.status_code == 304 and cached:
+                    with self._lock:
+                        self.counts["not_modified"] += 1
+                        self._validators.move_to_end(key)
+                    return cached[2]
+                r.raise_for_status()
+                payload = r.json()
+                etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+                if etag or last_modified:
+                    with self._lock:
+                        self._validators[key] = (etag, last_modified, payload)
+                        self._validators.move_to_end(key)
+                        while len(self._validators) > self._max_validators:
+                            self._validators.popitem(last=False)
+                return payload
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                retryable = (not isinstance(e, requests.HTTPError)
+                             or (e.response is not None and e.response.status_code in self.RETRY_STATUS))
+                if not retryable or attempt >= retries:
+                    with self._lock:
+                        self.counts["errors"] += 1
+                    raise
+                with self._lock:
+                    self.counts["retries"] += 1
+                # full jitter: sleep uniformly up to the capped exponential step
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self.counts)
+            new_t, new_n = self._time["new"]
+            reused_t, reused_n = self._time["reused"]
+        out["avg_new_ms"] = round(new_t / new_n * 1000, 1) if new_n else None
+        out["avg_reused_ms"] = round(reused_t / reused_n * 1000, 1) if reused_n else None
+        # time the reused requests would have cost on fresh connections, minus what they did cost
+        saved = (new_t / new_n - reused_t / reused_n) * reused_n if new_n and reused_n else 0.0
+        out["saved_ms"] = round(max(0.0, saved) * 1000, 1)
+        return out
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def http_client() -> HttpClient:
+    """The shared client (created on first use)."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient()
+        return _http_client
+
+
+def is_final(day: str) -> bool:
+    """Rates for days before today (local date) are published and never change."""
+    return bool(day) and day < date.today().isoformat()
+
+
+class RateStore:
+    """On-disk table of daily rates keyed by (date, base, quote).
+
+    Only final (past) days are written, so everything in here can be served forever.
+    Safe to share between Streamlit sessions: one connection, one lock.
+    """
+
+    def __init__(self, path=RATE_DB):
+        path = Path(path)
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rates ("
+                " date TEXT NOT NULL, base TEXT NOT NULL, quote TEXT NOT NULL,"
+                " rate REAL NOT NULL, provider TEXT, fetched_at REAL,"
+                " PRIMARY KEY (date, base, quote)) WITHOUT ROWID"
+            )
+            # day ranges already fetched for a pair (days without a rate, e.g. weekends, included)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                " base TEXT NOT NULL, quote TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL,"
+                " PRIMARY KEY (base, quote, start)) WITHOUT ROWID"
+            )
+            # a row here means the whole quote table for (date, base) is in `rates`
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " date TEXT NOT NULL, base TEXT NOT NULL, rate_date TEXT, provider TEXT, fetched_at REAL,"
+                " PRIMARY KEY (date, base)) WITHOUT ROWID"
+            )
+            # how often each pair is asked for; drives background prefetching
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pair_counts ("
+                " base TEXT NOT NULL, quote TEXT NOT NULL, count INTEGER NOT NULL, last_used REAL,"
+                " PRIMARY KEY (base, quote)) WITHOUT ROWID"
+            )
+
+    def record_pair(self, base: str, quote: str, capacity: int = HOT_PAIR_CAPACITY):
+        """Count a request for a pair; beyond `capacity` pairs the least frequently used is evicted."""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO pair_counts VALUES (?, ?, 1, ?)"
+                " ON CONFLICT (base, quote) DO UPDATE SET count = count + 1, last_used = excluded.last_used",
+                (base, quote, time.time()),
+            )
+            (n,) = self._db.execute("SELECT COUNT(*) FROM pair_counts").fetchone()
+            if n > capacity:
+                self._db.execute(
+                    "DELETE FROM pair_counts WHERE (base, quote) IN ("
+                    " SELECT base, quote FROM pair_counts ORDER BY count, last_used LIMIT ?)",
+                    (n - capacity,),
+                )
+
+    def hot_pairs(self, n: int = 10) -> list:
+        """[(base, quote, count)] most requested first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT base, quote, count FROM pair_counts ORDER BY count DESC, last_used DESC LIMIT ?", (n,)
+            ).fetchall()
+
+    def get(self, day: str, base: str, quote: str):
+        """Stored rate or None; counts towards the hit rate."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rate FROM rates WHERE date = ? AND base = ? AND quote = ?",
+                (day, base, quote),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def get_range(self, base: str, quote: str, start: str, end: str) -> dict:
+        """{date: rate} for every stored day in [start, end]."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT date, rate FROM rates WHERE base = ? AND quote = ? AND date BETWEEN ? AND ?",
+                (base, quote, start, end),
+            ).fetchall()
+        return dict(rows)
+
+    def _coverage(self, base: str, quote: str) -> list:
+        # caller holds the lock
+        rows = self._db.execute(
+            "SELECT start, end FROM coverage WHERE base = ? AND quote = ? ORDER BY start", (base, quote)
+        ).fetchall()
+        return [(date.fromisoformat(a), date.fromisoformat(b)) for a, b in rows]
+
+    def coverage(self, base: str, quote: str) -> list:
+        """Merged [(start, end)] day ranges already fetched for the pair."""
+        with self._lock:
+            return self._coverage(base, quote)
+
+    def add_coverage(self, base: str, quote: str, start: date, end: date):
+        """Record [start, end] as fetched; past days only. Stored ranges are kept merged."""
+        end = min(end, date.today() - timedelta(days=1))
+        if end < start:
+            return
+        # read, merge and rewrite in one step, or a concurrent fetch of the pair could lose its range
+        with self._lock, self._db:
+            merged = merge_ranges(self._coverage(base, quote) + [(start, end)])
+            self._db.execute("DELETE FROM coverage WHERE base = ? AND quote = ?", (base, quote))
+            self._db.executemany("INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                                 [(base, quote, a.isoformat(), b.isoformat()) for a, b in merged])
+
+    def count(self, hits: int = 0, misses: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def put(self, day: str, base: str, quote: str, rate: float, provider: str = None) -> bool:
+        """Write one rate through; ignored unless the day is final. Returns whether it was stored."""
+        return self.put_many([(day, base, quote, rate)], provider) == 1
+
+    def put_many(self, rows, provider: str = None) -> int:
+        """rows: iterable of (date, base, quote, rate). Non-final days and missing rates are skipped."""
+        now = time.time()
+        clean = [(d, b, q, float(r), provider, now) for d, b, q, r in rows if r is not None and is_final(d)]
+        if clean:
+            with self._lock, self._db:
+                self._db.executemany("INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?, ?, ?)", clean)
+        return len(clean)
+
+    def get_snapshot(self, day: str, base: str):
+        """(rates, rate_date) for a stored full quote table, else None; counts towards the hit rate."""
+        with self._lock:
+            snap = self._db.execute(
+                "SELECT rate_date FROM snapshots WHERE date = ? AND base = ?", (day, base)
+            ).fetchone()
+            if snap is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            rows = self._db.execute(
+                "SELECT quote, rate FROM rates WHERE date = ? AND base = ?", (day, base)
+            ).fetchall()
+        return dict(rows), snap[0]
+
+    def put_snapshot(self, day: str, base: str, rates: dict, rate_date: str, provider: str = None) -> bool:
+        """Write a full quote table through (final days only)."""
+        if not is_final(day) or not rates:
+            return False
+        self.put_many(((day, base, quote, rate) for quote, rate in rates.items()), provider)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                             (day, base, rate_date, provider, time.time()))
+        return True
+
+    def cached_rate(self, day: str, base: str, quote: str, fetch):
+        """Read-through lookup: stored rate, else fetch(day, base, quote) -> (rate, provider) written through.
+
+        Returns (rate, provider); provider is "rate-store" for local hits.
+        """
+        rate = self.get(day, base, quote)
+        if rate is not None:
+            return rate, "rate-store"
+        rate, provider = fetch(day, base, quote)
+        if rate is not None:
+            self.put(day, base, quote, rate, provider)
+        return rate, provider
+
+    def stats(self) -> dict:
+        with self._lock:
+            (rows,) = self._db.execute("SELECT COUNT(*) FROM rates").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "rows": rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def merge_ranges(ranges) -> list:
+    """Union of inclusive day ranges; touching ranges are joined."""
+    out = []
+    for start, end in sorted(ranges):
+        if out and start <= out[-1][1] + timedelta(days=1):
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        else:
+            out.append((start, end))
+    return out
+
+
+def missing_ranges(covered, start: date, end: date) -> list:
+    """Sub-ranges of [start, end] not inside any covered range."""
+    gaps = []
+    cursor = start
+    for a, b in merge_ranges(covered):
+        if b < cursor:
+            continue
+        if a > end:
+            break
+        if a > cursor:
+            gaps.append((cursor, a - timedelta(days=1)))
+        cursor = max(cursor, b + timedelta(days=1))
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def split_range(start: date, end: date, max_days: int = MAX_TIMESERIES_DAYS) -> list:
+    """Chunks of at most max_days days covering [start, end]."""
+    chunks = []
+    while start <= end:
+        stop = min(end, start + timedelta(days=max_days - 1))
+        chunks.append((start, stop))
+        start = stop + timedelta(days=1)
+    return chunks
+
+
+def load_timeseries(store: RateStore, fetch, base: str, quote: str, start: str, end: str,
+                    max_days: int = MAX_TIMESERIES_DAYS, workers: int = 4):
+    """Daily rates for [start, end], fetching only the days the store has not seen.
+
+    fetch(base, quote, start, end) -> [(day, rate)] for one provider-sized chunk; the missing
+    chunks are fetched in parallel, written through and merged with what was stored.
+    Returns (sorted [(day, rate)], number of days that had to be fetched).
+    """
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    gaps = missing_ranges(store.coverage(base, quote), first, last)
+    chunks = [c for a, b in gaps for c in split_range(a, b, max_days)]
+    fetched = []
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks)), thread_name_prefix="fx-range") as ex:
+            results = list(ex.map(lambda c: fetch(base, quote, c[0].isoformat(), c[1].isoformat()), chunks))
+        for (a, b), items in zip(chunks, results):
+            if not items:
+                continue  # an empty answer is more likely an API error than a range without rates
+            store.put_many((d, base, quote, rate) for d, rate in items)
+            store.add_coverage(base, quote, a, b)
+            fetched.extend(items)
+    fetched_days = sum((b - a).days + 1 for a, b in chunks)
+    store.count(hits=int(not chunks), misses=int(bool(chunks)))
+    series = store.get_range(base, quote, start, end)
+    series.update((d, r) for d, r in fetched if r is not None)  # today's rate is never stored
+    return sorted(series.items()), fetched_days
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions kept by Largest-Triangle-Three-Buckets: first, last and one point per bucket in between.
+
+    Within each bucket the point forming the largest triangle with the previously kept point and
+    the average of the next bucket wins, so peaks and troughs survive.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets over the inner points
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:nxt_hi].mean(), y[hi:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_series(series: pd.Series, n_out: int = CHART_POINTS) -> pd.Series:
+    """Shape-preserving LTTB reduction of a date-indexed series to at most n_out points."""
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+    x = series.index.asi8.astype(np.float64)
+    keep = lttb_indices(x, series.to_numpy(dtype=np.float64), n_out)
+    return series.iloc[keep]
+
+
+class RateMatrix:
+    """Every cross rate for one day, derived from a single base-currency quote table.
+
+    quotes[i] is how many units of codes[i] one unit of `base` buys, so
+    rate(a -> b) = quotes[b] / quotes[a]: N^2 pairs from one provider fetch.
+    """
+
+    def __init__(self, day: str, base: str, rates: dict, provider: str = None):
+        table = {code.upper(): float(rate) for code, rate in rates.items() if rate}
+        table[base.upper()] = 1.0
+        self.day = day
+        self.base = base.upper()
+        self.provider = provider
+        self.codes = np.array(sorted(table))
+        self.quotes = np.array([table[c] for c in self.codes])
+
+    def __contains__(self, code) -> bool:
+        return self._positions([code])[0] >= 0
+
+    def _positions(self, codes) -> np.ndarray:
+        codes = np.char.upper(np.asarray(codes, dtype=str))
+        pos = np.searchsorted(self.codes, codes)
+        pos = np.minimum(pos, len(self.codes) - 1)
+        return np.where(self.codes[pos] == codes, pos, -1)
+
+    def rates(self, from_codes, to_codes) -> np.ndarray:
+        """Vectorized from -> to rates; NaN where either currency is unknown."""
+        src, dst = self._positions(from_codes), self._positions(to_codes)
+        out = self.quotes[dst] / self.quotes[src]
+        return np.where((src >= 0) & (dst >= 0), out, np.nan)
+
+    def rate(self, from_curr: str, to_curr: str) -> float:
+        return float(self.rates([from_curr], [to_curr])[0])
+
+    def convert(self, amounts, from_codes, to_codes) -> np.ndarray:
+        """Convert many amounts at once; from/to may be single codes or arrays matching amounts."""
+        amounts = np.asarray(amounts, dtype=float)
+        from_codes = np.broadcast_to(np.asarray(from_codes, dtype=str), amounts.shape)
+        to_codes = np.broadcast_to(np.asarray(to_codes, dtype=str), amounts.shape)
+        return amounts * self.rates(from_codes.ravel(), to_codes.ravel()).reshape(amounts.shape)
+
+    def table(self) -> np.ndarray:
+        """Full N x N cross-rate table, row = from, column = to."""
+        return np.outer(1.0 / self.quotes, self.quotes)
+
+
+class Provider:
+    """An exchange-rate API. base_param is what it calls the base currency ("base" or "from")."""
+
+    def __init__(self, name: str, base_url: str, base_param: str = "base"):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.base_param = base_param
+
+
+class CircuitBreaker:
+    """Per-provider health: opens after `threshold` straight failures and skips the provider for `cooldown` s.
+
+    After the cooldown one trial request is let through (half-open); success closes it again.
+    health is an exponentially weighted success rate in [0, 1].
+    """
+
+    def __init__(self, threshold: int = 3, cooldown: float = 30.0, window: int = 500):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial_running = False
+        self.health = 1.0
+        self.latencies = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return "closed"
+        return "half-open" if time.monotonic() >= self.open_until else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def release_trial(self):
+        """Give back a half-open trial that was granted but never ran."""
+        with self._lock:
+            self.trial_running = False
+
+    def record(self, ok: bool, latency: float):
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(latency)
+            self.health = 0.8 * self.health + 0.2 * (1.0 if ok else 0.0)
+            self.trial_running = False
+            if ok:
+                self.failures = 0
+            else:
+                self.errors += 1
+                self.failures += 1
+                if self.failures >= self.threshold:
+                    self.open_until = time.monotonic() + self.cooldown
+
+    def percentile(self, q: float):
+        with self._lock:
+            samples = list(self.latencies)
+        return float(np.percentile(samples, q)) if samples else None
+
+
+class ProviderPool:
+    """Races every healthy provider concurrently and takes the first valid answer."""
+
+    def __init__(self, providers, threshold: int = 3, cooldown: float = 30.0, max_workers: int = 16):
+        self.providers = list(providers)
+        self.breakers = {p.name: CircuitBreaker(threshold, cooldown) for p in self.providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fx-provider")
+
+    def _timed(self, provider: Provider, request):
+        t0 = time.perf_counter()
+        try:
+            value = request(provider)
+        except Exception:
+            value = None
+        self.breakers[provider.name].record(value is not None, time.perf_counter() - t0)
+        return value
+
+    def race(self, request, timeout: float = 10.0):
+        """request(provider) -> value, or None/raise when the answer is unusable.
+
+        Returns (value, provider name) for the first valid answer, or (None, None).
+        Open circuits are skipped; if every circuit is open all providers are tried anyway.
+        Losing requests are not awaited; they finish in the background and only feed the stats.
+        """
+        candidates = [p for p in self.providers if self.breakers[p.name].allow()] or self.providers
+        pending = {self._executor.submit(self._timed, p, request): p for p in candidates}
+        deadline = time.monotonic() + timeout
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for fut in done:
+                    provider = pending.pop(fut)
+                    value = fut.result()
+                    if value is not None:
+                        return value, provider.name
+        finally:
+            for fut, provider in pending.items():
+                if fut.cancel():
+                    # never started: a half-open trial it held would otherwise stay taken for good
+                    self.breakers[provider.name].release_trial()
+        return None, None
+
+    def stats(self) -> list:
+        rows = []
+        for p in self.providers:
+            b = self.breakers[p.name]
+            rows.append({"provider": p.name, "state": b.state, "health": round(b.health, 3),
+                         "calls": b.calls, "errors": b.errors,
+                         "p50_ms": None if b.percentile(50) is None else round(b.percentile(50) * 1000, 1),
+                         "p99_ms": None if b.percentile(99) is None else round(b.percentile(99) * 1000, 1)})
+        return rows
+
+
+def fetch_base_table(pool: ProviderPool, day: str = None, base: str = MATRIX_BASE, timeout: float = 10):
+    """One quote table for `base` on `day` (latest if None): (rates, rate_date, provider) or None."""
+    when = day or "latest"
+
+    def request(provider):
+        j = http_client().get_json(f"{provider.base_url}/{when}", params={provider.base_param: base},
+                                   timeout=timeout)
+        return (j["rates"], j.get("date", day)) if j.get("rates") else None
+
+    value, provider = pool.race(request, timeout)
+    if value is None:
+        return None
+    rates, rate_date = value
+    return rates, rate_date, provider
+
+
+def load_rate_matrix(store: RateStore, pool: ProviderPool, day: str = None, base: str = MATRIX_BASE):
+    """RateMatrix for a day: from the store when final and present, otherwise fetched and written through."""
+    if day and is_final(day):
+        stored = store.get_snapshot(day, base)
+        if stored:
+            rates, rate_date = stored
+            return RateMatrix(rate_date or day, base, rates, "rate-store")
+    fetched = fetch_base_table(pool, day, base)
+    if fetched is None:
+        return None
+    rates, rate_date, provider = fetched
+    store.put_snapshot(day or rate_date, base, rates, rate_date, provider)
+    return RateMatrix(rate_date, base, rates, provider)
+
+
+class StaleWhileRevalidate:
+    """One cached value that is always served at once; when older than `ttl` it is reloaded off-thread.
+
+    Only the very first get() waits for the loader. The first attempt, whichever thread makes it,
+    uses `first_loader` if given (say, a short timeout and no retries); later attempts use `loader`
+    and run off-thread. Loader errors keep the previous value, and get() does not call the loader
+    again for `retry_after` s, so an outage doesn't stall every page.
+    """
+
+    def __init__(self, loader, ttl: float, retry_after: float = 30.0, first_loader=None):
+        self.loader = loader
+        self.first_loader = first_loader
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.value = None
+        self.loaded_at = None
+        self.last_error = None
+        self.failed_at = None
+        self._refreshing = threading.Lock()
+
+    @property
+    def age(self):
+        return None if self.loaded_at is None else time.time() - self.loaded_at
+
+    @property
+    def stale(self) -> bool:
+        return self.loaded_at is None or self.age > self.ttl
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refreshing.locked()
+
+    def refresh(self, wait: bool = False) -> bool:
+        """Reload now. Single-flight: if a reload is already running, return False (after it ends if `wait`)."""
+        if not self._refreshing.acquire(blocking=False):
+            if wait:
+                with self._refreshing:
+                    pass
+            return False
+        try:
+            first = self.loaded_at is None and self.failed_at is None
+            value = (self.first_loader if first and self.first_loader else self.loader)()
+            if value is None:
+                raise RuntimeError("loader returned nothing")
+            self.value, self.loaded_at, self.last_error, self.failed_at = value, time.time(), None, None
+            return True
+        except Exception as e:
+            self.last_error, self.failed_at = e, time.time()
+            return False
+        finally:
+            self._refreshing.release()
+
+    def refresh_async(self):
+        threading.Thread(target=self.refresh, name="fx-swr", daemon=True).start()
+
+    def get(self):
+        backing_off = self.failed_at is not None and time.time() - self.failed_at < self.retry_after
+        if backing_off:
+            pass
+        elif self.value is None and self.failed_at is None:
+            self.refresh(wait=True)
+        elif self.value is None or self.stale:
+            self.refresh_async()
+        return self.value
+
+
+class BackgroundRefresher(threading.Thread):
+    """Keeps warm values fresh: every `interval` s reloads whatever is near its TTL and runs extra tasks.
+
+    Create one per server process (st.cache_resource) and start() it.
+    """
+
+    def __init__(self, values: dict, tasks=(), interval: float = 60.0, early: float = 0.8):
+        super().__init__(name="fx-refresher", daemon=True)
+        self.values = values
+        self.tasks = list(tasks)
+        self.interval = interval
+        self.early = early
+        self.runs = 0
+        self.last_run = None
+        self._stop_event = threading.Event()
+
+    def run_once(self):
+        for holder in self.values.values():
+            if holder.loaded_at is None or holder.age > holder.ttl * self.early:
+                holder.refresh()
+        for task in self.tasks:
+            try:
+                task()
+            except Exception:
+                pass  # prefetching is best effort
+        self.runs += 1
+        self.last_run = time.time()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def prefetch_hot_pairs(store: RateStore, fetch, n: int = 10, days: int = 90):
+    """Bring the recent history of the n most requested pairs into the store (only missing days are fetched)."""
+    end = date.today()
+    start = (end - timedelta(days=days)).isoformat()
+    for base, quote, _ in store.hot_pairs(n):
+        load_timeseries(store, fetch, base, quote, start, end.isoformat())
+
+
+def load_rate_matrices(store: RateStore, pool: ProviderPool, days, workers: int = 8) -> dict:
+    """{day: RateMatrix or None} for many days at once; each day is one table (store or provider)."""
+    days = sorted(set(days))
+    today = date.today().isoformat()
+    # today and later all use the latest table
+    wanted = {d: (d if d < today else None) for d in days}
+    # one fixed, ordered list of tables to load, so keys and results line up
+    tables_wanted = sorted(set(wanted.values()), key=lambda d: d or "")
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(days))), thread_name_prefix="fx-ledger") as ex:
+        tables = dict(zip(tables_wanted, ex.map(lambda d: load_rate_matrix(store, pool, d), tables_wanted)))
+    return {d: tables[w] for d, w in wanted.items()}
+
+
+def convert_frame(frame: pd.DataFrame, matrices: dict, target: str, amount_col: str, currency_col: str,
+                  date_col: str) -> pd.DataFrame:
+    """Add rate/converted columns to a ledger chunk; one vectorized pass per distinct date."""
+    amounts = pd.to_numeric(frame[amount_col], errors="coerce").to_numpy(dtype=float)
+    currencies = frame[currency_col].astype(str).str.strip().str.upper().to_numpy()
+    days = pd.to_datetime(frame[date_col], errors="coerce").dt.strftime("%Y-%m-%d")
+    rates = np.full(len(frame), np.nan)
+    codes, positions = np.unique(days.fillna("").to_numpy(), return_inverse=True)
+    for i, day in enumerate(codes):
+        matrix = matrices.get(day)
+        if matrix is None:
+            continue
+        rows = positions == i
+        rates[rows] = matrix.rates(currencies[rows], np.full(rows.sum(), target))
+    return frame.assign(**{f"rate_to_{target}": rates, f"amount_{target}": amounts * rates})
+
+
+def convert_ledger_csv(source, store: RateStore, pool: ProviderPool, target: str, amount_col: str = "amount",
+                       currency_col: str = "currency", date_col: str = "date", chunksize: int = 50_000):
+    """Stream a ledger CSV twice: collect distinct dates, fetch each day's table once, convert chunk by chunk.
+
+    `source` is a path or a seekable file object. Returns (csv bytes, summary dict).
+    """
+    t0 = time.perf_counter()
+    days = set()
+    for chunk in pd.read_csv(source, usecols=[date_col], chunksize=chunksize):
+        days.update(pd.to_datetime(chunk[date_col], errors="coerce").dt.strftime("%Y-%m-%d").dropna())
+    matrices = load_rate_matrices(store, pool, days)
+    fetch_s = time.perf_counter() - t0
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    out = io.StringIO()
+    rows = unconverted = 0
+    for n, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+        converted = convert_frame(chunk, matrices, target.upper(), amount_col, currency_col, date_col)
+        converted.to_csv(out, index=False, header=(n == 0))
+        rows += len(converted)
+        unconverted += int(converted[f"rate_to_{target.upper()}"].isna().sum())
+    summary = {"rows": rows, "distinct_dates": len(days), "missing_tables": sum(m is None for m in matrices.values()),
+               "unconverted_rows": unconverted, "fetch_s": round(fetch_s, 3),
+               "total_s": round(time.perf_counter() - t0, 3)}
+    return out.getvalue().encode("utf-8"), summary
+
+
+def _stub_check():
+    # exercises the store against a counting stub provider
+    calls = []
+
+    def stub_provider(day, base, quote):
+        calls.append((day, base, quote))
+        return 1.1, "stub"
+
+    store = RateStore(":memory:")
+    for _ in range(5):
+        assert store.cached_rate("2020-01-02", "USD", "EUR", stub_provider) in [(1.1, "stub"), (1.1, "rate-store")]
+    assert len(calls) == 1, calls
+    today = date.today().isoformat()
+    store.cached_rate(today, "USD", "EUR", stub_provider)
+    store.cached_rate(today, "USD", "EUR", stub_provider)
+    assert len(calls) == 3, "today's rate must not be stored"
+    print("rate store OK:", store.stats())
+
+    m = RateMatrix("2020-01-02", "EUR", {"USD": 1.1, "GBP": 0.85, "JPY": 120.0})
+    assert abs(m.rate("USD", "GBP") - 0.85 / 1.1) < 1e-12
+    assert abs(m.rate("GBP", "EUR") * m.rate("EUR", "GBP") - 1) < 1e-12
+    out = m.convert([1, 2, 3], ["USD", "JPY", "XXX"], "EUR")
+    assert abs(out[0] - 1 / 1.1) < 1e-12 and abs(out[1] - 2 / 120) < 1e-12 and np.isnan(out[2])
+    print("rate matrix OK:", m.table().shape)
+
+
+def _race_check():
+    # two local stand-in providers: a slow/broken "primary" and a healthy fallback
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    def serve(delay: float, fail: bool):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(delay)
+                body = b"{}" if fail else json.dumps({"date": "2020-01-02", "rates": {"USD": 1.1}}).encode()
+                self.send_response(500 if fail else 200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_port}"
+
+    slow, slow_url = serve(delay=1.0, fail=False)
+    broken, broken_url = serve(delay=0.0, fail=True)
+    good, good_url = serve(delay=0.05, fail=False)
+
+    pool = ProviderPool([Provider("slow", slow_url), Provider("good", good_url, "from")], cooldown=60)
+    t0 = time.perf_counter()
+    rates, _, provider = fetch_base_table(pool, "2020-01-02")
+    elapsed = time.perf_counter() - t0
+    assert provider == "good" and elapsed < 0.5, (provider, elapsed)
+
+    pool = ProviderPool([Provider("broken", broken_url), Provider("good", good_url, "from")],
+                        threshold=2, cooldown=60)
+    for _ in range(5):
+        assert fetch_base_table(pool, "2020-01-02")[2] == "good"
+        time.sleep(0.7)  # let the losing request finish its retries and report back
+    broken_stats = pool.stats()[0]
+    assert broken_stats["state"] == "open" and broken_stats["calls"] == 2, broken_stats
+    for server in (slow, broken, good):
+        server.shutdown()
+    print("provider race OK:", pool.stats())
+
+    # a half-open trial still queued when the race gives up must be handed back
+    busy = ProviderPool([Provider("busy", "http://unused"), Provider("trial", "http://unused")],
+                        threshold=1, cooldown=0, max_workers=1)
+    busy.breakers["trial"].record(False, 0.0)
+    assert busy.race(lambda p: time.sleep(0.3), timeout=0.05) == (None, None)
+    assert not busy.breakers["trial"].trial_running and busy.breakers["trial"].allow()
+
+
+def _http_check():
+    # keep-alive reuse and ETag revalidation against a local HTTP/1.1 server
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    hits = {"full": 0, "not_modified": 0, "flaky": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path.startswith("/flaky") and hits["flaky"] < 1:
+                hits["flaky"] += 1
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.headers.get("If-None-Match") == '"v1"':
+                hits["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            hits["full"] += 1
+            body = json.dumps({"symbols": {"USD": {}}}).encode()
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    client = HttpClient(backoff=0.01)
+    for _ in range(5):
+        assert client.get_json(f"{url}/symbols") == {"symbols": {"USD": {}}}
+    assert client.get_json(f"{url}/flaky") == {"symbols": {"USD": {}}}
+    server.shutdown()
+    stats = client.stats()
+    assert hits["full"] == 2 and hits["not_modified"] == 4, hits
+    assert stats["new_connections"] == 1 and stats["retries"] == 1, stats
+    print("http client OK:", stats)
+
+
+def _timeseries_check():
+    # widening a window must only fetch the new days
+    asked = []
+
+    def stub_fetch(base, quote, start, end):
+        asked.append((start, end))
+        a, b = date.fromisoformat(start), date.fromisoformat(end)
+        return [((a + timedelta(days=i)).isoformat(), 1.0 + i) for i in range((b - a).days + 1)]
+
+    store = RateStore(":memory:")
+    end = date.today() - timedelta(days=1)
+    items, fetched = load_timeseries(store, stub_fetch, "USD", "EUR",
+                                     (end - timedelta(days=89)).isoformat(), end.isoformat())
+    assert len(items) == 90 and fetched == 90
+    items, fetched = load_timeseries(store, stub_fetch, "USD", "EUR",
+                                     (end - timedelta(days=119)).isoformat(), end.isoformat())
+    assert len(items) == 120 and fetched == 30, fetched
+    items, fetched = load_timeseries(store, stub_fetch, "USD", "EUR",
+                                     (end - timedelta(days=100)).isoformat(), end.isoformat())
+    assert fetched == 0
+    items, fetched = load_timeseries(store, stub_fetch, "USD", "EUR",
+                                     (end - timedelta(days=1000)).isoformat(), end.isoformat(), max_days=365)
+    assert fetched == 881 and len(asked) == 5, asked  # 881 new days -> 3 chunks
+    assert missing_ranges([(date(2020, 1, 5), date(2020, 1, 9))], date(2020, 1, 1), date(2020, 1, 12)) == [
+        (date(2020, 1, 1), date(2020, 1, 4)), (date(2020, 1, 10), date(2020, 1, 12))]
+
+    # concurrent fetches of one pair each keep their range
+    base_day = date.today() - timedelta(days=400)
+    spans = [(base_day + timedelta(days=10 * i), base_day + timedelta(days=10 * i + 4)) for i in range(32)]
+    workers = [threading.Thread(target=store.add_coverage, args=("GBP", "JPY", a, b)) for a, b in spans]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert store.coverage("GBP", "JPY") == spans
+    print("timeseries cache OK:", store.stats())
+
+
+def _ledger_check(n_rows: int = 100_000, n_days: int = 250):
+    # 100k ledger rows over 250 past days, tables preloaded so no provider is needed
+    rng = np.random.default_rng(0)
+    store = RateStore(":memory:")
+    days = [(date.today() - timedelta(days=i + 1)).isoformat() for i in range(n_days)]
+    for i, d in enumerate(days):
+        store.put_snapshot(d, MATRIX_BASE, {"USD": 1.1 + i / 1000, "GBP": 0.85, "JPY": 160.0}, d, "stub")
+    ledger = pd.DataFrame({
+        "date": rng.choice(days, n_rows),
+        "currency": rng.choice(["USD", "GBP", "JPY", "EUR"], n_rows),
+        "amount": rng.uniform(1, 1000, n_rows).round(2),
+    })
+    source = io.BytesIO(ledger.to_csv(index=False).encode())
+    unused_pool = ProviderPool([])
+    data, summary = convert_ledger_csv(source, store, unused_pool, "usd")
+    result = pd.read_csv(io.BytesIO(data))
+    eur = result[result["currency"] == "EUR"].iloc[0]
+    assert abs(eur["rate_to_USD"] - (1.1 + days.index(eur["date"]) / 1000)) < 1e-9
+    assert summary["rows"] == n_rows and summary["unconverted_rows"] == 0, summary
+    print("ledger OK:", summary)
+
+
+def _refresh_check():
+    loads = []
+
+    def slow_loader():
+        time.sleep(0.2)
+        loads.append(time.time())
+        return {"n": len(loads)}
+
+    holder = StaleWhileRevalidate(slow_loader, ttl=0.1)
+    assert holder.get() == {"n": 1}           # first call waits
+    time.sleep(0.15)
+    t0 = time.perf_counter()
+    assert holder.get() == {"n": 1}           # stale: served at once...
+    assert time.perf_counter() - t0 < 0.05 and holder.refreshing
+    time.sleep(0.3)
+    assert holder.get() == {"n": 2}           # ...and replaced in the background
+
+    failing = StaleWhileRevalidate(lambda: loads.append(0) or None, ttl=60, retry_after=60)
+    assert failing.get() is None and failing.get() is None
+    assert len(loads) == 3 and failing.last_error is not None  # one attempt, then backing off
+
+    quick = StaleWhileRevalidate(lambda: "full", ttl=0, first_loader=lambda: "quick")
+    assert quick.get() == "quick" and quick.refresh() and quick.value == "full"  # only the first load is quick
+    calls = []
+    flaky = StaleWhileRevalidate(lambda: time.sleep(0.05) or calls.append("full") or "full", ttl=60, retry_after=0,
+                                 first_loader=lambda: calls.append("quick") or None)
+    assert flaky.get() is None and flaky.get() is None  # a failed first load isn't waited on again
+    time.sleep(0.2)
+    assert calls == ["quick", "full"] and flaky.value == "full", calls
+
+    store = RateStore(":memory:")
+    for _ in range(3):
+        store.record_pair("USD", "EUR")
+    store.record_pair("GBP", "JPY")
+    for i in range(5):
+        store.record_pair("AAA", f"Q{i}", capacity=3)
+    assert store.hot_pairs(1) == [("USD", "EUR", 3)]
+    assert len(store.hot_pairs(10)) == 3
+    print("refresher OK:", store.hot_pairs(3))
+
+
+def _downsample_check():
+    rng = np.random.default_rng(7)
+    for years in (1, 5, 20):
+        days = pd.date_range("2000-01-01", periods=365 * years, freq="D")
+        series = pd.Series(1.1 + np.cumsum(rng.normal(0, 0.003, len(days))), index=days)
+        series.iloc[len(series) // 3] += 0.2  # one spike that must survive
+        t0 = time.perf_counter()
+        small = downsample_series(series)
+        took = time.perf_counter() - t0
+        assert len(small) == min(len(series), CHART_POINTS)
+        assert small.index[0] == days[0] and small.index[-1] == days[-1] and small.index.is_monotonic_increasing
+        assert small.max() == series.max()  # the spike
+        assert small.min() - series.min() < 0.01
+        payload = len(small.reset_index().to_json(orient="values", date_format="iso"))
+        print(f"downsample OK: {len(series):,} -> {len(small)} points in {took * 1000:.1f} ms, "
+              f"~{payload / 1024:.0f} KB of chart data")
+
+
+if __name__ == "__main__":
+    for check in (_stub_check, _race_check, _http_check, _timeseries_check, _ledger_check, _refresh_check,
+                  _downsample_check):
+        check()
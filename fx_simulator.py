@@ -0,0 +1,196 @@
+# fx_simulator.py
+# Local stand-in for exchangerate.host and Frankfurter, so the currency app runs (and can be
+# benchmarked) without the internet.
+#
+#   python fx_simulator.py --latency-ms 80 --error-rate 0.05
+#
+# then start the app with the printed FX_API_BASE / FX_FALLBACK_BASE (or put them in .env).
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# EUR-based reference rates; each day moves them along smooth, deterministic curves
+EUR_RATES = {
+    "EUR": 1.0, "USD": 1.09, "GBP": 0.86, "JPY": 161.5, "CHF": 0.95, "AUD": 1.65, "CAD": 1.48,
+    "CNY": 7.85, "INR": 90.6, "SEK": 11.4, "NOK": 11.6, "DKK": 7.46, "PLN": 4.32, "CZK": 25.1,
+    "HUF": 395.0, "NZD": 1.79, "SGD": 1.46, "HKD": 8.5, "KRW": 1460.0, "MXN": 18.7, "BRL": 5.9,
+    "ZAR": 20.1, "TRY": 35.2, "ILS": 4.05, "THB": 39.1, "IDR": 17200.0, "MYR": 5.1, "PHP": 61.8,
+}
+NAMES = {
+    "EUR": "Euro", "USD": "United States Dollar", "GBP": "British Pound", "JPY": "Japanese Yen",
+    "CHF": "Swiss Franc", "AUD": "Australian Dollar", "CAD": "Canadian Dollar", "CNY": "Chinese Yuan",
+    "INR": "Indian Rupee",
+}
+
+
+class FxSimulator:
+    """A threaded HTTP server answering /symbols, /convert, /timeseries, /latest and /{date}.
+
+    Both APIs' parameter names are understood (base/symbols and from/to/amount), so one class
+    plays either provider. latency_ms (+ up to jitter_ms), error_rate and rates can be changed
+    while it runs, e.g. to take a provider down in the middle of a benchmark.
+    """
+
+    def __init__(self, port: int = 0, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 rates: dict = None, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rates = dict(rates or EUR_RATES)
+        self.requests = {}  # endpoint -> count
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FxSimulator":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fx-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = {}
+            self.errors = 0
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    # ---------- rate data ----------
+    def eur_rate(self, code: str, day: date) -> float:
+        i = sorted(self.rates).index(code)
+        t = day.toordinal()
+        return self.rates[code] * (1 + 0.03 * math.sin(t / 45 + i) + 0.01 * math.sin(t / 7 + 2 * i))
+
+    def table(self, day: date, base: str, symbols=None) -> dict:
+        base_rate = self.eur_rate(base, day)
+        codes = symbols or [c for c in self.rates if c != base]
+        return {c: round(self.eur_rate(c, day) / base_rate, 6) for c in codes if c in self.rates}
+
+    # ---------- HTTP ----------
+    def _answer(self, path: str, q: dict):
+        """(status, payload) for one request."""
+        parts = [p for p in path.split("/") if p]
+        endpoint = parts[-1] if parts else ""
+        today = date.today()
+        if endpoint == "symbols":
+            return 200, {"success": True,
+                         "symbols": {c: {"description": NAMES.get(c, c), "code": c} for c in sorted(self.rates)}}
+        if endpoint == "convert":
+            src, dst = q.get("from", "").upper(), q.get("to", "").upper()
+            if src not in self.rates or dst not in self.rates:
+                return 400, {"success": False, "error": "unknown currency"}
+            day = date.fromisoformat(q["date"]) if q.get("date") else today
+            rate = self.table(day, src, [dst])[dst]
+            amount = float(q.get("amount", 1))
+            return 200, {"success": True, "query": {"from": src, "to": dst, "amount": amount},
+                         "info": {"rate": rate}, "date": day.isoformat(), "result": round(amount * rate, 6)}
+        if endpoint == "timeseries":
+            start, end = date.fromisoformat(q["start_date"]), date.fromisoformat(q["end_date"])
+            base = q.get("base", "EUR").upper()
+            symbols = q["symbols"].upper().split(",") if q.get("symbols") else None
+            days = (start + timedelta(days=i) for i in range((min(end, today) - start).days + 1))
+            return 200, {"success": True, "timeseries": True, "base": base, "start_date": start.isoformat(),
+                         "end_date": end.isoformat(),
+                         "rates": {d.isoformat(): self.table(d, base, symbols) for d in days}}
+        if endpoint == "latest" or (len(endpoint) == 10 and endpoint[4] == "-"):
+            day = today if endpoint == "latest" else date.fromisoformat(endpoint)
+            if day > today:
+                return 404, {"message": "not found"}
+            base = (q.get("base") or q.get("from") or "EUR").upper()
+            if base not in self.rates:
+                return 404, {"message": "not found"}
+            wanted = q.get("symbols") or q.get("to")
+            rates = self.table(day, base, wanted.upper().split(",") if wanted else None)
+            amount = float(q.get("amount", 1))  # Frankfurter answers the converted amount
+            return 200, {"success": True, "amount": amount, "base": base, "date": day.isoformat(),
+                         "rates": {c: round(r * amount, 6) for c, r in rates.items()}}
+        return 404, {"message": "not found"}
+
+    def _handler(self):
+        sim = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                with sim._lock:
+                    endpoint = url.path.rstrip("/").split("/")[-1] or "/"
+                    endpoint = "date" if len(endpoint) == 10 and endpoint[4] == "-" else endpoint
+                    sim.requests[endpoint] = sim.requests.get(endpoint, 0) + 1
+                    delay = (sim.latency_ms + sim._rng.uniform(0, sim.jitter_ms)) / 1000
+                    fail = sim._rng.random() < sim.error_rate
+                    if fail:
+                        sim.errors += 1
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    status, payload = 503, {"message": "simulated outage"}
+                else:
+                    try:
+                        status, payload = sim._answer(url.path, q)
+                    except (KeyError, ValueError) as e:
+                        status, payload = 400, {"success": False, "error": str(e)}
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve simulated exchangerate.host and Frankfurter APIs locally.")
+    parser.add_argument("--port", type=int, default=8701, help="primary (exchangerate.host) port")
+    parser.add_argument("--fallback-port", type=int, default=8702, help="fallback (Frankfurter) port")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0, help="share of primary requests answered 503")
+    parser.add_argument("--fallback-error-rate", type=float, default=0)
+    parser.add_argument("--rates", help="JSON file of EUR-based rates, e.g. {\"USD\": 1.09, \"GBP\": 0.86}")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rates = None
+    if args.rates:
+        with open(args.rates) as f:
+            rates = {"EUR": 1.0, **{k.upper(): float(v) for k, v in json.load(f).items()}}
+    primary = FxSimulator(args.port, args.latency_ms, args.jitter_ms, args.error_rate, rates, args.seed).start()
+    fallback = FxSimulator(args.fallback_port, args.latency_ms, args.jitter_ms, args.fallback_error_rate,
+                           rates, args.seed + 1).start()
+    print(f"FX_API_BASE={primary.url}")
+    print(f"FX_FALLBACK_BASE={fallback.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        primary.stop()
+        fallback.stop()
+
+
+if __name__ == "__main__":
+    main()
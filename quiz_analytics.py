@@ -0,0 +1,228 @@
+# quiz_analytics.py
+# Answer analytics for "Day-09 Quiz_app.py": every answer is appended to a CSV event log and
+# folded into per-question counters as it arrives.
+#
+#   python quiz_analytics.py        # self-check and timings
+import csv
+import io
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from quiz_bank import MAX_CHOICES, NO_ANSWER
+
+DATA_DIR = Path("data")
+ANSWERS_FILE = DATA_DIR / "answers.csv"
+ANSWER_COLUMNS = ["ts", "session", "question_id", "pick", "correct", "answer_ms"]
+# answer-time histogram: log-spaced bucket edges from 0.25 s to about 5 min
+TIME_EDGES = np.geomspace(0.25, 300, 40)
+
+
+class QuestionStats:
+    """Running aggregates for one question; each answer is O(1) to add."""
+    __slots__ = ("attempts", "correct", "picks", "times")
+
+    def __init__(self):
+        self.attempts = 0
+        self.correct = 0
+        self.picks = [0] * (MAX_CHOICES + 1)    # last slot: no answer
+        self.times = [0] * (len(TIME_EDGES) + 1)
+
+    def add(self, pick: int, correct: bool, seconds: float):
+        self.attempts += 1
+        self.correct += bool(correct)
+        self.picks[MAX_CHOICES if pick == NO_ANSWER else pick] += 1
+        self.times[int(np.searchsorted(TIME_EDGES, seconds))] += 1
+
+    @property
+    def correct_rate(self) -> float:
+        # smoothed (one right and one wrong answer assumed) so a single answer doesn't read as 0% or 100%
+        return (self.correct + 1) / (self.attempts + 2)
+
+    def median_seconds(self):
+        """Median answer time, read off the histogram (geometric middle of the bucket)."""
+        if not self.attempts:
+            return None
+        half, seen = self.attempts / 2, 0
+        for i, n in enumerate(self.times):
+            seen += n
+            if seen >= half:
+                lo = TIME_EDGES[i - 1] if i else TIME_EDGES[0] / 2
+                hi = TIME_EDGES[i] if i < len(TIME_EDGES) else TIME_EDGES[-1] * 2
+                return float(math.sqrt(lo * hi))
+
+
+class AnswerAnalytics:
+    """Per-question statistics over an append-only answer log.
+
+    Same scheme as quiz_scores.Leaderboard: one O_APPEND write per answer, and the log is
+    folded in from the last offset seen, so the aggregates are built once at startup and
+    answers from other processes are picked up on the next call; an unchanged log costs one
+    stat, and one that shrank or was replaced is folded in again from the start. Safe to
+    share between Streamlit sessions.
+    """
+
+    def __init__(self, path=ANSWERS_FILE):
+        self.path = Path(path)
+        self._inode = None
+        self._reset()
+        self._lock = threading.Lock()
+        with self._lock:
+            self._catch_up()
+
+    def _reset(self):
+        # caller holds the lock (or is __init__)
+        self.events = 0
+        self.stats = {}  # question id -> QuestionStats
+        self._offset = 0
+
+    def _catch_up(self):
+        # caller holds the lock; folds in whole lines appended since the last call
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # first read, or the log was truncated or swapped for another file: rebuild from it
+            self._inode = st.st_ino
+            self._reset()
+        if st.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        if not end:
+            return
+        self._offset += end
+        for rec in csv.reader(io.StringIO(chunk[:end].decode("utf-8"))):
+            if len(rec) != len(ANSWER_COLUMNS) or rec[0] == "ts":
+                continue
+            try:
+                qid, pick, correct, ms = int(rec[2]), int(rec[3]), rec[4] == "1", int(rec[5])
+            except ValueError:
+                continue
+            stats = self.stats.get(qid)
+            if stats is None:
+                stats = self.stats[qid] = QuestionStats()
+            stats.add(pick, correct, ms / 1000)
+            self.events += 1
+
+    def record(self, session: str, question_id: int, pick: int, correct: bool, seconds: float):
+        """Log one answer (pick is the choice position in the bank, or NO_ANSWER)."""
+        line = f"{time.time():.3f},{session},{int(question_id)},{int(pick)},{int(bool(correct))},{int(seconds * 1000)}\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size == 0:
+                    line = ",".join(ANSWER_COLUMNS) + "\n" + line
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+            self._catch_up()
+
+    def question(self, question_id: int):
+        with self._lock:
+            self._catch_up()
+            return self.stats.get(int(question_id))
+
+    def correct_rates(self, ids, prior: float = 0.5) -> np.ndarray:
+        """Smoothed correct rate per id; `prior` for questions nobody has answered yet."""
+        with self._lock:
+            self._catch_up()
+            return np.array([self.stats[i].correct_rate if i in self.stats else prior for i in map(int, ids)])
+
+    def table(self, bank, limit: int = 500) -> list:
+        """Rows for the analytics page, most answered questions first."""
+        with self._lock:
+            self._catch_up()
+            top = sorted(self.stats.items(), key=lambda kv: kv[1].attempts, reverse=True)[:limit]
+        rows = []
+        for qid, s in top:
+            try:
+                (q,) = bank.get([qid])
+            except KeyError:
+                continue  # since removed from the bank
+            wrong = [(n, q.choices[j]) for j, n in enumerate(s.picks[:len(q.choices)]) if q.choices[j] != q.answer]
+            n, distractor = max(wrong) if wrong else (0, None)
+            rows.append({"question": q.question, "topic": q.topic, "difficulty": q.difficulty,
+                         "attempts": s.attempts, "correct_rate": s.correct / s.attempts,
+                         "median_time_s": s.median_seconds(),
+                         "top_distractor": distractor if n else None,
+                         "distractor_share": n / s.attempts, "no_answer_share": s.picks[MAX_CHOICES] / s.attempts})
+        return rows
+
+
+def pick_by_success_rate(analytics: AnswerAnalytics, candidates, k: int, target: float = 0.7, width: float = 0.15,
+                         rng=None) -> np.ndarray:
+    """k of the candidate ids, favouring questions whose live correct rate is near `target`."""
+    rng = rng or np.random.default_rng()
+    candidates = np.asarray(candidates)
+    if len(candidates) <= k:
+        return candidates
+    rates = analytics.correct_rates(candidates)
+    weights = np.exp(-((rates - target) / width) ** 2) + 1e-6  # never rule a question out entirely
+    return rng.choice(candidates, size=k, replace=False, p=weights / weights.sum())
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+# ---------------------------
+# Self-check
+# ---------------------------
+def _check(n_events: int = 50_000, n_questions: int = 500):
+    rng = np.random.default_rng(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "answers.csv"
+        analytics = AnswerAnalytics(path)
+        true_rate = rng.uniform(0.1, 0.95, n_questions)
+        qids = rng.integers(0, n_questions, n_events)
+        times = rng.lognormal(2.0, 0.5, n_events)
+        t0 = time.perf_counter()
+        for qid, secs in zip(qids, times):
+            correct = rng.random() < true_rate[qid]
+            pick = 0 if correct else int(rng.choice([1, 2, 3, NO_ANSWER], p=[0.6, 0.2, 0.1, 0.1]))
+            analytics.record("s1", int(qid), pick, correct, float(secs))
+        per_event = (time.perf_counter() - t0) / n_events
+
+        s = analytics.question(int(qids[0]))
+        mask = qids == qids[0]
+        assert s.attempts == int(mask.sum())
+        exact = float(np.median(times[mask]))
+        assert abs(s.median_seconds() - exact) / exact < 0.15, (s.median_seconds(), exact)
+        assert s.picks[1] >= s.picks[2] >= s.picks[3]
+        rates = analytics.correct_rates(range(n_questions))
+        assert np.corrcoef(rates, true_rate)[0, 1] > 0.9
+
+        # restart: the same aggregates come back from the log
+        t0 = time.perf_counter()
+        again = AnswerAnalytics(path)
+        rebuild = time.perf_counter() - t0
+        assert again.events == n_events and again.question(int(qids[0])).picks == s.picks
+
+        chosen = pick_by_success_rate(analytics, np.arange(n_questions), 20, target=0.7, rng=rng)
+        assert len(set(chosen.tolist())) == 20 and abs(true_rate[chosen].mean() - 0.7) < 0.1
+
+        # a log cut short, then one replaced by another file, is folded in again from the start
+        header, first, *_ = path.read_bytes().splitlines(keepends=True)
+        path.write_bytes(header + first)
+        assert again.question(int(qids[0])).attempts == 1 and again.events == 1
+        fresh = Path(tmp) / "fresh.csv"
+        AnswerAnalytics(fresh).record("s2", 7, 2, False, 3.0)
+        os.replace(fresh, path)
+        assert again.question(int(qids[0])) is None and again.question(7).picks[2] == 1 and again.events == 1
+    print(f"analytics OK: {per_event * 1e6:.0f} µs per answer (incl. the log write), "
+          f"rebuild from {n_events:,} events {rebuild * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    _check()
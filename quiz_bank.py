@@ -0,0 +1,433 @@
+# quiz_bank.py
+# Question storage for "Day-09 Quiz_app.py": an SQLite bank that can hold millions of questions,
+# sampled by topic and difficulty without reading question bodies until they are shown.
+#
+#   python quiz_bank.py                       # self-check
+#   python quiz_bank.py --import bank.jsonl   # one JSON question per line
+#   python quiz_bank.py --bench 1000000       # sampling latency on a synthetic bank
+import argparse
+import hashlib
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+DATA_DIR = Path("data")
+BANK_DB = DATA_DIR / "question_bank.sqlite"
+DIFFICULTIES = {1: "Easy", 2: "Medium", 3: "Hard"}
+MAX_CHOICES = 8
+UNANSWERED, NO_ANSWER = -2, -1  # entries of a quiz's `picks` besides a choice position
+
+
+class Question(NamedTuple):
+    """One question as stored; immutable, so sessions can share it."""
+    id: int
+    topic: str
+    difficulty: int
+    question: str
+    choices: tuple
+    answer: str
+    explain: str
+
+
+def question_key(topic: str, text: str) -> str:
+    """Stable identity of a question, so re-importing a bank keeps ids of unchanged questions."""
+    return hashlib.sha1(f"{topic}\n{text}".encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """Questions in SQLite, with the ids of each (topic, difficulty) group held in numpy arrays.
+
+    Sampling only touches the id arrays; bodies are read for the sampled ids and kept in a
+    small LRU. Any write to the file, from this process or another, is noticed through
+    PRAGMA data_version and drops the in-memory index, so edits show up on the next sample.
+    Safe to share between Streamlit sessions: one connection, one lock.
+    """
+
+    def __init__(self, path=BANK_DB, body_cache: int = 4096):
+        path = Path(path)
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._groups = None     # (topic, difficulty) -> question count
+        self._ids = {}          # (topic, difficulty) -> np.ndarray of ids, loaded on first sample
+        self._bodies = OrderedDict()
+        self._body_cache = body_cache
+        self._data_version = None
+        self.reloads = 0
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                " id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, topic TEXT NOT NULL,"
+                " difficulty INTEGER NOT NULL, body TEXT NOT NULL)"
+            )
+            # covering index for the id lists (the rowid rides along)
+            self._db.execute("CREATE INDEX IF NOT EXISTS questions_by_group ON questions (topic, difficulty)")
+
+    # ---------- writes ----------
+    def add_many(self, rows, topic: str = None) -> int:
+        """Insert or update questions given as dicts ('question', 'choices', 'answer', optional 'explain',
+        'topic', 'difficulty'). Returns how many rows were written."""
+        records = []
+        for r in rows:
+            t = r.get("topic") or topic or "General"
+            choices = list(r["choices"])
+            if r["answer"] not in choices:
+                raise ValueError(f"answer {r['answer']!r} is not one of the choices of {r['question']!r}")
+            body = json.dumps({"question": r["question"], "choices": choices, "answer": r["answer"],
+                               "explain": r.get("explain", "")}, ensure_ascii=False)
+            records.append((question_key(t, r["question"]), t, int(r.get("difficulty", 2)), body))
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO questions (key, topic, difficulty, body) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET difficulty = excluded.difficulty, body = excluded.body"
+                " WHERE difficulty != excluded.difficulty OR body != excluded.body",
+                records,
+            )
+            self._forget()
+        return len(records)
+
+    def sync_topic(self, topic: str, rows) -> int:
+        """Make `topic` hold exactly `rows` (unchanged questions keep their ids)."""
+        rows = list(rows)
+        keep = {question_key(topic, r["question"]) for r in rows}
+        with self._lock:
+            stored = {k for (k,) in self._db.execute("SELECT key FROM questions WHERE topic = ?", (topic,))}
+        gone = stored - keep
+        if gone:
+            with self._lock, self._db:
+                self._db.executemany("DELETE FROM questions WHERE key = ?", ((k,) for k in gone))
+                self._forget()
+        return self.add_many(rows, topic)
+
+    def import_jsonl(self, path, topic: str = None, batch: int = 10_000) -> int:
+        """Stream a JSONL file (one question object per line) into the bank."""
+        n, rows = 0, []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    rows.append(json.loads(line))
+                if len(rows) >= batch:
+                    n += self.add_many(rows, topic)
+                    rows = []
+        return n + (self.add_many(rows, topic) if rows else 0)
+
+    # ---------- index ----------
+    def _forget(self):
+        # caller holds the lock
+        self._groups = None
+        self._ids = {}
+        self._bodies.clear()
+        self._data_version = None
+
+    def _check_reload(self):
+        # caller holds the lock; data_version changes when another connection commits
+        (version,) = self._db.execute("PRAGMA data_version").fetchone()
+        if self._data_version is not None and version != self._data_version:
+            self._forget()
+            self.reloads += 1
+        self._data_version = version
+        if self._groups is None:
+            self._groups = {(t, d): n for t, d, n in self._db.execute(
+                "SELECT topic, difficulty, COUNT(*) FROM questions GROUP BY topic, difficulty")}
+
+    def _group_ids(self, group) -> np.ndarray:
+        ids = self._ids.get(group)
+        if ids is None:
+            cur = self._db.execute("SELECT id FROM questions WHERE topic = ? AND difficulty = ? ORDER BY id", group)
+            ids = np.fromiter((i for (i,) in cur), dtype=np.int64, count=self._groups[group])
+            self._ids[group] = ids
+        return ids
+
+    def groups(self) -> dict:
+        """{(topic, difficulty): number of questions}."""
+        with self._lock:
+            self._check_reload()
+            return dict(self._groups)
+
+    def topics(self) -> dict:
+        counts = {}
+        for (t, _), n in self.groups().items():
+            counts[t] = counts.get(t, 0) + n
+        return dict(sorted(counts.items()))
+
+    def count(self, topics=None, difficulties=None) -> int:
+        return sum(n for (t, d), n in self.groups().items()
+                   if (not topics or t in topics) and (not difficulties or d in difficulties))
+
+    # ---------- reads ----------
+    def sample_ids(self, k: int, topics=None, difficulties=None, rng=None) -> np.ndarray:
+        """k distinct random question ids (fewer if the filter matches fewer), in random order."""
+        rng = rng or np.random.default_rng()
+        with self._lock:
+            self._check_reload()
+            groups = [g for g in sorted(self._groups)
+                      if (not topics or g[0] in topics) and (not difficulties or g[1] in difficulties)]
+            sizes = np.array([self._groups[g] for g in groups], dtype=np.int64)
+            total = int(sizes.sum())
+            k = min(k, total)
+            if k == 0:
+                return np.empty(0, dtype=np.int64)
+            # distinct ranks in [0, total) without materialising a permutation of the bank
+            ranks = np.unique(rng.integers(0, total, size=k))
+            while len(ranks) < k:
+                ranks = np.unique(np.concatenate([ranks, rng.integers(0, total, size=k - len(ranks))]))
+            rng.shuffle(ranks)
+            starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            which = np.searchsorted(starts, ranks, side="right") - 1
+            out = np.empty(k, dtype=np.int64)
+            for g in np.unique(which):
+                mask = which == g
+                out[mask] = self._group_ids(groups[g])[ranks[mask] - starts[g]]
+            return out
+
+    def get(self, ids) -> list:
+        """Questions for `ids`, in the same order; bodies come from the LRU or one query."""
+        ids = [int(i) for i in ids]
+        with self._lock:
+            self._check_reload()
+            missing = [i for i in ids if i not in self._bodies]
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT id, topic, difficulty, body FROM questions WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for i, topic, difficulty, body in rows:
+                    b = json.loads(body)
+                    self._bodies[i] = Question(i, topic, difficulty, b["question"], tuple(b["choices"]),
+                                               b["answer"], b.get("explain", ""))
+            out = []
+            for i in ids:
+                q = self._bodies.get(i)
+                if q is None:
+                    raise KeyError(f"question {i} is no longer in the bank")
+                self._bodies.move_to_end(i)
+                out.append(q)
+            while len(self._bodies) > self._body_cache:
+                self._bodies.popitem(last=False)
+            return out
+
+    def sample(self, k: int, topics=None, difficulties=None, rng=None) -> list:
+        return self.get(self.sample_ids(k, topics, difficulties, rng))
+
+
+# ---------------------------
+# Per-session quiz state
+# ---------------------------
+# A session holds only numbers: the question ids, one row of choice positions per question and
+# one pick per question. Everything else is read from the shared, immutable bank.
+def new_quiz(bank: QuestionBank, k: int, topics=None, difficulties=None, rng=None, choose=None,
+             oversample: int = 20):
+    """(ids, perms, picks) for a fresh quiz: perms[i] lists question i's choice positions in display
+    order (padded with -1), picks[i] is the chosen position, UNANSWERED or NO_ANSWER.
+
+    With choose(candidate_ids, k, rng) -> ids, k questions are chosen from k * oversample random ones.
+    """
+    rng = rng or np.random.default_rng()
+    if choose is None:
+        ids = bank.sample_ids(k, topics, difficulties, rng)
+    else:
+        ids = np.asarray(choose(bank.sample_ids(k * oversample, topics, difficulties, rng), k, rng))
+    perms = np.full((len(ids), MAX_CHOICES), -1, dtype=np.int8)
+    for row, q in zip(perms, bank.get(ids)):
+        n = len(q.choices)
+        if n > MAX_CHOICES:
+            raise ValueError(f"question {q.id} has {n} choices, at most {MAX_CHOICES} are supported")
+        row[:n] = rng.permutation(n)
+    picks = np.full(len(ids), UNANSWERED, dtype=np.int8)
+    return ids, perms, picks
+
+
+# An edit keeps a question's id but may change its choices, so a session's perms and picks can
+# stop matching the bank; that is reported as KeyError, like a question that was removed.
+def displayed_choices(q: Question, perm_row: np.ndarray) -> list:
+    """q's choices in this session's order; KeyError if q now has a different number of choices."""
+    order = perm_row[perm_row >= 0]
+    if len(order) != len(q.choices):
+        raise KeyError(f"question {q.id} was edited since the quiz started")
+    return [q.choices[j] for j in order]
+
+
+def record_pick(q: Question, picks: np.ndarray, i: int, choice) -> bool:
+    """Store the answer to question i (a choice text, or None for no answer); True when correct.
+
+    KeyError if `choice` is no longer one of q's choices.
+    """
+    if choice is not None and choice not in q.choices:
+        raise KeyError(f"question {q.id} was edited since the quiz started")
+    picks[i] = NO_ANSWER if choice is None else q.choices.index(choice)
+    return choice == q.answer
+
+
+def quiz_review(bank: QuestionBank, ids, picks) -> list:
+    """One dict per answered question, like the review screen shows."""
+    out = []
+    for q, pick in zip(bank.get(ids), picks):
+        if pick == UNANSWERED:
+            break
+        if pick >= len(q.choices):
+            raise KeyError(f"question {q.id} was edited since the quiz started")
+        selected = "(No answer)" if pick == NO_ANSWER else q.choices[pick]
+        out.append({"question": q.question, "selected": selected, "correct": selected == q.answer,
+                    "correct_answer": q.answer, "explain": q.explain})
+    return out
+
+
+# ---------------------------
+# Self-check and benchmark
+# ---------------------------
+def make_synthetic_rows(n: int, topics: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    topic_of = rng.integers(0, topics, size=n)
+    difficulty_of = rng.integers(1, 4, size=n)
+    for i in range(n):
+        yield {"topic": f"Topic {topic_of[i]:02d}", "difficulty": int(difficulty_of[i]),
+               "question": f"Synthetic question #{i}?", "choices": ["A", "B", "C", "D"],
+               "answer": "ABCD"[i % 4], "explain": f"Because #{i}."}
+
+
+def _check():
+    bank = QuestionBank(":memory:")
+    bank.add_many(make_synthetic_rows(2_000, topics=4))
+    assert bank.count() == 2_000 and len(bank.topics()) == 4
+    rng = np.random.default_rng(1)
+    ids = bank.sample_ids(50, topics={"Topic 01"}, difficulties={3}, rng=rng)
+    assert len(set(ids.tolist())) == 50
+    qs = bank.get(ids)
+    assert all(q.topic == "Topic 01" and q.difficulty == 3 for q in qs)
+    assert [q.id for q in qs] == ids.tolist()
+    assert len(bank.sample_ids(10_000, topics={"Topic 02"})) == bank.count(topics={"Topic 02"})
+
+    # sync keeps unchanged ids and drops removed questions
+    rows = [{"question": f"Q{i}", "choices": ["x", "y"], "answer": "x"} for i in range(5)]
+    bank.sync_topic("Mini", rows)
+    before = {q.question: q.id for q in bank.sample(5, topics={"Mini"})}
+    bank.sync_topic("Mini", rows[1:] + [{"question": "Q9", "choices": ["x", "y"], "answer": "y"}])
+    after = {q.question: q.id for q in bank.sample(5, topics={"Mini"})}
+    assert "Q0" not in after and after["Q3"] == before["Q3"]
+
+    # an edit keeps the id but may change the choices; a quiz started before it gets KeyError
+    ids, perms, picks = new_quiz(bank, 2, topics={"Mini"}, rng=np.random.default_rng(2))
+    record_pick(bank.get(ids[:1])[0], picks, 0, "y")
+    edited = {q.question for q in bank.get(ids)}
+    bank.add_many([{"question": text, "choices": ["x"], "answer": "x"} for text in edited], topic="Mini")
+    assert bank.get(ids)[0].id == ids[0] and bank.get(ids)[0].choices == ("x",)
+    for stale in (lambda: displayed_choices(bank.get(ids)[1], perms[1]),
+                  lambda: record_pick(bank.get(ids)[1], picks, 1, "y"),
+                  lambda: quiz_review(bank, ids, picks)):
+        try:
+            stale()
+            raise AssertionError("a stale quiz was accepted")
+        except KeyError:
+            pass
+
+    # hot reload: a write from another connection is seen on the next sample
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bank.sqlite"
+        reader, writer = QuestionBank(path), QuestionBank(path)
+        writer.add_many(rows, topic="Live")
+        assert reader.count(topics={"Live"}) == 5
+        writer.add_many([{"question": "Fresh?", "choices": ["a", "b"], "answer": "a"}], topic="Live")
+        assert reader.count(topics={"Live"}) == 6 and reader.reloads == 1
+        reader._db.close()
+        writer._db.close()
+    print("question bank OK")
+    _sessions_check()
+
+
+def _sessions_check(n_sessions: int = 500, k: int = 10):
+    # many sessions on threads against one bank: nobody sees another's choice order or answers
+    import pickle
+    from concurrent.futures import ThreadPoolExecutor
+
+    bank = QuestionBank(":memory:")
+    bank.add_many(make_synthetic_rows(200, topics=2))
+    snapshot = {q.id: q for q in bank.sample(200)}
+
+    def play(seed):
+        rng = np.random.default_rng(seed)
+        ids, perms, picks = new_quiz(bank, k, rng=rng)
+        seen = [displayed_choices(q, perms[i]) for i, q in enumerate(bank.get(ids))]
+        for i, q in enumerate(bank.get(ids)):
+            time.sleep(0)  # let the other sessions interleave
+            assert displayed_choices(q, perms[i]) == seen[i]
+            record_pick(q, picks, i, seen[i][int(rng.integers(len(seen[i])))])
+        review = quiz_review(bank, ids, picks)
+        assert [r["selected"] for r in review] == [q.choices[p] for q, p in zip(bank.get(ids), picks)]
+        return seed, (ids, perms, picks), seen
+
+    with ThreadPoolExecutor(max_workers=32) as ex:
+        results = list(ex.map(play, range(n_sessions)))
+    for seed, (ids, perms, _), seen in results:
+        assert [displayed_choices(q, perms[i]) for i, q in enumerate(bank.get(ids))] == seen
+    assert {q.id: q for q in bank.sample(200)} == snapshot  # the bank is untouched
+    distinct_orders = len({tuple(map(tuple, seen)) for _, _, seen in results})
+
+    ids, perms, picks = results[0][1]
+    compact = len(pickle.dumps((ids, perms, picks)))
+    raw = ids.nbytes + perms.nbytes + picks.nbytes
+    # the old layout: copied question dicts with a shuffled choice list, plus the answer dicts
+    old = [dict(q._asdict(), _shuffled_choices=list(q.choices)) for q in bank.get(ids)]
+    old_bytes = len(pickle.dumps((old, quiz_review(bank, ids, picks))))
+    print(f"sessions OK: {n_sessions} concurrent sessions isolated ({distinct_orders} distinct quizzes); "
+          f"state per {k}-question session: {raw} B of arrays, {compact} B pickled "
+          f"(copied question dicts: {old_bytes:,} B)")
+
+
+def bench(n: int, k: int = 15, runs: int = 200):
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = QuestionBank(Path(tmp) / "bank.sqlite")
+        t0 = time.perf_counter()
+        rows, batch = make_synthetic_rows(n), []
+        for r in rows:
+            batch.append(r)
+            if len(batch) == 50_000:
+                bank.add_many(batch)
+                batch = []
+        if batch:
+            bank.add_many(batch)
+        print(f"built {n:,} questions in {time.perf_counter() - t0:.1f} s")
+
+        bank = QuestionBank(Path(tmp) / "bank.sqlite")  # cold process
+        rng = np.random.default_rng(0)
+        for label, topics, difficulties in (("one topic, one difficulty", {"Topic 03"}, {2}),
+                                            ("one topic", {"Topic 03"}, None),
+                                            ("whole bank", None, None)):
+            t0 = time.perf_counter()
+            bank.sample(k, topics, difficulties, rng)
+            cold = time.perf_counter() - t0
+            samples = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                bank.sample(k, topics, difficulties, rng)
+                samples.append(time.perf_counter() - t0)
+            ms = np.array(samples) * 1000
+            print(f"{label:>26}: first sample {cold * 1000:7.1f} ms (loads the id index), "
+                  f"then p50 {np.percentile(ms, 50):.2f} ms, p99 {np.percentile(ms, 99):.2f} ms "
+                  f"for {k} questions")
+        index_mb = sum(a.nbytes for a in bank._ids.values()) / 1e6
+        print(f"id index in memory: {index_mb:.1f} MB; question bodies cached: {len(bank._bodies):,}")
+        bank._db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quiz question bank tools.")
+    parser.add_argument("--import", dest="import_path", help="JSONL file of questions to add")
+    parser.add_argument("--topic", help="topic for imported questions without one")
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark sampling on N synthetic questions")
+    args = parser.parse_args()
+    if args.import_path:
+        print(f"imported {QuestionBank().import_jsonl(args.import_path, args.topic):,} questions into {BANK_DB}")
+    elif args.bench:
+        bench(args.bench)
+    else:
+        _check()
@@ -0,0 +1,207 @@
+# quiz_load.py
+# Load test for "Day-09 Quiz_app.py": N simulated players, each a Streamlit AppTest session, play
+# start -> answer every question -> save score, and the run is summarised as a JSON report.
+#
+# AppTest sessions can't run on parallel threads, so players are spread over worker processes.
+# Inside a worker its players' sessions are all open at once and take turns rerun by rerun,
+# sharing st.cache_resource objects like sessions on one server; the workers run in parallel
+# against the same data/ files (bank, scores.csv, answers.csv).
+#
+#   python quiz_load.py --players 200 --workers 8 --questions 8 --json quiz_load_report.json
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from quiz_bank import QuestionBank, make_synthetic_rows
+
+APP = Path(__file__).resolve().parent / "Day-09 Quiz_app.py"
+SESSION_KEYS = ["quiz_ids", "choice_perms", "picks", "current_index", "score", "start_time", "timed_mode",
+                "time_per_question", "deadline", "shown_at", "session_id"]
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"n": 0}
+    ms = np.array(samples) * 1000
+    return {"n": len(ms), "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1), "p99_ms": round(float(np.percentile(ms, 99)), 1),
+            "max_ms": round(float(ms.max()), 1)}
+
+
+def rss_mb() -> float:
+    # peak resident size; ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+
+
+class Player:
+    """One simulated student: an AppTest session plus the timings of each rerun it triggers."""
+
+    def __init__(self, n: int, questions: int, timed: bool, seed: int):
+        self.name = f"player{n:04d}"
+        self.questions = questions
+        self.timed = timed
+        self.rng = np.random.default_rng(seed)
+        self.timings = {"load": [], "start": [], "answer": [], "save": []}
+        self.state_bytes = None
+        self.error = None
+
+    def _run(self, action: str, fn):
+        t0 = time.perf_counter()
+        fn()
+        self.timings[action].append(time.perf_counter() - t0)
+        if self.at.exception:
+            raise RuntimeError(f"{action}: {self.at.exception[0].message}")
+
+    def _button(self, text: str):
+        return next(b for b in self.at.button if text in b.label)
+
+    def play(self):
+        """Generator: one rerun per step, so a scheduler can interleave many players."""
+        try:
+            self.at = AppTest.from_file(str(APP), default_timeout=300)
+            self._run("load", self.at.run)
+            yield
+            if self.timed:
+                next(c for c in self.at.checkbox if c.label.startswith("Timed")).check()
+            next(s for s in self.at.slider if s.label == "Number of questions").set_value(self.questions)
+            self._run("start", lambda: self._button("Start New Quiz").click().run())
+            yield
+            for _ in range(self.questions):
+                choice = next(r for r in self.at.radio if r.label == "Choose one option:")
+                choice.set_value(choice.options[int(self.rng.integers(len(choice.options)))])
+                self._run("answer", lambda: self._button("Submit Answer").click().run())
+                yield
+            self.state_bytes = len(pickle.dumps({k: self.at.session_state[k] for k in SESSION_KEYS
+                                                 if k in self.at.session_state}))
+            self.at.text_input[0].input(self.name)
+            self._run("save", lambda: self._button("Save Score").click().run())
+        except Exception as e:
+            self.error = f"{self.name}: {e}"
+        finally:
+            self.at = None  # let the session go, as a closed browser tab would
+
+
+def run_worker(workdir: str, first: int, count: int, questions: int, timed: bool) -> dict:
+    """Play `count` players in this process, all sessions open at once, taking turns per rerun."""
+    os.chdir(workdir)
+    sys.path.insert(0, str(APP.parent))
+    roster = [Player(i, questions, timed, seed=i) for i in range(first, first + count)]
+    rss_before = rss_mb()
+    cpu0 = time.process_time()
+    active = [p.play() for p in roster]
+    while active:
+        still = []
+        for steps in active:
+            try:
+                next(steps)
+                still.append(steps)
+            except StopIteration:
+                pass
+        active = still
+    return {"timings": {k: [t for p in roster for t in p.timings[k]] for k in roster[0].timings},
+            "errors": [p.error for p in roster if p.error],
+            "state_bytes": [p.state_bytes for p in roster if p.state_bytes],
+            "names": [p.name for p in roster], "cpu_s": time.process_time() - cpu0,
+            "rss_growth_mb": rss_mb() - rss_before, "peak_rss_mb": rss_mb()}
+
+
+def check_scores_file(path: Path, names: set) -> dict:
+    """Every save must be one whole, parseable line."""
+    if not path.exists():
+        return {"lines": 0, "saved_players": 0, "damaged_lines": 0}
+    lines = path.read_text(encoding="utf-8").splitlines()
+    damaged, saved = 0, set()
+    for rec in csv.reader(lines[1:]):
+        if len(rec) != 5 or not rec[1].isdigit():
+            damaged += 1
+        elif rec[0] in names:
+            saved.add(rec[0])
+    return {"lines": len(lines) - 1, "saved_players": len(saved), "damaged_lines": damaged}
+
+
+def run(players: int, workers: int, questions: int, timed: bool, bank_size: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="quiz-load-")
+    if bank_size:
+        QuestionBank(Path(workdir) / "data" / "question_bank.sqlite").add_many(
+            make_synthetic_rows(bank_size, topics=1), topic="Nature & Curiosity")
+
+    workers = max(1, min(workers, players))
+    shares = [players // workers + (w < players % workers) for w in range(workers)]
+    firsts = np.concatenate([[0], np.cumsum(shares)[:-1]]).tolist()
+    wall0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        parts = list(ex.map(run_worker, [workdir] * workers, firsts, shares, [questions] * workers,
+                            [timed] * workers))
+    wall = time.perf_counter() - wall0
+
+    all_timings = {k: [t for part in parts for t in part["timings"][k]] for k in parts[0]["timings"]}
+    reruns = [t for ts in all_timings.values() for t in ts]
+    errors = [e for part in parts for e in part["errors"]]
+    state_sizes = [b for part in parts for b in part["state_bytes"]]
+    cpu = sum(part["cpu_s"] for part in parts)
+    rss_growth = sum(part["rss_growth_mb"] for part in parts)
+    names = {n for part in parts for n in part["names"]}
+    return {
+        "when": datetime.now().isoformat(timespec="seconds"),
+        "config": {"players": players, "workers": workers, "players_per_worker": max(shares),
+                   "questions": questions, "timed": timed, "bank_size": bank_size or "built-in"},
+        "completed_players": players - len(errors),
+        "errors": errors[:20],
+        "wall_s": round(wall, 2),
+        "reruns": len(reruns),
+        "reruns_per_s": round(len(reruns) / wall, 1),
+        "rerun_latency": percentiles(reruns),
+        "latency_by_action": {k: percentiles(v) for k, v in all_timings.items()},
+        "cpu_s_total": round(cpu, 2),
+        "cpu_ms_per_session": round(cpu / players * 1000, 1),
+        "cpu_ms_per_rerun": round(cpu / max(1, len(reruns)) * 1000, 2),
+        "peak_rss_mb_per_worker": round(max(part["peak_rss_mb"] for part in parts), 1),
+        "rss_growth_kb_per_session": round(rss_growth * 1024 / players, 1),
+        "session_state_bytes": {"median": int(np.median(state_sizes)) if state_sizes else None,
+                                "max": max(state_sizes) if state_sizes else None},
+        "scores_file": {**check_scores_file(Path(workdir) / "data" / "scores.csv", names),
+                        "save_latency": percentiles(all_timings["save"])},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-player load test for the quiz app.")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="worker processes")
+    parser.add_argument("--questions", type=int, default=8)
+    parser.add_argument("--timed", action="store_true", help="play in timed mode")
+    parser.add_argument("--bank", type=int, default=0, help="play against a synthetic bank of N questions")
+    parser.add_argument("--json", default="quiz_load_report.json", help="where to write the report")
+    args = parser.parse_args()
+
+    out = Path(args.json).resolve()
+    report = run(args.players, args.workers, args.questions, args.timed, args.bank)
+    out.write_text(json.dumps(report, indent=2))
+    lat = report["rerun_latency"]
+    print(f"{report['completed_players']}/{args.players} players finished in {report['wall_s']} s; "
+          f"rerun p50 {lat.get('p50_ms')} ms, p95 {lat.get('p95_ms')} ms, p99 {lat.get('p99_ms')} ms; "
+          f"{report['cpu_ms_per_session']} ms CPU and ~{report['rss_growth_kb_per_session']} KB RSS per session; "
+          f"scores file: {report['scores_file']['saved_players']} saves, "
+          f"{report['scores_file']['damaged_lines']} damaged lines")
+    for err in report["errors"][:5]:
+        print("  error:", err)
+    print(f"report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
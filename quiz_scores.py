@@ -0,0 +1,194 @@
+# quiz_scores.py
+# High scores for "Day-09 Quiz_app.py": an append-only CSV log plus top-K boards kept in memory.
+#
+#   python quiz_scores.py        # self-check and timings
+import csv
+import heapq
+import io
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+DATA_DIR = Path("data")
+SCORES_FILE = DATA_DIR / "scores.csv"
+SCORE_COLUMNS = ["name", "score", "total", "date", "time_taken_s"]
+PERIODS = {"day": "Today", "week": "This week", "all": "All time"}
+
+
+def period_key(period: str, when: str) -> str:
+    """Which board of `period` a score dated `when` ("YYYY-MM-DD HH:MM:SS") belongs to."""
+    if period == "day":
+        return when[:10]
+    if period == "week":
+        year, week, _ = date.fromisoformat(when[:10]).isocalendar()
+        return f"{year}-W{week:02d}"
+    return "all"
+
+
+class Leaderboard:
+    """Top-K boards for today, this week and all time over an append-only score log.
+
+    Each board is a K-entry min-heap, so a new score costs O(log K). Rows are read from the
+    log once, from the last offset seen, so scores appended by other processes are picked
+    up on the next call and nothing is ever re-sorted or re-read; an unchanged file costs one
+    stat. A log that shrank or was replaced is read again from the start. Day and week boards
+    reset when the period rolls over. Safe to share between Streamlit sessions.
+    """
+
+    def __init__(self, path=SCORES_FILE, k: int = 10):
+        self.path = Path(path)
+        self.k = k
+        self._inode = None
+        self._reset()
+        self._lock = threading.Lock()
+        with self._lock:
+            self._catch_up()
+
+    def _reset(self):
+        # caller holds the lock (or is __init__)
+        self.rows_seen = 0
+        self._offset = 0
+        self._seq = 0
+        self._boards = {p: (None, []) for p in PERIODS}  # period -> (period key, heap)
+
+    def _offer(self, row: dict):
+        # caller holds the lock
+        entry = (row["score"], row["date"], self._seq, row)
+        self._seq += 1
+        for period in PERIODS:
+            key, heap = self._boards[period]
+            row_key = period_key(period, row["date"])
+            if row_key != key:
+                if key is not None and row_key < key:
+                    continue  # an older period: not on the current board
+                key, heap = row_key, []
+                self._boards[period] = (key, heap)
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    def _catch_up(self):
+        # caller holds the lock; reads whole lines appended since the last call
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # first read, or the log was truncated or swapped for another file: rebuild from it
+            self._inode = st.st_ino
+            self._reset()
+        if st.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1  # a line still being written is left for next time
+        if not end:
+            return
+        records = csv.reader(io.StringIO(chunk[:end].decode("utf-8")))
+        if self._offset == 0:
+            next(records, None)  # the header; a player may well be called "name"
+        self._offset += end
+        for rec in records:
+            if len(rec) != len(SCORE_COLUMNS):
+                continue
+            try:
+                row = {"name": rec[0], "score": int(rec[1]), "total": int(rec[2]), "date": rec[3],
+                       "time_taken_s": int(float(rec[4]))}
+                period_key("week", row["date"])
+            except ValueError:
+                continue  # a damaged line does not take the board down
+            self.rows_seen += 1
+            self._offer(row)
+
+    def add(self, name: str, score: int, total: int, time_taken_s: int, when: datetime = None) -> dict:
+        """Append a score to the log and the boards."""
+        row = {"name": name, "score": int(score), "total": int(total),
+               "date": (when or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"), "time_taken_s": int(time_taken_s)}
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self.path.exists() or self.path.stat().st_size == 0:
+                writer.writerow(SCORE_COLUMNS)
+            writer.writerow([row[c] for c in SCORE_COLUMNS])
+            # one O_APPEND write per score, so concurrent writers never interleave inside a line
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, buf.getvalue().encode("utf-8"))
+            finally:
+                os.close(fd)
+            self._catch_up()
+        return row
+
+    def top(self, period: str = "all", today: date = None) -> list:
+        """Best rows of the current `period` board, best first."""
+        now = (today or date.today()).isoformat() + " 00:00:00"
+        with self._lock:
+            self._catch_up()
+            key, heap = self._boards[period]
+            if key != period_key(period, now):
+                return []
+            return [entry[3] for entry in sorted(heap, reverse=True)]
+
+
+# ---------------------------
+# Self-check
+# ---------------------------
+def _check(n: int = 20_000):
+    import random
+
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "scores.csv"
+        board = Leaderboard(path)
+        today = datetime.now().replace(microsecond=0)
+        rows, t0 = [], time.perf_counter()
+        for i in range(n):
+            when = today.replace(hour=0, minute=i // 60 % 60, second=i % 60) - timedelta(days=rng.choice((0, 2, 9)))
+            rows.append(board.add(f"p{i}", rng.randint(0, 15), 15, rng.randint(10, 300), when))
+        per_add = (time.perf_counter() - t0) / n
+
+        def expected(keep):
+            best = sorted((r for r in rows if keep(r)), key=lambda r: (r["score"], r["date"]), reverse=True)
+            return [(r["score"], r["date"]) for r in best[:10]]
+
+        got = {p: [(r["score"], r["date"]) for r in board.top(p)] for p in PERIODS}
+        assert got["all"] == expected(lambda r: True)
+        assert got["day"] == expected(lambda r: r["date"][:10] == today.date().isoformat())
+        assert got["week"] == expected(lambda r: period_key("week", r["date"]) == period_key("week", str(today)))
+
+        # a second process appending to the same log is picked up without a rescan
+        other = Leaderboard(path)
+        assert other.rows_seen == n
+        other.add("late", 99, 15, 42)
+        assert board.top("all")[0]["name"] == "late" and board.rows_seen == n + 1
+        board.add("name", 100, 15, 42)
+        assert board.top("all")[0]["name"] == "name" and Leaderboard(path).rows_seen == n + 2
+
+        t0 = time.perf_counter()
+        for _ in range(1_000):
+            board.top("all")
+        per_top = (time.perf_counter() - t0) / 1_000
+        t0 = time.perf_counter()
+        Leaderboard(path)
+        rebuild = time.perf_counter() - t0
+
+        # a log cut short, then one replaced by another file, is read again from the start
+        header, first, *_ = path.read_bytes().splitlines(keepends=True)
+        path.write_bytes(header + first)
+        assert [r["name"] for r in board.top("all")] == [rows[0]["name"]] and board.rows_seen == 1
+        fresh = Path(tmp) / "fresh.csv"
+        Leaderboard(fresh).add("swapped", 3, 15, 60)
+        os.replace(fresh, path)
+        assert [r["name"] for r in board.top("all")] == ["swapped"] and board.rows_seen == 1
+    print(f"leaderboard OK: add {per_add * 1e6:.0f} µs (incl. the log write), top-10 read {per_top * 1e6:.0f} µs, "
+          f"rebuild from {n + 2:,} logged scores {rebuild * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    _check()
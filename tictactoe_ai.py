@@ -0,0 +1,172 @@
+# tictactoe_ai.py
+# Computer opponent for "DAY-12 Tic_tak.py": the whole game solved once by minimax over the
+# positions that are distinct up to the board's eight symmetries, kept as a lookup table so
+# every reply is a handful of table reads.
+#
+#   python tictactoe_ai.py        # self-check, build time, table size and move latency
+import random
+import sys
+import time
+
+from tictactoe_engine import CELLS, DRAW, POPCOUNT, SIZE, Position, reachable_positions, winner
+
+# how often each level plays the solved move; the rest of the time it plays any legal move
+LEVELS = {"Easy": 0.25, "Medium": 0.6, "Hard": 0.9, "Unbeatable": 1.0}
+
+
+def _symmetries() -> list:
+    """The eight rotations/reflections as cell permutations (cell -> cell)."""
+    def rotate(r, c):
+        return c, SIZE - 1 - r
+
+    perms = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = []
+            for cell in range(CELLS):
+                r, c = divmod(cell, SIZE)
+                if flip:
+                    c = SIZE - 1 - c
+                for _ in range(turns):
+                    r, c = rotate(r, c)
+                perm.append(r * SIZE + c)
+            perms.append(perm)
+    return perms
+
+
+def _bit_tables(perms) -> list:
+    # one 512-entry table per symmetry: bitboard -> transformed bitboard
+    return [[sum(1 << perm[i] for i in range(CELLS) if bits >> i & 1) for bits in range(1 << CELLS)]
+            for perm in perms]
+
+
+SYMMETRIES = _symmetries()
+FORWARD = _bit_tables(SYMMETRIES)
+INVERSE = _bit_tables([[perm.index(i) for i in range(CELLS)] for perm in SYMMETRIES])
+
+
+def canonical(x: int, o: int) -> tuple:
+    """(key, symmetry): the smallest of the eight transformed positions as x << 9 | o."""
+    best, best_t = -1, 0
+    for t, table in enumerate(FORWARD):
+        key = table[x] << CELLS | table[o]
+        if best < 0 or key < best:
+            best, best_t = key, t
+    return best, best_t
+
+
+class PerfectPlayer:
+    """Solved tic-tac-toe: each canonical position maps to its value and its optimal moves.
+
+    Values are for the side to move: 0 a draw, a win is 1 + the cells left free when it lands
+    (so quicker wins score higher), a loss the negative of that. The table is packed as
+    (value + 16) << 9 | optimal-move mask, in the canonical orientation.
+    """
+
+    def __init__(self):
+        t0 = time.perf_counter()
+        self.table = {}
+        self._solve(0, 0)
+        self.build_seconds = time.perf_counter() - t0
+
+    def _solve(self, x: int, o: int) -> int:
+        key, _ = canonical(x, o)
+        entry = self.table.get(key)
+        if entry is not None:
+            return (entry >> CELLS) - 16
+        x, o = key >> CELLS, key & ((1 << CELLS) - 1)
+        result = winner(x, o)
+        mask = 0
+        if result == DRAW:
+            value = 0
+        elif result:
+            value = -(1 + CELLS - POPCOUNT[x | o])  # the previous move won
+        else:
+            pos = Position(x, o)
+            value = -99
+            for cell in pos.legal_moves():
+                child = pos.play(cell)
+                v = -self._solve(child.x, child.o)
+                if v > value:
+                    value, mask = v, 1 << cell
+                elif v == value:
+                    mask |= 1 << cell
+        self.table[key] = (value + 16) << CELLS | mask
+        return value
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def size_bytes(self) -> int:
+        return sys.getsizeof(self.table) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.table.items())
+
+    def value(self, pos: Position) -> int:
+        return (self.table[canonical(pos.x, pos.o)[0]] >> CELLS) - 16
+
+    def best_moves(self, pos: Position) -> list:
+        """Every optimal move for the side to move, as cell indices in `pos`'s own orientation."""
+        key, t = canonical(pos.x, pos.o)
+        mask = INVERSE[t][self.table[key] & ((1 << CELLS) - 1)]
+        return [cell for cell in range(CELLS) if mask >> cell & 1]
+
+    def choose(self, pos: Position, level: str = "Unbeatable", rng=None) -> int:
+        """A move for the side to move at `level`; ties between optimal moves are broken at random."""
+        rng = rng or random
+        if rng.random() < LEVELS[level]:
+            return rng.choice(self.best_moves(pos))
+        return rng.choice(pos.legal_moves())
+
+
+# ---------------------------
+# Self-check
+# ---------------------------
+def _brute_value(pos: Position, memo: dict) -> int:
+    # plain negamax over the un-reduced tree, as the reference
+    if pos in memo:
+        return memo[pos]
+    result = pos.winner()
+    if result == DRAW:
+        value = 0
+    elif result:
+        value = -(1 + CELLS - POPCOUNT[pos.x | pos.o])
+    else:
+        value = max(-_brute_value(pos.play(c), memo) for c in pos.legal_moves())
+    memo[pos] = value
+    return value
+
+
+def _check(games: int = 2_000):
+    player = PerfectPlayer()
+    assert len(player) == 765, len(player)
+    assert player.value(Position()) == 0  # perfect play is a draw
+
+    memo = {}
+    for pos, result in reachable_positions().items():
+        v = _brute_value(pos, memo)
+        assert player.value(pos) == v, pos
+        if result is None:
+            for cell in player.best_moves(pos):
+                assert -_brute_value(pos.play(cell), memo) == v, (pos, cell)
+
+    # unbeatable never loses, from either side, against any opponent
+    rng = random.Random(11)
+    for g in range(games):
+        pos, ai = Position(), "XO"[g % 2]
+        while pos.winner() is None:
+            level = "Unbeatable" if pos.to_move == ai else "Easy"
+            pos = pos.play(player.choose(pos, level, rng))
+        assert pos.winner() in (ai, DRAW), pos
+
+    sample = rng.choices([p for p, r in reachable_positions().items() if r is None], k=100_000)
+    t0 = time.perf_counter()
+    for pos in sample:
+        player.best_moves(pos)
+    per_move = (time.perf_counter() - t0) / len(sample)
+    print(f"solver OK: {len(player)} canonical positions (of 5,478 reachable) solved in "
+          f"{player.build_seconds * 1000:.0f} ms, table ~{player.size_bytes / 1024:.0f} KB in memory, "
+          f"{len(player) * 3 / 1024:.1f} KB packed; best move in {per_move * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    _check()
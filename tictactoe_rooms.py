@@ -0,0 +1,274 @@
+# tictactoe_rooms.py
+# Rooms for two-browser play in "DAY-12 Tic_tak.py". One RoomRegistry per server process (held
+# with st.cache_resource) maps a short room code to a Room. Every change to a room happens
+# under the room's own lock and bumps its version, so a client only has to compare one
+# integer to know whether there is anything new to draw.
+#
+#   python tictactoe_rooms.py        # self-check: concurrency, memory per room, eviction
+import secrets
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import NamedTuple
+
+from tictactoe_engine import DRAW, Position
+
+MAX_ROOMS = 2_000
+IDLE_SECONDS = 30 * 60
+CODE_ALPHABET = "ABCDEFGHJKMNPQRSTUVWXYZ23456789"  # no 0/O, 1/I/L
+CODE_LENGTH = 5
+
+
+class RoomView(NamedTuple):
+    """An immutable copy of a room's state at one version, safe to render without the lock."""
+    code: str
+    version: int
+    position: Position
+    seats: tuple   # (X player id, O player id), None for an empty seat
+    names: dict
+    wins: dict     # player id -> games won
+    draws: int
+    winner: object
+
+    def seat_of(self, player: str):
+        if player == self.seats[0]:
+            return "X"
+        if player == self.seats[1]:
+            return "O"
+        return None
+
+    def name(self, seat: str) -> str:
+        player = self.seats[0 if seat == "X" else 1]
+        return self.names.get(player, "…") if player else "…"
+
+
+class Room:
+    """One game between two browser sessions. Mutations take the lock and bump `version`."""
+    __slots__ = ("code", "lock", "version", "position", "seats", "names", "wins", "draws", "winner",
+                 "last_active")
+
+    def __init__(self, code: str, now: float):
+        self.code = code
+        self.lock = threading.Lock()
+        self.version = 0
+        self.position = Position()
+        self.seats = [None, None]
+        self.names = {}
+        self.wins = {}
+        self.draws = 0
+        self.winner = None
+        self.last_active = now
+
+    def snapshot(self) -> RoomView:
+        with self.lock:
+            return RoomView(self.code, self.version, self.position, tuple(self.seats), dict(self.names),
+                            dict(self.wins), self.draws, self.winner)
+
+    def join(self, player: str, name: str) -> str:
+        """Seat `player` (again, if already seated) and return 'X' or 'O'; ValueError when full."""
+        with self.lock:
+            if player not in self.seats:
+                if None not in self.seats:
+                    raise ValueError(f"room {self.code} is full")
+                self.seats[self.seats.index(None)] = player
+                self.wins.setdefault(player, 0)
+            self.names[player] = name or "Player"
+            self.version += 1
+            return "XO"[self.seats.index(player)]
+
+    def move(self, player: str, cell: int) -> RoomView:
+        with self.lock:
+            if None in self.seats:
+                raise ValueError("waiting for the other player to join")
+            if self.winner is not None:
+                raise ValueError("the game is over")
+            if self.seats["XO".index(self.position.to_move)] != player:
+                raise ValueError("it's not your turn")
+            self.position = self.position.play(cell)  # ValueError if the cell is taken
+            self.winner = self.position.winner()
+            if self.winner == DRAW:
+                self.draws += 1
+            elif self.winner:
+                self.wins[self.seats["XO".index(self.winner)]] += 1
+            self.version += 1
+        return self.snapshot()
+
+    def rematch(self, player: str):
+        """A new game with the seats swapped, so the other player opens."""
+        with self.lock:
+            if player not in self.seats or self.winner is None:
+                raise ValueError("no finished game to restart")
+            self.position = Position()
+            self.winner = None
+            self.seats.reverse()
+            self.version += 1
+
+    def leave(self, player: str) -> bool:
+        """Free `player`'s seat; True when the room is now empty."""
+        with self.lock:
+            if player in self.seats:
+                self.seats[self.seats.index(player)] = None
+                self.position, self.winner = Position(), None
+                self.version += 1
+            return self.seats == [None, None]
+
+
+class RoomRegistry:
+    """All open rooms of this server process, least recently active first.
+
+    Every lookup marks the room active, which includes the clients' polling, so a room lives
+    as long as someone has it open. Rooms idle for `idle_s` are dropped on the next create or
+    lookup, and at most `max_rooms` are open at once.
+    """
+
+    def __init__(self, max_rooms: int = MAX_ROOMS, idle_s: float = IDLE_SECONDS, clock=time.monotonic):
+        self.max_rooms = max_rooms
+        self.idle_s = idle_s
+        self.clock = clock
+        self.evicted = 0
+        self._rooms = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def _evict_idle(self, now: float):
+        # caller holds the lock; the oldest rooms are at the front
+        while self._rooms:
+            room = next(iter(self._rooms.values()))
+            if now - room.last_active < self.idle_s:
+                break
+            del self._rooms[room.code]
+            self.evicted += 1
+
+    def create(self, player: str, name: str) -> Room:
+        """Open a room with `player` in the X seat; RuntimeError when the server is full."""
+        now = self.clock()
+        with self._lock:
+            self._evict_idle(now)
+            if len(self._rooms) >= self.max_rooms:
+                raise RuntimeError("all rooms are taken, try again in a few minutes")
+            code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+            while code in self._rooms:
+                code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+            room = self._rooms[code] = Room(code, now)
+        room.join(player, name)
+        return room
+
+    def get(self, code: str):
+        """The room for `code`, or None if there is none (any more)."""
+        now = self.clock()
+        with self._lock:
+            self._evict_idle(now)
+            room = self._rooms.get(code)
+            if room is not None:
+                room.last_active = now
+                self._rooms.move_to_end(code)
+            return room
+
+    def leave(self, code: str, player: str):
+        room = self.get(code)
+        if room is not None and room.leave(player):
+            with self._lock:
+                self._rooms.pop(code, None)
+
+
+# ---------------------------
+# Self-check
+# ---------------------------
+def _check(rooms: int = 500, threads: int = 8):
+    import random
+
+    # memory per room
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    registry = RoomRegistry()
+    codes = []
+    for i in range(rooms):
+        room = registry.create(f"a{i}", f"Alice {i}")
+        room.join(f"b{i}", f"Bob {i}")
+        codes.append(room.code)
+    per_room = (tracemalloc.get_traced_memory()[0] - before) / rooms
+    tracemalloc.stop()
+
+    # many games at once: every move goes through the room lock, each bumps the version once
+    changes = [0] * threads
+
+    def play(seed):
+        rng = random.Random(seed)
+        for code in rng.sample(codes, 100):
+            room = registry.get(code)
+            view = room.snapshot()
+            players = {"X": view.seats[0], "O": view.seats[1]}
+            while view.winner is None:
+                try:
+                    view = room.move(players[view.position.to_move], rng.choice(view.position.legal_moves()))
+                    changes[seed] += 1
+                except ValueError:
+                    view = room.snapshot()  # another thread moved first
+            try:
+                room.rematch(players["X"])
+                changes[seed] += 1
+            except ValueError:
+                pass  # another thread already restarted it
+
+    t0 = time.perf_counter()
+    workers = [threading.Thread(target=play, args=(s,)) for s in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    games = sum(sum(v.wins.values()) + v.draws for v in (registry.get(c).snapshot() for c in codes))
+    versions = sum(registry.get(c).snapshot().version - 2 for c in codes)  # less the two joins
+    assert versions == sum(changes), (versions, sum(changes))
+
+    # rejected actions
+    room = registry.get(codes[0])
+    view = room.snapshot()
+    try:
+        room.join("intruder", "Eve")
+        raise AssertionError("joined a full room")
+    except ValueError:
+        pass
+    x, o = view.seats
+    if room.snapshot().winner is None:
+        mover = x if room.snapshot().position.to_move == "X" else o
+        try:
+            room.move(o if mover == x else x, room.snapshot().position.legal_moves()[0])
+            raise AssertionError("moved out of turn")
+        except ValueError:
+            pass
+
+    # polling cost: lookup plus version compare
+    t0 = time.perf_counter()
+    for i in range(100_000):
+        registry.get(codes[i % rooms]).version
+    per_poll = (time.perf_counter() - t0) / 100_000
+
+    # idle rooms go, bounded capacity holds
+    now = [0.0]
+    small = RoomRegistry(max_rooms=3, idle_s=60, clock=lambda: now[0])
+    first = small.create("p1", "P1")
+    small.create("p2", "P2")
+    small.create("p3", "P3")
+    try:
+        small.create("p4", "P4")
+        raise AssertionError("created past max_rooms")
+    except RuntimeError:
+        pass
+    now[0] = 50
+    small.get(first.code)  # still in use
+    now[0] = 70
+    small.create("p4", "P4")
+    assert len(small) == 2 and small.evicted == 2 and small.get(first.code) is first
+    small.leave(first.code, "p1")
+    assert small.get(first.code) is None
+
+    print(f"rooms OK: {rooms} rooms at ~{per_room / 1024:.1f} KB each, {sum(changes):,} state changes ({games:,} games) "
+          f"from {threads} threads in {elapsed:.2f} s, poll {per_poll * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    _check()
@@ -0,0 +1,278 @@
+# tictactoe_sim.py
+# Self-play for "DAY-12 Tic_tak.py" without Streamlit: every pair of strategies plays a round of
+# games on the bitboard engine, as X and as O, and the run is summarised as win/draw tables plus
+# throughput. Games are played in fixed-size batches over a process pool; each batch seeds its own
+# RNG from (seed, X strategy, O strategy, batch number), so a run gives the same tables whatever
+# the number of workers.
+#
+#   python tictactoe_sim.py --games 100000 --strategies random greedy minimax
+#   python tictactoe_sim.py --games 2000 --mcts-playouts 200 --json sim_report.json
+import argparse
+import json
+import math
+import os
+import random
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from tictactoe_ai import PerfectPlayer
+from tictactoe_engine import CELLS, DRAW, FULL, POPCOUNT, WIN_TABLE, Position, winners_batch
+
+STRATEGY_NAMES = ("random", "greedy", "minimax", "mcts")
+CENTER_FIRST = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+BATCH_GAMES = 1_000
+# FREE_CELLS[mask] lists the set bits of mask; NTH_FREE[mask, i] is the i-th of them as an array,
+# for picking random moves for a whole batch of games at once
+FREE_CELLS = tuple(tuple(c for c in range(CELLS) if mask >> c & 1) for mask in range(1 << CELLS))
+NTH_FREE = np.zeros((1 << CELLS, CELLS), dtype=np.uint8)
+for _mask, _cells in enumerate(FREE_CELLS):
+    NTH_FREE[_mask, :len(_cells)] = _cells
+
+
+# ---------------------------
+# Strategies: choose(position, rng) -> cell
+# ---------------------------
+class RandomPlayer:
+    def choose(self, pos: Position, rng) -> int:
+        return rng.choice(pos.legal_moves())
+
+
+class GreedyPlayer:
+    """Win if it can, block if it must, otherwise the center, then corners, then edges."""
+
+    def choose(self, pos: Position, rng) -> int:
+        own, other = (pos.x, pos.o) if pos.to_move == "X" else (pos.o, pos.x)
+        free = pos.free
+        for marks in (own, other):
+            for cell in CENTER_FIRST:
+                bit = 1 << cell
+                if free & bit and WIN_TABLE[marks | bit]:
+                    return cell
+        return next(cell for cell in CENTER_FIRST if free >> cell & 1)
+
+
+class MinimaxPlayer:
+    """Perfect play from the solved-game table, optimal moves tie-broken at random."""
+
+    def __init__(self):
+        self.table = PerfectPlayer()
+
+    def choose(self, pos: Position, rng) -> int:
+        return rng.choice(self.table.best_moves(pos))
+
+
+class MctsPlayer:
+    """UCT Monte Carlo tree search with random playouts; statistics are kept per position."""
+
+    def __init__(self, playouts: int = 100, c: float = 1.4):
+        self.playouts = playouts
+        self.c = c
+
+    def choose(self, root: Position, rng) -> int:
+        # position -> [visits, score for the side that moved into it, untried moves, children]
+        stats = {root: [0, 0.0, root.legal_moves(), []]}
+        for _ in range(self.playouts):
+            path, node = [root], root
+            entry = stats[root]
+            # selection: descend through fully expanded nodes, then expand one new child
+            while node.winner() is None:
+                untried = entry[2]
+                if untried:
+                    child = node.play(untried.pop(rng.randrange(len(untried))))
+                    entry[3].append(child)
+                    entry = stats.setdefault(child, [0, 0.0, child.legal_moves(), []])
+                    node = child
+                    path.append(node)
+                    break
+                log_n, c = math.log(entry[0]), self.c
+                node = max(entry[3], key=lambda ch: stats[ch][1] / stats[ch][0]
+                           + c * math.sqrt(log_n / stats[ch][0]))
+                entry = stats[node]
+                path.append(node)
+            result = _playout(node.x, node.o, rng)
+            for pos in path:
+                entry = stats[pos]
+                entry[0] += 1
+                mover = "O" if POPCOUNT[pos.x] == POPCOUNT[pos.o] else "X"
+                entry[1] += 0.5 if result == DRAW else float(result == mover)
+        return max(root.legal_moves(), key=lambda cell: stats.get(root.play(cell), (0,))[0])
+
+
+def _playout(x: int, o: int, rng) -> str:
+    """Random moves on raw bitboards until the game ends."""
+    x_to_move = POPCOUNT[x] == POPCOUNT[o]
+    while True:
+        if WIN_TABLE[x]:
+            return "X"
+        if WIN_TABLE[o]:
+            return "O"
+        free = FULL & ~(x | o)
+        if not free:
+            return DRAW
+        bit = 1 << rng.choice(FREE_CELLS[free])
+        if x_to_move:
+            x |= bit
+        else:
+            o |= bit
+        x_to_move = not x_to_move
+
+
+@lru_cache(maxsize=None)
+def strategy(name: str, mcts_playouts: int = 100):
+    """One instance per name in each process (the minimax table is built once)."""
+    if name == "random":
+        return RandomPlayer()
+    if name == "greedy":
+        return GreedyPlayer()
+    if name == "minimax":
+        return MinimaxPlayer()
+    if name == "mcts":
+        return MctsPlayer(mcts_playouts)
+    raise ValueError(f"unknown strategy {name!r}, pick from {', '.join(STRATEGY_NAMES)}")
+
+
+# ---------------------------
+# Games and batches
+# ---------------------------
+def play_game(x_player, o_player, rng) -> str:
+    """One game from the empty board; returns 'X', 'O' or DRAW."""
+    pos, result = Position(), None
+    while result is None:
+        player = x_player if POPCOUNT[pos.x] == POPCOUNT[pos.o] else o_player
+        pos = pos.play(player.choose(pos, rng))
+        result = pos.winner()
+    return result
+
+
+def random_games(n: int, rng: np.random.Generator) -> Counter:
+    """n random-vs-random games played side by side with NumPy: one vectorised step per ply."""
+    xs = np.zeros(n, dtype=np.uint16)
+    os_ = np.zeros(n, dtype=np.uint16)
+    result = np.zeros(n, dtype=np.uint8)
+    popcount = np.frombuffer(POPCOUNT, dtype=np.uint8)
+    for ply in range(CELLS):
+        live = np.flatnonzero(result == 0)
+        if not len(live):
+            break
+        free = FULL & ~(xs[live] | os_[live])
+        pick = (rng.random(len(live)) * popcount[free]).astype(np.intp)
+        bits = (1 << NTH_FREE[free, pick].astype(np.uint16)).astype(np.uint16)
+        if ply % 2 == 0:
+            xs[live] |= bits
+        else:
+            os_[live] |= bits
+        result[live] = winners_batch(xs[live], os_[live])
+    counts = np.bincount(result, minlength=4)
+    return Counter({"X": int(counts[1]), "O": int(counts[2]), DRAW: int(counts[3])})
+
+
+def _seed(seed: int, x_name: str, o_name: str, batch: int) -> np.random.SeedSequence:
+    return np.random.SeedSequence([seed, zlib.crc32(f"{x_name}/{o_name}".encode()), batch])
+
+
+def run_batch(x_name: str, o_name: str, games: int, seed: int, batch: int, mcts_playouts: int,
+              vectorised: bool = True) -> dict:
+    """Play one batch of x_name vs o_name; the counts depend only on the arguments."""
+    seq = _seed(seed, x_name, o_name, batch)
+    t0 = time.process_time()
+    if vectorised and x_name == o_name == "random":
+        counts = random_games(games, np.random.default_rng(seq))
+    else:
+        rng = random.Random(int(seq.generate_state(1, np.uint64)[0]))
+        x_player, o_player = strategy(x_name, mcts_playouts), strategy(o_name, mcts_playouts)
+        counts = Counter(play_game(x_player, o_player, rng) for _ in range(games))
+    return {"x": x_name, "o": o_name, "counts": dict(counts), "cpu_s": time.process_time() - t0}
+
+
+def run(strategies, games: int, seed: int, workers: int, mcts_playouts: int, batch_games: int = BATCH_GAMES,
+        vectorised: bool = True) -> dict:
+    for name in strategies:
+        strategy(name, mcts_playouts)  # fail early on a bad name
+    jobs = []
+    for x_name in strategies:
+        for o_name in strategies:
+            for batch, start in enumerate(range(0, games, batch_games)):
+                jobs.append((x_name, o_name, min(batch_games, games - start), seed, batch, mcts_playouts, vectorised))
+    # the slowest matchups first, so no worker is left with a long batch at the end
+    jobs.sort(key=lambda job: ("mcts" in job[:2], "minimax" in job[:2]), reverse=True)
+
+    wall0 = time.perf_counter()
+    if workers <= 1:
+        parts = [run_batch(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(run_batch, *zip(*jobs)))
+    wall = time.perf_counter() - wall0
+
+    table = {}
+    for part in parts:
+        cell = table.setdefault(f"{part['x']} vs {part['o']}", {"X": 0, "O": 0, DRAW: 0, "cpu_s": 0.0})
+        for k, v in part["counts"].items():
+            cell[k] += v
+        cell["cpu_s"] += part["cpu_s"]
+    matchups = {}
+    for key, cell in table.items():
+        n = cell["X"] + cell["O"] + cell[DRAW]
+        matchups[key] = {"games": n, "x_win": cell["X"] / n, "draw": cell[DRAW] / n, "o_win": cell["O"] / n,
+                         "games_per_cpu_s": round(n / max(cell["cpu_s"], 1e-9))}
+    total = games * len(strategies) ** 2
+    return {
+        "when": datetime.now().isoformat(timespec="seconds"),
+        "config": {"strategies": list(strategies), "games_per_matchup": games, "seed": seed, "workers": workers,
+                   "batch_games": batch_games, "mcts_playouts": mcts_playouts, "vectorised_random": vectorised},
+        "games": total,
+        "wall_s": round(wall, 2),
+        "games_per_s": round(total / wall),
+        "matchups": matchups,
+    }
+
+
+def format_tables(report: dict) -> str:
+    """X-strategy rows by O-strategy columns: X wins / draws / O wins, in percent."""
+    names = report["config"]["strategies"]
+    width = max(16, *(len(n) + 2 for n in names))
+    lines = ["X \\ O".ljust(9) + "".join(n.rjust(width) for n in names)]
+    for x_name in names:
+        row = x_name.ljust(9)
+        for o_name in names:
+            m = report["matchups"][f"{x_name} vs {o_name}"]
+            row += f"{m['x_win'] * 100:.0f}/{m['draw'] * 100:.0f}/{m['o_win'] * 100:.0f}".rjust(width)
+        lines.append(row)
+    lines.append("(X wins / draws / O wins, % of games)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic-tac-toe strategy tournament by self-play.")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGY_NAMES), choices=STRATEGY_NAMES)
+    parser.add_argument("--games", type=int, default=2_000, help="games per matchup (each side order)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--batch", type=int, default=BATCH_GAMES, help="games per task")
+    parser.add_argument("--mcts-playouts", type=int, default=100)
+    parser.add_argument("--no-vectorise", action="store_true", help="play random vs random one game at a time")
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+
+    report = run(args.strategies, args.games, args.seed, args.workers, args.mcts_playouts, args.batch,
+                 vectorised=not args.no_vectorise)
+    print(format_tables(report))
+    print(f"{report['games']:,} games in {report['wall_s']} s on {args.workers} worker(s): "
+          f"{report['games_per_s']:,} games/s")
+    for key, m in report["matchups"].items():
+        print(f"  {key:<20} {m['games_per_cpu_s']:>10,} games per CPU-second")
+    if args.json:
+        out = Path(args.json).resolve()
+        out.write_text(json.dumps(report, indent=2))
+        print(f"report written to {out}")
+
+
+if __name__ == "__main__":
+    main()